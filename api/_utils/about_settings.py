@@ -0,0 +1,79 @@
+"""Process-level cache of the single `about` row and the values derived from it.
+
+Checkout only needs the shop's WhatsApp number, and the About page needs
+the whole row. Both read it from here. The row is fetched once per
+ABOUT_SETTINGS_TTL, `update_about` invalidates it, and the derived values
+(the validated `AboutOut`, digits-only WhatsApp number, accepts-orders flag)
+are computed once per fetch instead of on every request.
+"""
+import os
+import threading
+import time
+from dataclasses import dataclass
+from typing import Optional
+from pydantic import TypeAdapter
+from . import metrics, repository as repo
+from .schemas import AboutOut, select_for
+
+ABOUT_SETTINGS_TTL = float(os.getenv("ABOUT_SETTINGS_TTL", "300"))
+# Used when the about row has no WhatsApp number yet
+DEFAULT_WHATSAPP_NUMBER = "5511999999999"
+
+ABOUT_SELECT = select_for(AboutOut)
+_about_schema = TypeAdapter(AboutOut)
+
+
+@dataclass(frozen=True)
+class AboutSettings:
+    about: Optional[AboutOut]
+    whatsapp_number: str
+    accepts_orders: bool
+
+    @classmethod
+    def from_row(cls, row: Optional[dict]) -> "AboutSettings":
+        about = _about_schema.validate_python(row) if row else None
+        # Remove non-numeric characters from whatsapp
+        whatsapp_number = "".join(filter(str.isdigit, (about and about["whatsapp"]) or ""))
+        return cls(
+            about=about,
+            whatsapp_number=whatsapp_number or DEFAULT_WHATSAPP_NUMBER,
+            accepts_orders=about is None or about["accepts_orders"] is not False,
+        )
+
+
+class AboutSettingsCache:
+    """The about row with a TTL; a fetch that raced an invalidation is not kept"""
+
+    def __init__(self, ttl: float = ABOUT_SETTINGS_TTL):
+        self.ttl = ttl
+        self.version = 0
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        # (expires_at, settings)
+        self._entry: Optional[tuple[float, AboutSettings]] = None
+
+    async def get(self) -> AboutSettings:
+        entry = self._entry
+        if entry is not None and entry[0] > time.monotonic():
+            self.hits += 1
+            return entry[1]
+        self.misses += 1
+        version = self.version
+        settings = AboutSettings.from_row(await repo.get_about(ABOUT_SELECT))
+        with self._lock:
+            if version == self.version:
+                self._entry = (time.monotonic() + self.ttl, settings)
+        return settings
+
+    def invalidate(self) -> None:
+        with self._lock:
+            self.version += 1
+            self._entry = None
+
+    def stats(self) -> dict:
+        return {"version": self.version, "hits": self.hits, "misses": self.misses, "cached": self._entry is not None}
+
+
+about_settings = AboutSettingsCache()
+metrics.register_cache("about_settings", about_settings.stats)
@@ -1,20 +1,204 @@
 """Middleware de autenticação"""
+import asyncio
 import os
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
 from typing import Optional
 from functools import wraps
+import httpx
 from fastapi import HTTPException, Request
-from jose import jwt, JWTError
-from dotenv import load_dotenv
-
-load_dotenv()
+from . import metrics, repository as repo
+from .supabase_client import registry
 
 SUPABASE_URL = os.getenv("SUPABASE_URL")
+# Segredo HS256 do projeto (Project Settings > API > JWT Secret)
+SUPABASE_JWT_SECRET = os.getenv("SUPABASE_JWT_SECRET")
+# Por quanto tempo o JWKS (chaves assimétricas) é reutilizado, em segundos
+SUPABASE_JWKS_TTL = float(os.getenv("SUPABASE_JWKS_TTL", "600"))
+# Intervalo mínimo entre buscas do JWKS disparadas por um `kid` desconhecido
+JWKS_MIN_REFRESH = 30.0
+# Quantos `kid` ausentes do JWKS ficam lembrados (cada um por SUPABASE_JWKS_TTL)
+JWKS_MISSING_MAX = 256
+# Quantos tokens já verificados ficam em memória
+AUTH_TOKEN_CACHE_MAX = int(os.getenv("AUTH_TOKEN_CACHE_MAX", "1024"))
+
+ASYMMETRIC_ALGORITHMS = ("RS256", "ES256")
+
+# Colunas do perfil de admin usadas por /api/auth/me, /api/users/profile e pelo login
+ADMIN_PROFILE_COLUMNS = ("id", "a_email", "a_name", "a_phone", "a_avatar_url", "a_is_active", "a_created_at")
+ADMIN_PROFILE_SELECT = repo.select_list(ADMIN_PROFILE_COLUMNS)
 
 
 def get_jwt_secret():
-    """Supabase usa o JWT secret baseado no projeto"""
-    # O Supabase usa o anon key como parte da validação
-    return os.getenv("SUPABASE_ANON_KEY")
+    """Segredo HS256 usado pelo Supabase para assinar os access tokens"""
+    return SUPABASE_JWT_SECRET
+
+
+class SigningKeys:
+    """Chaves de assinatura do projeto, carregadas uma vez por instância.
+
+    Tokens HS256 usam o segredo do projeto. Tokens RS256/ES256 usam o JWKS
+    do Supabase Auth, relido sem bloquear o event loop quando expira o TTL
+    ou quando chega um `kid` desconhecido (rotação de chaves). Um `kid` que
+    não veio na busca não provoca outra até o TTL expirar.
+    """
+
+    def __init__(self, secret: Optional[str] = None, ttl: float = SUPABASE_JWKS_TTL):
+        self.secret = secret
+        self.ttl = ttl
+        self.fetches = 0
+        self._keys: dict = {}
+        self._fetched_at: Optional[float] = None
+        self._attempted_at: Optional[float] = None
+        # kid -> quando uma busca do JWKS não o encontrou
+        self._missing: "OrderedDict[Optional[str], float]" = OrderedDict()
+        self._lock: Optional[asyncio.Lock] = None
+        self._lock_loop: Optional[asyncio.AbstractEventLoop] = None
+
+    def _refresh_lock(self) -> asyncio.Lock:
+        # O lock pertence ao loop que o usa; recriado se o loop mudar (como o pool async do registry)
+        loop = asyncio.get_running_loop()
+        if self._lock is None or loop is not self._lock_loop:
+            self._lock = asyncio.Lock()
+            self._lock_loop = loop
+        return self._lock
+
+    async def _fetch_jwks(self) -> None:
+        response = await registry.async_http_client().get(
+            f"{registry.url}/auth/v1/.well-known/jwks.json",
+            headers={"apikey": registry.anon_key or ""},
+        )
+        response.raise_for_status()
+        self._keys = {key.get("kid"): key for key in response.json().get("keys", [])}
+        self._fetched_at = time.monotonic()
+        self.fetches += 1
+
+    def _should_fetch(self, kid: Optional[str], now: float) -> bool:
+        if self._attempted_at is not None and now - self._attempted_at < JWKS_MIN_REFRESH:
+            return False
+        if self._fetched_at is None or now - self._fetched_at > self.ttl:
+            return True
+        if kid in self._keys:
+            return False
+        # Um kid que a última busca não trouxe só é procurado de novo após o TTL
+        missing_at = self._missing.get(kid)
+        return missing_at is None or now - missing_at > self.ttl
+
+    def _remember_missing(self, kid: Optional[str], now: float) -> None:
+        self._missing[kid] = now
+        self._missing.move_to_end(kid)
+        while len(self._missing) > JWKS_MISSING_MAX:
+            self._missing.popitem(last=False)
+
+    async def _jwk(self, kid: Optional[str]) -> Optional[dict]:
+        from jose import JWTError
+
+        lock = self._refresh_lock()
+        # Com uma busca em andamento, espera por ela em vez de responder com as chaves antigas
+        if not lock.locked() and not self._should_fetch(kid, time.monotonic()):
+            return self._keys.get(kid)
+        async with lock:
+            now = time.monotonic()
+            # Outra requisição pode ter buscado enquanto esta esperava o lock
+            if self._should_fetch(kid, now):
+                self._attempted_at = now
+                try:
+                    await self._fetch_jwks()
+                except (httpx.HTTPError, ValueError):
+                    # Mantém as chaves anteriores se o Supabase estiver fora
+                    if not self._keys:
+                        raise JWTError("Não foi possível obter as chaves de assinatura")
+                else:
+                    if kid in self._keys:
+                        self._missing.pop(kid, None)
+                    else:
+                        self._remember_missing(kid, now)
+            return self._keys.get(kid)
+
+    async def key_for(self, header: dict):
+        """Chave que deve ter assinado um token com este header"""
+        from jose import JWTError
+
+        algorithm = header.get("alg")
+        if algorithm == "HS256":
+            if not self.secret:
+                raise JWTError("SUPABASE_JWT_SECRET não configurado")
+            return self.secret
+        if algorithm not in ASYMMETRIC_ALGORITHMS:
+            raise JWTError(f"Algoritmo não suportado: {algorithm}")
+        key = await self._jwk(header.get("kid"))
+        if key is None:
+            raise JWTError("Chave de assinatura desconhecida")
+        return key
+
+
+@dataclass
+class VerifiedToken:
+    """Claims de um token já verificado e o perfil de admin resolvido"""
+    exp: float
+    claims: dict
+    admin: Optional[dict] = None
+    admin_loaded: bool = False
+
+
+class VerifiedTokenCache:
+    """LRU de tokens já verificados; cada entrada expira no `exp` do token"""
+
+    def __init__(self, maxsize: int = AUTH_TOKEN_CACHE_MAX):
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._entries: "OrderedDict[str, VerifiedToken]" = OrderedDict()
+
+    def get(self, token: str) -> Optional[VerifiedToken]:
+        with self._lock:
+            entry = self._entries.get(token)
+            if entry is None or entry.exp <= time.time():
+                if entry is not None:
+                    del self._entries[token]
+                self.misses += 1
+                return None
+            self._entries.move_to_end(token)
+            self.hits += 1
+            return entry
+
+    def put(self, token: str, claims: dict) -> VerifiedToken:
+        entry = VerifiedToken(exp=float(claims["exp"]), claims=claims)
+        with self._lock:
+            self._entries[token] = entry
+            self._entries.move_to_end(token)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+        return entry
+
+    def forget_admin(self, user_id: str) -> None:
+        """Descarta o perfil em cache de `user_id` (após alterar a tabela admin)"""
+        with self._lock:
+            for entry in self._entries.values():
+                if entry.claims.get("sub") == user_id:
+                    entry.admin = None
+                    entry.admin_loaded = False
+
+    def forget_user(self, user_id: str) -> None:
+        """Remove todos os tokens de `user_id` (conta apagada)"""
+        with self._lock:
+            for token in [t for t, e in self._entries.items() if e.claims.get("sub") == user_id]:
+                del self._entries[token]
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> dict:
+        return {"size": len(self._entries), "hits": self.hits, "misses": self.misses}
+
+
+signing_keys = SigningKeys(get_jwt_secret())
+token_cache = VerifiedTokenCache()
+metrics.register_cache("auth_token", token_cache.stats)
 
 
 def extract_token(request: Request) -> Optional[str]:
@@ -30,32 +214,47 @@ def extract_token(request: Request) -> Optional[str]:
     return parts[1]
 
 
-def verify_token(token: str) -> dict:
-    """Verifica e decodifica o token JWT do Supabase"""
+async def _verified(token: str) -> VerifiedToken:
+    started = time.perf_counter()
+    try:
+        return await _verify(token)
+    finally:
+        metrics.record_auth(time.perf_counter() - started)
+
+
+async def _verify(token: str) -> VerifiedToken:
+    entry = token_cache.get(token)
+    if entry is not None:
+        return entry
+    # python-jose (e o cryptography) só são importados na primeira verificação
+    from jose import jwt, JWTError
+
     try:
-        # Supabase JWT validation
-        # O token pode ser validado verificando com a chave pública do Supabase
-        # Para simplificar, vamos decodificar sem verificar a assinatura
-        # Em produção, você deve verificar com a chave correta
+        header = jwt.get_unverified_header(token)
         payload = jwt.decode(
             token,
-            get_jwt_secret(),
-            algorithms=["HS256"],
+            await signing_keys.key_for(header),
+            algorithms=[header.get("alg")],
             audience="authenticated",
-            options={"verify_signature": False}  # Em produção, configure corretamente
+            options={"require_exp": True},
         )
-        return payload
     except JWTError as e:
         raise HTTPException(status_code=401, detail=f"Token inválido: {str(e)}")
+    return token_cache.put(token, payload)
+
 
+async def verify_token(token: str) -> dict:
+    """Verifica a assinatura do token JWT do Supabase localmente e devolve as claims"""
+    return (await _verified(token)).claims
 
-def get_current_user(request: Request) -> dict:
+
+async def get_current_user(request: Request) -> dict:
     """Obtém o usuário atual do token JWT"""
     token = extract_token(request)
     if not token:
         raise HTTPException(status_code=401, detail="Token de autenticação não fornecido")
     
-    payload = verify_token(token)
+    payload = await verify_token(token)
     return {
         "id": payload.get("sub"),
         "email": payload.get("email"),
@@ -63,11 +262,24 @@ def get_current_user(request: Request) -> dict:
     }
 
 
+async def get_admin_profile(request: Request) -> Optional[dict]:
+    """Linha da tabela admin do usuário atual, buscada uma vez por token"""
+    token = extract_token(request)
+    if not token:
+        raise HTTPException(status_code=401, detail="Token de autenticação não fornecido")
+
+    entry = await _verified(token)
+    if not entry.admin_loaded:
+        entry.admin = await repo.get_admin(entry.claims.get("sub"), columns=ADMIN_PROFILE_SELECT)
+        entry.admin_loaded = True
+    return entry.admin
+
+
 def require_auth(func):
     """Decorator para requerer autenticação"""
     @wraps(func)
     async def wrapper(request: Request, *args, **kwargs):
-        user = get_current_user(request)
+        user = await get_current_user(request)
         request.state.user = user
         return await func(request, *args, **kwargs)
     return wrapper
@@ -0,0 +1,137 @@
+"""In-memory cache for the public catalog (anonymous product/category/about reads)"""
+import hashlib
+import os
+import threading
+import time
+from dataclasses import dataclass
+from typing import Any, Optional
+from fastapi import Request
+from fastapi.responses import Response
+from . import metrics
+from .schemas import encode_json
+
+CATALOG_CACHE_TTL = float(os.getenv("CATALOG_CACHE_TTL", "60"))
+# How long the Vercel edge may serve a cached catalog response
+CATALOG_EDGE_MAX_AGE = int(os.getenv("CATALOG_EDGE_MAX_AGE", "30"))
+
+PRODUCTS = "products"
+CATEGORIES = "categories"
+ABOUT = "about"
+# Categories with their products, so it goes stale with either of them
+CATALOG = "catalog"
+DEPENDENT_KEYS = {PRODUCTS: (CATALOG,), CATEGORIES: (CATALOG,)}
+
+PUBLIC_CACHE_CONTROL = f"public, max-age=0, s-maxage={CATALOG_EDGE_MAX_AGE}, stale-while-revalidate={CATALOG_EDGE_MAX_AGE * 10}"
+PRIVATE_CACHE_CONTROL = "private, no-store"
+
+
+class CatalogCache:
+    """Versioned cache with write-through invalidation and a TTL fallback.
+
+    Admin write paths call `invalidate`, which bumps `version` and drops the
+    affected keys. Readers snapshot `version` before querying and pass it to
+    `set`, so a slow read that raced a write can't repopulate stale data.
+    The TTL only matters for writes made outside the API (Supabase dashboard).
+    """
+
+    def __init__(self, ttl: float = CATALOG_CACHE_TTL):
+        self.ttl = ttl
+        self.version = 0
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        # key -> (expires_at, value)
+        self._entries: dict[str, tuple[float, Any]] = {}
+
+    def get(self, key: str) -> Optional[Any]:
+        entry = self._entries.get(key)
+        if entry is not None and entry[0] > time.monotonic():
+            self.hits += 1
+            return entry[1]
+        self.misses += 1
+        return None
+
+    def set(self, key: str, value: Any, version: int) -> bool:
+        """Store `value` if no invalidation happened since `version` was read"""
+        with self._lock:
+            if version != self.version:
+                return False
+            self._entries[key] = (time.monotonic() + self.ttl, value)
+            return True
+
+    def invalidate(self, *keys: str) -> None:
+        """Drop the given keys and what depends on them (all keys when none are given)"""
+        with self._lock:
+            self.version += 1
+            if not keys:
+                self._entries.clear()
+            for key in keys:
+                self._entries.pop(key, None)
+                for dependent in DEPENDENT_KEYS.get(key, ()):
+                    self._entries.pop(dependent, None)
+
+    def stats(self) -> dict:
+        return {
+            "version": self.version,
+            "hits": self.hits,
+            "misses": self.misses,
+            "keys": sorted(self._entries),
+        }
+
+
+catalog_cache = CatalogCache()
+metrics.register_cache("catalog", catalog_cache.stats)
+
+
+@dataclass(frozen=True)
+class CachedPayload:
+    """A response body encoded once, with its strong ETag"""
+    body: bytes
+    etag: str
+
+
+def encode_payload(content: Any) -> CachedPayload:
+    """Encode a dict or response model and derive a content-based ETag.
+
+    The ETag is a hash of the encoded body, so every serverless instance
+    computes the same tag for the same data version.
+    """
+    body = encode_json(content)
+    return CachedPayload(body=body, etag=f'"{hashlib.blake2b(body, digest_size=16).hexdigest()}"')
+
+
+def _etag_matches(request: Request, etag: str) -> bool:
+    header = request.headers.get("If-None-Match")
+    if not header:
+        return False
+    if header.strip() == "*":
+        return True
+    return etag in [tag.strip().removeprefix("W/") for tag in header.split(",")]
+
+
+def payload_response(request: Request, payload: CachedPayload, cache_status: str) -> Response:
+    """200 with the pre-encoded body, or 304 if the client already has it"""
+    headers = {
+        "ETag": payload.etag,
+        "Cache-Control": PUBLIC_CACHE_CONTROL,
+        "Vary": "Authorization",
+        "X-Cache": cache_status,
+    }
+    if _etag_matches(request, payload.etag):
+        return Response(status_code=304, headers=headers)
+    return Response(content=payload.body, media_type="application/json", headers=headers)
+
+
+def cached_payload_response(request: Request, key: str) -> Optional[Response]:
+    """Serve `key` from memory, or None on a miss"""
+    payload = catalog_cache.get(key)
+    if payload is None:
+        return None
+    return payload_response(request, payload, "HIT")
+
+
+def store_payload_response(request: Request, key: str, content: Any, version: int) -> Response:
+    """Encode `content`, cache it under `key` and respond with it"""
+    payload = encode_payload(content)
+    catalog_cache.set(key, payload, version)
+    return payload_response(request, payload, "MISS")
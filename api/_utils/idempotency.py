@@ -0,0 +1,160 @@
+"""Idempotency-Key support for POST endpoints (checkout).
+
+A client sends the same `Idempotency-Key` header on every retry of one
+logical request. The first request runs. Any duplicate that arrives while
+it is still running awaits the same result instead of running again. Once
+it succeeds, its response is kept in a bounded LRU that expires entries
+after IDEMPOTENCY_TTL, and later retries get that response back without
+touching the database (marked with `Idempotent-Replayed: true`).
+
+Reusing a key with a different body is rejected with 422. Failed requests
+are not stored, so the client can retry them with the same key.
+
+The LRU is per instance. With IDEMPOTENCY_STORE=table, handlers also pass
+the key to the database (see create_order in schema.sql), so a retry that
+lands on another serverless instance still finds the first order.
+"""
+import asyncio
+import hashlib
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Awaitable, Callable, Optional
+from fastapi import HTTPException, Request
+from . import metrics
+
+IDEMPOTENCY_HEADER = "Idempotency-Key"
+REPLAYED_HEADER = "Idempotent-Replayed"
+IDEMPOTENCY_TTL = float(os.getenv("IDEMPOTENCY_TTL", "86400"))
+IDEMPOTENCY_MAX_KEYS = int(os.getenv("IDEMPOTENCY_MAX_KEYS", "1024"))
+# "memory" (per instance) or "table" (also recorded by the database)
+IDEMPOTENCY_STORE = os.getenv("IDEMPOTENCY_STORE", "memory")
+MAX_KEY_LENGTH = 255
+
+
+def use_table() -> bool:
+    return IDEMPOTENCY_STORE == "table"
+
+
+def idempotency_key(request: Request) -> Optional[str]:
+    """The request's Idempotency-Key, if any (400 when malformed)"""
+    key = request.headers.get(IDEMPOTENCY_HEADER)
+    if key is None:
+        return None
+    key = key.strip()
+    if not key or len(key) > MAX_KEY_LENGTH or not key.isprintable():
+        raise HTTPException(status_code=400, detail=f"Invalid {IDEMPOTENCY_HEADER}")
+    return key
+
+
+def fingerprint(payload: Any) -> str:
+    """Stable hash of a request body, to spot a key reused for another request"""
+    raw = json.dumps(payload, sort_keys=True, separators=(",", ":"), default=str)
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+
+def key_conflict() -> HTTPException:
+    return HTTPException(
+        status_code=422,
+        detail=f"{IDEMPOTENCY_HEADER} was already used with a different request",
+    )
+
+
+@dataclass
+class StoredResponse:
+    fingerprint: str
+    content: Any
+    expires_at: float
+
+
+class IdempotencyStore:
+    """LRU of finished responses plus the requests still in flight, per key"""
+
+    def __init__(self, maxsize: int = IDEMPOTENCY_MAX_KEYS, ttl: float = IDEMPOTENCY_TTL):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.replayed = 0
+        self.coalesced = 0
+        # Keys seen for the first time (the request ran)
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._entries: "OrderedDict[str, StoredResponse]" = OrderedDict()
+        # key -> (fingerprint, future of the first request's content)
+        self._inflight: dict[str, tuple[str, asyncio.Future]] = {}
+
+    def get(self, key: str) -> Optional[StoredResponse]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            if entry.expires_at <= time.monotonic():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return entry
+
+    def put(self, key: str, request_hash: str, content: Any) -> None:
+        with self._lock:
+            self._entries[key] = StoredResponse(request_hash, content, time.monotonic() + self.ttl)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    async def run(self, key: str, request_hash: str, compute: Callable[[], Awaitable[Any]]) -> tuple:
+        """(content, replayed): run `compute` once per key and share its result"""
+        entry = self.get(key)
+        if entry is not None:
+            if entry.fingerprint != request_hash:
+                raise key_conflict()
+            self.replayed += 1
+            return entry.content, True
+
+        inflight = self._inflight.get(key)
+        if inflight is not None:
+            if inflight[0] != request_hash:
+                raise key_conflict()
+            self.coalesced += 1
+            # shield: a client that disconnects must not cancel the shared request
+            return await asyncio.shield(inflight[1]), True
+
+        self.misses += 1
+        future = asyncio.get_running_loop().create_future()
+        self._inflight[key] = (request_hash, future)
+        try:
+            content = await compute()
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except Exception as e:
+            future.set_exception(e)
+            # Mark it retrieved, in case no duplicate was waiting
+            future.exception()
+            raise
+        else:
+            self.put(key, request_hash, content)
+            future.set_result(content)
+            return content, False
+        finally:
+            self._inflight.pop(key, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> dict:
+        return {
+            "size": len(self._entries),
+            "inflight": len(self._inflight),
+            "replayed": self.replayed,
+            "coalesced": self.coalesced,
+            "misses": self.misses,
+        }
+
+
+idempotency_store = IdempotencyStore()
+metrics.register_cache(
+    "idempotency", idempotency_store.stats, {"hit": "replayed", "coalesced": "coalesced", "miss": "misses"}
+)
@@ -0,0 +1,255 @@
+"""Per-request performance metrics: latency histograms and Server-Timing.
+
+`MetricsMiddleware` opens a `RequestMetrics` for every HTTP request. The
+repository's `_execute` and the token verification in auth_middleware add
+their time to it. The totals so far go out in a `Server-Timing` header when
+the response starts, and once the body is sent (streamed exports keep
+querying after that) the request is recorded in Prometheus-style
+histograms, rendered by `render_prometheus` along with the hit and miss
+counts of the in-process caches registered with `register_cache`.
+Metrics are per process, so on Vercel each warm instance reports its
+own numbers.
+"""
+import threading
+import time
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from typing import Callable, Optional
+from .query_trace import trace_request
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+QUERY_COUNT_BUCKETS = (0, 1, 2, 3, 5, 10, 25, 50, 100)
+SIZE_BUCKETS = (256, 1024, 4096, 16384, 65536, 262144, 1048576, 4194304)
+
+# Route label for requests that matched no route (keeps label cardinality bounded)
+UNMATCHED_ROUTE = "unmatched"
+# cache_lookups_total result label -> key of the cache's stats() dict
+CACHE_RESULTS = {"hit": "hits", "miss": "misses"}
+
+
+@dataclass
+class RequestMetrics:
+    """Time spent by one request outside its own code"""
+    started: float = field(default_factory=time.perf_counter)
+    db_queries: int = 0
+    db_seconds: float = 0.0
+    auth_seconds: float = 0.0
+    query_durations: list = field(default_factory=list)
+
+
+_current: ContextVar[Optional[RequestMetrics]] = ContextVar("request_metrics", default=None)
+
+
+def record_query(seconds: float) -> None:
+    """Count one PostgREST round-trip against the current request"""
+    request = _current.get()
+    if request is not None:
+        request.db_queries += 1
+        request.db_seconds += seconds
+        request.query_durations.append(seconds)
+
+
+def record_auth(seconds: float) -> None:
+    request = _current.get()
+    if request is not None:
+        request.auth_seconds += seconds
+
+
+class Histogram:
+    """Cumulative-bucket histogram keyed by a label tuple"""
+
+    def __init__(self, name: str, help_text: str, labels: tuple, buckets: tuple):
+        self.name = name
+        self.help_text = help_text
+        self.labels = labels
+        self.buckets = buckets
+        # label values -> [bucket counts..., sum, count]
+        self._series: dict[tuple, list] = {}
+
+    def observe(self, label_values: tuple, value: float) -> None:
+        series = self._series.get(label_values)
+        if series is None:
+            series = self._series.setdefault(label_values, [0] * len(self.buckets) + [0.0, 0])
+        for i, bound in enumerate(self.buckets):
+            if value <= bound:
+                series[i] += 1
+        series[-2] += value
+        series[-1] += 1
+
+    def _labels(self, values: tuple, extra: str = "") -> str:
+        pairs = [f'{k}="{_escape(v)}"' for k, v in zip(self.labels, values)]
+        if extra:
+            pairs.append(extra)
+        return "{" + ",".join(pairs) + "}" if pairs else ""
+
+    def render(self) -> list:
+        lines = [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} histogram"]
+        for values, series in sorted(self._series.items()):
+            for bound, count in zip(self.buckets, series):
+                le = f'le="{bound:g}"'
+                lines.append(f"{self.name}_bucket{self._labels(values, le)} {count}")
+            inf = 'le="+Inf"'
+            lines.append(f"{self.name}_bucket{self._labels(values, inf)} {series[-1]}")
+            lines.append(f"{self.name}_sum{self._labels(values)} {series[-2]:.6f}")
+            lines.append(f"{self.name}_count{self._labels(values)} {series[-1]}")
+        return lines
+
+
+class Counter:
+    """Monotonic counter keyed by a label tuple"""
+
+    def __init__(self, name: str, help_text: str, labels: tuple):
+        self.name = name
+        self.help_text = help_text
+        self.labels = labels
+        self._series: dict[tuple, int] = {}
+
+    def inc(self, label_values: tuple, amount: int = 1) -> None:
+        self._series[label_values] = self._series.get(label_values, 0) + amount
+
+    def render(self) -> list:
+        lines = [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} counter"]
+        for values, count in sorted(self._series.items()):
+            pairs = ",".join(f'{k}="{_escape(v)}"' for k, v in zip(self.labels, values))
+            lines.append(f"{self.name}{{{pairs}}} {count}")
+        return lines
+
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+class MetricsRegistry:
+    """All histograms of this process"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.request_duration = Histogram(
+            "http_request_duration_seconds", "Time until the response body was sent, per route.",
+            ("method", "route", "status"), LATENCY_BUCKETS)
+        self.request_db = Histogram(
+            "http_request_db_seconds", "Time spent in Supabase .execute() calls per request.",
+            ("method", "route"), LATENCY_BUCKETS)
+        self.request_queries = Histogram(
+            "http_request_db_queries", "Supabase .execute() calls per request.",
+            ("method", "route"), QUERY_COUNT_BUCKETS)
+        self.query_duration = Histogram(
+            "db_query_duration_seconds", "Duration of each Supabase .execute() call.",
+            ("route",), LATENCY_BUCKETS)
+        self.request_auth = Histogram(
+            "http_request_auth_seconds", "Token verification time per request.",
+            ("method", "route"), LATENCY_BUCKETS)
+        self.response_size = Histogram(
+            "http_response_size_bytes", "Response body size.",
+            ("method", "route"), SIZE_BUCKETS)
+        self.single_flight = Counter(
+            "db_single_flight_requests_total",
+            "Coalesced reads per query: leader ran the query, collapsed shared a running one.",
+            ("query", "result"))
+        # cache name -> (its stats(), {result label: stats key}), read when rendering
+        self._caches: dict[str, tuple[Callable[[], dict], dict]] = {}
+
+    def observe_request(self, method: str, route: str, status: int, size: int, request: RequestMetrics) -> None:
+        duration = time.perf_counter() - request.started
+        with self._lock:
+            self.request_duration.observe((method, route, status), duration)
+            self.request_db.observe((method, route), request.db_seconds)
+            self.request_queries.observe((method, route), request.db_queries)
+            self.request_auth.observe((method, route), request.auth_seconds)
+            self.response_size.observe((method, route), size)
+            for seconds in request.query_durations:
+                self.query_duration.observe((route,), seconds)
+
+    def render_prometheus(self) -> str:
+        with self._lock:
+            caches = sorted(self._caches.items())
+        # The caches count their own lookups; read them outside our lock
+        lookups = Counter(
+            "cache_lookups_total", "In-process cache lookups per cache and result.", ("cache", "result"))
+        for name, (stats, results) in caches:
+            values = stats()
+            for result, key in results.items():
+                lookups.inc((name, result), values[key])
+        with self._lock:
+            lines = []
+            for histogram in (self.request_duration, self.request_db, self.request_queries,
+                              self.query_duration, self.request_auth, self.response_size):
+                lines.extend(histogram.render())
+            lines.extend(self.single_flight.render())
+        lines.extend(lookups.render())
+        return "\n".join(lines) + "\n"
+
+    def register_cache(self, name: str, stats: Callable[[], dict], results: dict) -> None:
+        with self._lock:
+            self._caches[name] = (stats, results)
+
+    def record_single_flight(self, query: str, result: str) -> None:
+        with self._lock:
+            self.single_flight.inc((query, result))
+
+
+metrics = MetricsRegistry()
+
+
+def record_single_flight(query: str, result: str) -> None:
+    """Count one coalesced read (result: leader or collapsed)"""
+    metrics.record_single_flight(query, result)
+
+
+def register_cache(name: str, stats: Callable[[], dict], results: dict = CACHE_RESULTS) -> None:
+    """Export the counters of a cache's stats() as cache_lookups_total{cache=name}"""
+    metrics.register_cache(name, stats, results)
+
+
+def server_timing(total: float, request: RequestMetrics) -> str:
+    """Server-Timing value: app total, DB round-trips and auth (milliseconds)"""
+    return ", ".join([
+        f"app;dur={total * 1000:.1f}",
+        f'db;dur={request.db_seconds * 1000:.1f};desc="{request.db_queries} queries"',
+        f"auth;dur={request.auth_seconds * 1000:.1f}",
+    ])
+
+
+def _route_label(scope) -> str:
+    route = scope.get("route")
+    return getattr(route, "path", None) or UNMATCHED_ROUTE
+
+
+class MetricsMiddleware:
+    """ASGI middleware recording per-route latency, DB calls, auth time and response size"""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        request = RequestMetrics()
+        token = _current.set(request)
+        status = 500
+        size = 0
+
+        async def send_with_metrics(message):
+            nonlocal status, size
+            if message["type"] == "http.response.start":
+                # Last chance for a strict budget to fail the request instead of the stream
+                trace.name = f"{scope['method']} {_route_label(scope)}"
+                trace.check()
+                status = message["status"]
+                timing = server_timing(time.perf_counter() - request.started, request)
+                message = {**message, "headers": [*message.get("headers", []), (b"server-timing", timing.encode("latin-1"))]}
+            elif message["type"] == "http.response.body":
+                size += len(message.get("body", b""))
+            await send(message)
+
+        with trace_request(f"{scope['method']} {scope['path']}") as trace:
+            try:
+                await self.app(scope, receive, send_with_metrics)
+            finally:
+                _current.reset(token)
+                # The route is only known once the router has matched it
+                route = _route_label(scope)
+                trace.name = f"{scope['method']} {route}"
+                metrics.observe_request(scope["method"], route, status, size, request)
@@ -0,0 +1,78 @@
+"""Keyset pagination helpers for the orders endpoints"""
+import base64
+import json
+from datetime import date, datetime, timedelta, timezone, tzinfo
+from typing import Optional
+from fastapi import HTTPException, Request
+
+ORDERS_PAGE_DEFAULT = 20
+ORDERS_PAGE_MAX = 100
+
+
+def encode_cursor(order: dict) -> str:
+    """Opaque cursor pointing just after `order` in (o_created_at, id) DESC order"""
+    raw = json.dumps([order["o_created_at"], order["id"]], separators=(",", ":")).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: Optional[str]) -> Optional[tuple]:
+    if not cursor:
+        return None
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        created_at, order_id = json.loads(raw)
+        # Both values end up inside a PostgREST filter, so only accept well-formed ones
+        datetime.fromisoformat(created_at)
+        if not all(ch.isalnum() or ch == "-" for ch in order_id):
+            raise ValueError(order_id)
+        return created_at, order_id
+    except (ValueError, TypeError):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+
+def _parse_bound(value: Optional[str], name: str, end_of_day: bool, tz: tzinfo) -> Optional[str]:
+    if not value:
+        return None
+    try:
+        if len(value) == 10:
+            # Plain date: `from` starts the day, `to` includes the whole day
+            day = date.fromisoformat(value)
+            if end_of_day:
+                day += timedelta(days=1)
+            return datetime(day.year, day.month, day.day, tzinfo=tz).isoformat()
+        parsed = datetime.fromisoformat(value.replace("Z", "+00:00"))
+        if parsed.tzinfo is None:
+            parsed = parsed.replace(tzinfo=tz)
+        return parsed.isoformat()
+    except ValueError:
+        raise HTTPException(status_code=400, detail=f"Invalid '{name}' date")
+
+
+def parse_date_range(request: Request, tz: tzinfo = timezone.utc) -> tuple:
+    """`from` / `to` query params as ISO timestamps ([from, to) range)
+
+    Dates and times without an offset are read in `tz`.
+    """
+    params = request.query_params
+    return (
+        _parse_bound(params.get("from"), "from", end_of_day=False, tz=tz),
+        _parse_bound(params.get("to"), "to", end_of_day=True, tz=tz),
+    )
+
+
+def parse_page_size(request: Request, default: int = ORDERS_PAGE_DEFAULT, maximum: int = ORDERS_PAGE_MAX) -> int:
+    value = request.query_params.get("limit")
+    if not value:
+        return default
+    try:
+        size = int(value)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid 'limit'")
+    return max(1, min(size, maximum))
+
+
+def parse_flag(request: Request, name: str, default: Optional[bool]) -> Optional[bool]:
+    value = request.query_params.get(name)
+    if value is None:
+        return default
+    return value.lower() not in ("0", "false", "no")
@@ -0,0 +1,134 @@
+"""Query tracing and per-request query budgets (catches N+1 round-trips).
+
+Every query run through `repository._execute` is recorded as a
+`QueryRecord` (method, table, filters, duration) in each active trace.
+MetricsMiddleware opens one trace per HTTP request with a budget of
+QUERY_BUDGET queries; going over it logs a warning with the queries
+issued, or raises `QueryBudgetExceeded` when QUERY_BUDGET_STRICT=1.
+The budget is checked when the handler starts its response, so a strict
+failure replaces the response instead of following it; queries a
+streamed body makes afterwards are checked once the body is sent, when
+a strict failure can only abort the stream.
+
+Handlers that page through data on purpose (the order export) lift the
+budget of their own request with `set_request_budget(None)`.
+
+Tests cap the queries of any block with the `query_budget` fixture from
+the root conftest.py, which makes budgets strict:
+
+    async def test_checkout_is_one_round_trip(query_budget):
+        with query_budget(1) as trace:
+            await client.post("/api/checkout", json=cart)
+"""
+import logging
+import os
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from typing import Optional
+
+logger = logging.getLogger(__name__)
+
+QUERY_BUDGET = int(os.getenv("QUERY_BUDGET", "5"))
+QUERY_BUDGET_STRICT = os.getenv("QUERY_BUDGET_STRICT", "0") == "1"
+
+# Query params that shape the result rather than filter rows
+_NON_FILTER_PARAMS = {"select", "order", "limit", "offset", "on_conflict", "columns"}
+
+
+class QueryBudgetExceeded(AssertionError):
+    """A traced block issued more queries than its budget"""
+
+
+@dataclass(frozen=True)
+class QueryRecord:
+    method: str
+    table: str
+    filters: str
+    duration: float
+
+    def __str__(self) -> str:
+        filters = f" ?{self.filters}" if self.filters else ""
+        return f"{self.method} {self.table}{filters} ({self.duration * 1000:.1f}ms)"
+
+
+@dataclass
+class QueryTrace:
+    name: str
+    budget: Optional[int] = None
+    # None follows QUERY_BUDGET_STRICT at check time
+    strict: Optional[bool] = None
+    queries: list = field(default_factory=list)
+    # Query count at the last over-budget report, so each overrun is reported once
+    reported: int = 0
+
+    @property
+    def count(self) -> int:
+        return len(self.queries)
+
+    def check(self) -> None:
+        """Warn (or raise when strict) if the budget was exceeded"""
+        if self.budget is None or self.count <= self.budget or self.count == self.reported:
+            return
+        self.reported = self.count
+        message = f"{self.name} issued {self.count} queries (budget {self.budget}):\n" + "\n".join(
+            f"  {query}" for query in self.queries
+        )
+        if QUERY_BUDGET_STRICT if self.strict is None else self.strict:
+            raise QueryBudgetExceeded(message)
+        logger.warning(message)
+
+
+_traces: ContextVar[tuple] = ContextVar("query_traces", default=())
+_request_trace: ContextVar[Optional[QueryTrace]] = ContextVar("request_query_trace", default=None)
+
+
+def describe(query, duration: float) -> QueryRecord:
+    """Method, table and row filters of a postgrest request builder"""
+    request = getattr(query, "request", None)
+    method = getattr(getattr(request, "http_method", None), "value", None) or str(getattr(request, "http_method", "?"))
+    path = str(getattr(request, "path", ""))
+    table = path.split("/rest/v1/", 1)[-1] or "?"
+    params = getattr(request, "params", None) or ()
+    filters = "&".join(f"{k}={v}" for k, v in params.multi_items() if k not in _NON_FILTER_PARAMS) if params else ""
+    return QueryRecord(method=method, table=table, filters=filters, duration=duration)
+
+
+def record(query, duration: float) -> None:
+    """Add a finished query to every active trace"""
+    traces = _traces.get()
+    if traces:
+        entry = describe(query, duration)
+        for trace in traces:
+            trace.queries.append(entry)
+
+
+@contextmanager
+def trace_queries(name: str = "block", budget: Optional[int] = None, strict: Optional[bool] = None):
+    """Record the queries issued inside the block; checks the budget on a clean exit"""
+    trace = QueryTrace(name=name, budget=budget, strict=strict)
+    token = _traces.set(_traces.get() + (trace,))
+    try:
+        yield trace
+    finally:
+        _traces.reset(token)
+    trace.check()
+
+
+@contextmanager
+def trace_request(name: str):
+    """Per-request trace used by MetricsMiddleware"""
+    with trace_queries(name, budget=QUERY_BUDGET) as trace:
+        token = _request_trace.set(trace)
+        try:
+            yield trace
+        finally:
+            _request_trace.reset(token)
+
+
+def set_request_budget(budget: Optional[int]) -> None:
+    """Change the query budget of the current request (None = unbounded)"""
+    trace = _request_trace.get()
+    if trace is not None:
+        trace.budget = budget
+
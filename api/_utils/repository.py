@@ -0,0 +1,399 @@
+"""Async data access layer for the Supabase tables.
+
+Handlers await these functions instead of calling the sync supabase-py
+client, so a slow PostgREST round-trip no longer blocks the event loop.
+Every query goes through `_execute`, which also times it for the
+per-request metrics and records it in the active query traces.
+
+Hot public reads are wrapped in `_catalog_read`: identical concurrent
+calls on a worker share one query (see single_flight).
+"""
+import time
+from typing import Iterable, Optional, List
+from . import metrics, query_trace
+from .catalog_cache import catalog_cache
+from .single_flight import coalesce
+from .supabase_client import (
+    get_async_supabase_client,
+    get_async_supabase_admin_client,
+    get_async_supabase_auth_client,
+)
+
+NIL_UUID = "00000000-0000-0000-0000-000000000000"
+
+
+async def _execute(query):
+    """Run a PostgREST query builder"""
+    started = time.perf_counter()
+    try:
+        return await query.execute()
+    finally:
+        elapsed = time.perf_counter() - started
+        metrics.record_query(elapsed)
+        query_trace.record(query, elapsed)
+
+
+def select_list(columns: Iterable[str], **embeds: Iterable[str]) -> str:
+    """PostgREST select string from column names and embedded relations.
+
+    select_list(("id", "p_name"), category=("c_name",)) -> "id,p_name,category(c_name)"
+    """
+    parts = list(columns)
+    parts += [f"{relation}({','.join(embedded)})" for relation, embedded in embeds.items()]
+    return ",".join(parts)
+
+
+def _catalog_read(name: str):
+    """Coalesce identical concurrent catalog reads, per catalog cache version"""
+    # Handlers snapshot catalog_cache.version right before the read, so a
+    # request that arrives after an admin write never gets the older rows
+    return coalesce(name, generation=lambda: catalog_cache.version)
+
+
+# ============== CATEGORIES ==============
+
+@_catalog_read("list_active_categories")
+async def list_active_categories(columns: str = "*") -> List[dict]:
+    supabase = get_async_supabase_client()
+    response = await _execute(
+        supabase.table("category").select(columns).eq("c_is_active", True).order("c_sort_order")
+    )
+    return response.data
+
+
+async def list_categories(columns: str = "*") -> List[dict]:
+    """Every category, active or not"""
+    supabase = get_async_supabase_admin_client()
+    response = await _execute(supabase.table("category").select(columns))
+    return response.data
+
+
+async def get_category(category_id: str, columns: str = "*") -> Optional[dict]:
+    supabase = get_async_supabase_client()
+    response = await _execute(supabase.table("category").select(columns).eq("id", category_id).single())
+    return response.data
+
+
+async def insert_category(row: dict) -> List[dict]:
+    supabase = get_async_supabase_admin_client()
+    response = await _execute(supabase.table("category").insert(row))
+    return response.data
+
+
+async def update_category(category_id: str, changes: dict) -> List[dict]:
+    supabase = get_async_supabase_admin_client()
+    response = await _execute(supabase.table("category").update(changes).eq("id", category_id))
+    return response.data
+
+
+async def delete_category(category_id: str):
+    supabase = get_async_supabase_admin_client()
+    return await _execute(supabase.table("category").delete().eq("id", category_id))
+
+
+# ============== PRODUCTS ==============
+
+@_catalog_read("list_products")
+async def list_products(
+    token: Optional[str] = None,
+    columns: str = "*, category(c_name)",
+    category_id: Optional[str] = None,
+    available: Optional[bool] = None,
+    featured: Optional[bool] = None,
+    search: Optional[str] = None,
+) -> List[dict]:
+    """Products in sort order; RLS-scoped to `token` when given.
+
+    `search` is an ILIKE pattern matched against p_name or p_description
+    (served by the trigram indexes in schema.sql).
+    """
+    supabase = get_async_supabase_client(token)
+    query = supabase.table("product").select(columns)
+    if category_id:
+        query = query.eq("p_category_id", category_id)
+    if available is not None:
+        query = query.eq("p_is_available", available)
+    if featured is not None:
+        query = query.eq("p_is_featured", featured)
+    if search:
+        query = query.or_(f"p_name.ilike.{search},p_description.ilike.{search}")
+    response = await _execute(query.order("p_sort_order"))
+    return response.data
+
+
+@_catalog_read("get_catalog_snapshot")
+async def get_catalog_snapshot() -> Optional[str]:
+    """The precomputed public menu as JSON text (see catalog_snapshot in schema.sql); None before its first refresh"""
+    supabase = get_async_supabase_client()
+    # As text: the client would otherwise walk the whole nested document in Python
+    response = await _execute(supabase.table("catalog_snapshot").select("cs_document::text").limit(1))
+    return response.data[0]["cs_document"] if response.data else None
+
+
+async def get_product(product_id: str, columns: str = "*, category(c_name)") -> Optional[dict]:
+    supabase = get_async_supabase_admin_client()
+    response = await _execute(
+        supabase.table("product").select(columns).eq("id", product_id).single()
+    )
+    return response.data
+
+
+async def get_products_by_ids(product_ids: List[str], columns: str = "id, p_name, p_price") -> List[dict]:
+    """Just what pricing a cart needs, by default"""
+    supabase = get_async_supabase_admin_client()
+    response = await _execute(supabase.table("product").select(columns).in_("id", product_ids))
+    return response.data
+
+
+async def insert_product(row: dict) -> List[dict]:
+    supabase = get_async_supabase_admin_client()
+    response = await _execute(supabase.table("product").insert(row))
+    return response.data
+
+
+async def insert_products(rows: List[dict]) -> List[dict]:
+    """Many products in one INSERT; the rows come back in the same order"""
+    supabase = get_async_supabase_admin_client()
+    response = await _execute(supabase.table("product").insert(rows))
+    return response.data
+
+
+async def update_products_partial(items: List[dict]) -> List[str]:
+    """Apply every {id, p_<column>: value} in one UPDATE, leaving other columns as they are; returns the ids updated"""
+    supabase = get_async_supabase_admin_client()
+    response = await _execute(supabase.rpc("update_products_partial", {"items": items}))
+    return response.data or []
+
+
+async def update_product(product_id: str, changes: dict) -> List[dict]:
+    supabase = get_async_supabase_admin_client()
+    response = await _execute(supabase.table("product").update(changes).eq("id", product_id))
+    return response.data
+
+
+async def delete_product(product_id: str):
+    supabase = get_async_supabase_admin_client()
+    return await _execute(supabase.table("product").delete().eq("id", product_id))
+
+
+async def delete_products_by_category(category_id: str):
+    supabase = get_async_supabase_admin_client()
+    return await _execute(supabase.table("product").delete().eq("p_category_id", category_id))
+
+
+# ============== BATCH ==============
+
+async def update_products(product_ids: List[str], changes: dict) -> List[dict]:
+    """The same changes on every product in `product_ids`, in one UPDATE"""
+    supabase = get_async_supabase_admin_client()
+    response = await _execute(supabase.table("product").update(changes).in_("id", product_ids))
+    return response.data
+
+
+async def delete_products(product_ids: List[str]) -> List[dict]:
+    supabase = get_async_supabase_admin_client()
+    response = await _execute(supabase.table("product").delete().in_("id", product_ids))
+    return response.data
+
+
+async def adjust_product_prices(product_ids: List[str], percent: float) -> List[str]:
+    """Scale prices by (1 + percent / 100) in one UPDATE; returns the ids updated"""
+    supabase = get_async_supabase_admin_client()
+    response = await _execute(supabase.rpc("adjust_product_prices", {"ids": product_ids, "percent": percent}))
+    return response.data or []
+
+
+# ============== REORDER ==============
+
+async def reorder_categories(items: List[dict], only_changed: bool = True) -> int:
+    """Apply every {id, sort_order} in one atomic database call; returns rows written"""
+    supabase = get_async_supabase_admin_client()
+    response = await _execute(supabase.rpc("reorder_categories", {"items": items, "only_changed": only_changed}))
+    return response.data or 0
+
+
+async def reorder_products(items: List[dict], only_changed: bool = True) -> int:
+    """Apply every {id, sort_order} in one atomic database call; returns rows written"""
+    supabase = get_async_supabase_admin_client()
+    response = await _execute(supabase.rpc("reorder_products", {"items": items, "only_changed": only_changed}))
+    return response.data or 0
+
+
+# ============== ORDERS ==============
+
+async def list_orders_page(
+    limit: int,
+    after: Optional[tuple] = None,
+    date_from: Optional[str] = None,
+    date_to: Optional[str] = None,
+    customer: Optional[str] = None,
+    include_items: bool = True,
+    columns: str = "*",
+    item_columns: str = "*",
+) -> List[dict]:
+    """One keyset page of orders, newest first.
+
+    `after` is the (o_created_at, id) of the last order already seen; the
+    (o_created_at DESC, id DESC) ordering is served by idx_order_created.
+    The cursor needs `o_created_at` and `id` in `columns`.
+    """
+    supabase = get_async_supabase_admin_client()
+    query = supabase.table("order").select(f"{columns}, order_item({item_columns})" if include_items else columns)
+    if date_from:
+        query = query.gte("o_created_at", date_from)
+    if date_to:
+        query = query.lt("o_created_at", date_to)
+    if customer:
+        query = query.ilike("o_customer_name", f"%{customer}%")
+    if after:
+        created_at, order_id = after
+        query = query.or_(
+            f'o_created_at.lt."{created_at}",and(o_created_at.eq."{created_at}",id.lt.{order_id})'
+        )
+    response = await _execute(
+        query.order("o_created_at", desc=True).order("id", desc=True).limit(limit)
+    )
+    return response.data
+
+
+async def insert_order(row: dict) -> List[dict]:
+    supabase = get_async_supabase_admin_client()
+    response = await _execute(supabase.table("order").insert(row))
+    return response.data
+
+
+async def insert_order_items(rows: List[dict]) -> List[dict]:
+    supabase = get_async_supabase_admin_client()
+    response = await _execute(supabase.table("order_item").insert(rows))
+    return response.data
+
+
+async def create_order(
+    customer_name: str,
+    items: List[dict],
+    request_key: Optional[str] = None,
+    request_hash: Optional[str] = None,
+    ttl_seconds: Optional[int] = None,
+) -> Optional[dict]:
+    """Price the cart and write the order with its items in one transaction.
+
+    `items` are {product_id, quantity}; returns {order_id, total, items}
+    or None when no product in the cart exists. With `request_key`
+    the database replays the order already created for that key
+    ({..., "replayed": true}) or returns {"conflict": true} when the key
+    was used with another `request_hash`.
+    """
+    params = {"customer_name": customer_name, "items": items}
+    if request_key is not None:
+        params.update(request_key=request_key, request_hash=request_hash)
+        if ttl_seconds is not None:
+            params["ttl_seconds"] = ttl_seconds
+    supabase = get_async_supabase_admin_client()
+    response = await _execute(supabase.rpc("create_order", params))
+    return response.data
+
+
+async def order_analytics(
+    date_from: str,
+    date_to: str,
+    bucket: str = "day",
+    top_limit: int = 10,
+    time_zone: str = "UTC",
+) -> dict:
+    """Sales totals for [date_from, date_to), aggregated by the database.
+
+    Returns {summary, revenue (per bucket), top_by_quantity, top_by_revenue};
+    see order_analytics in schema.sql.
+    """
+    supabase = get_async_supabase_admin_client()
+    response = await _execute(supabase.rpc("order_analytics", {
+        "date_from": date_from,
+        "date_to": date_to,
+        "bucket": bucket,
+        "top_limit": top_limit,
+        "time_zone": time_zone,
+    }))
+    return response.data
+
+
+async def delete_all_orders():
+    """Delete every order_item and then every order"""
+    supabase = get_async_supabase_admin_client()
+    await _execute(supabase.table("order_item").delete().neq("id", NIL_UUID))
+    await _execute(supabase.table("order").delete().neq("id", NIL_UUID))
+
+
+# ============== ABOUT ==============
+
+@_catalog_read("get_about")
+async def get_about(columns: str = "*") -> Optional[dict]:
+    supabase = get_async_supabase_client()
+    response = await _execute(supabase.table("about").select(columns).limit(1))
+    return response.data[0] if response.data else None
+
+
+async def get_about_id() -> Optional[str]:
+    supabase = get_async_supabase_admin_client()
+    response = await _execute(supabase.table("about").select("id").limit(1))
+    return response.data[0]["id"] if response.data else None
+
+
+async def update_about(about_id: str, changes: dict) -> List[dict]:
+    supabase = get_async_supabase_admin_client()
+    response = await _execute(supabase.table("about").update(changes).eq("id", about_id))
+    return response.data
+
+
+async def insert_about(row: dict) -> List[dict]:
+    supabase = get_async_supabase_admin_client()
+    response = await _execute(supabase.table("about").insert(row))
+    return response.data
+
+
+# ============== ADMIN ==============
+
+async def get_admin(admin_id: str, active_only: bool = False, columns: str = "*") -> Optional[dict]:
+    supabase = get_async_supabase_admin_client()
+    query = supabase.table("admin").select(columns).eq("id", admin_id)
+    if active_only:
+        query = query.eq("a_is_active", True)
+    response = await _execute(query)
+    return response.data[0] if response.data else None
+
+
+async def insert_admin(row: dict) -> List[dict]:
+    supabase = get_async_supabase_admin_client()
+    response = await _execute(supabase.table("admin").insert(row))
+    return response.data
+
+
+async def update_admin(admin_id: str, changes: dict) -> List[dict]:
+    supabase = get_async_supabase_admin_client()
+    response = await _execute(supabase.table("admin").update(changes).eq("id", admin_id))
+    return response.data
+
+
+# ============== AUTH ==============
+
+async def sign_in(email: str, password: str):
+    supabase = get_async_supabase_auth_client()
+    return await supabase.auth.sign_in_with_password({"email": email, "password": password})
+
+
+async def sign_up(email: str, password: str, name: Optional[str] = None):
+    supabase = get_async_supabase_auth_client()
+    return await supabase.auth.sign_up({
+        "email": email,
+        "password": password,
+        "options": {"data": {"name": name}}
+    })
+
+
+async def sign_out():
+    supabase = get_async_supabase_auth_client()
+    await supabase.auth.sign_out()
+
+
+async def delete_auth_user(user_id: str):
+    supabase = get_async_supabase_admin_client()
+    await supabase.auth.admin.delete_user(user_id)
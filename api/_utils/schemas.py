@@ -0,0 +1,222 @@
+"""Typed response schemas and their fast JSON encoding.
+
+Handlers validate PostgREST rows straight into these schemas and return
+them as `ModelResponse`, so there is no per-field Python loop and no stdlib
+`json.dumps`: pydantic-core (Rust) validates and encodes the whole body.
+
+Row shapes are TypedDicts. pydantic-core validates them into plain dicts,
+which costs about what the old dict comprehensions did, while a BaseModel
+per row would allocate one object per product or order line. The
+envelopes (`ProductList`, `OrderPage`, ...) are BaseModels, one per
+response.
+
+The field names are the JSON keys the frontend already reads, and
+nullable columns stay nullable. A field's `validation_alias` names the
+column it comes from (the field name by default), so `select_for(Row)`
+gives the PostgREST select list for the response and the projection is
+declared only once.
+"""
+from typing import Annotated, Any, List, Optional, get_type_hints
+from fastapi.responses import JSONResponse
+from pydantic import AliasPath, BaseModel, BeforeValidator, ConfigDict, Field
+from pydantic.fields import FieldInfo
+from pydantic_core import to_json
+from typing_extensions import TypedDict
+
+
+def encode_json(content: Any) -> bytes:
+    """Compact UTF-8 JSON of dicts, lists and models (NaN/Infinity become null)"""
+    return to_json(content, inf_nan_mode="null")
+
+
+class ModelResponse(JSONResponse):
+    """JSONResponse that encodes with pydantic-core instead of json.dumps"""
+
+    def render(self, content: Any) -> bytes:
+        return encode_json(content)
+
+
+def _sources(row: type) -> list:
+    """Where each field is read from: a column name or an AliasPath into an embed"""
+    sources = []
+    for name, hint in get_type_hints(row, include_extras=True).items():
+        aliases = [
+            meta.validation_alias for meta in getattr(hint, "__metadata__", ())
+            if isinstance(meta, FieldInfo) and meta.validation_alias is not None
+        ]
+        sources.append(aliases[0] if aliases else name)
+    return sources
+
+
+def select_for(row: type) -> str:
+    """PostgREST select list with exactly the columns `row` is built from.
+
+    select_for(ProductOut) -> "id,p_name,...,p_sort_order,category(c_name)"
+    """
+    columns = [source for source in _sources(row) if isinstance(source, str)]
+    embeds: dict = {}
+    for source in _sources(row):
+        if isinstance(source, AliasPath):
+            relation, embedded = source.path
+            embeds.setdefault(relation, []).append(embedded)
+    return ",".join(columns + [f"{relation}({','.join(embedded)})" for relation, embedded in embeds.items()])
+
+
+def _column(name: str) -> FieldInfo:
+    return Field(validation_alias=name)
+
+
+# NULL numerics were always sent as 0
+Amount = Annotated[float, BeforeValidator(lambda value: value or 0)]
+
+
+# ============== CATALOG ==============
+
+class CategoryOut(TypedDict):
+    id: str
+    c_name: str
+    c_description: Optional[str]
+    c_image_url: Optional[str]
+    c_is_active: Optional[bool]
+    c_sort_order: Optional[int]
+
+
+# Under its category in GET /api/catalog, so without category_name
+class CatalogProductOut(TypedDict):
+    id: str
+    p_name: str
+    p_description: Optional[str]
+    p_price: Amount
+    p_image_url: Optional[str]
+    p_is_available: Optional[bool]
+    p_is_featured: Optional[bool]
+    p_category_id: Optional[str]
+    p_sort_order: Optional[int]
+
+
+class ProductOut(CatalogProductOut):
+    # None when the product has no category
+    category_name: Annotated[Optional[str], Field(None, validation_alias=AliasPath("category", "c_name"))]
+
+
+class CategoryList(BaseModel):
+    success: bool = True
+    categories: List[CategoryOut]
+
+
+class CategoryDetail(BaseModel):
+    success: bool = True
+    category: CategoryOut
+
+
+class ProductList(BaseModel):
+    success: bool = True
+    products: List[ProductOut]
+
+
+class ProductDetail(BaseModel):
+    success: bool = True
+    product: ProductOut
+
+
+class CatalogCategoryOut(CategoryOut):
+    products: List[CatalogProductOut]
+
+
+class Catalog(BaseModel):
+    success: bool = True
+    categories: List[CatalogCategoryOut]
+
+
+# ============== ORDERS ==============
+
+class OrderItemOut(TypedDict):
+    id: str
+    oi_product_id: Optional[str]
+    oi_product_name: str
+    oi_product_price: float
+    oi_quantity: int
+    oi_subtotal: float
+
+
+class OrderOut(TypedDict):
+    id: str
+    o_customer_name: str
+    o_customer_order: Optional[str]
+    o_total: Amount
+    # Kept as the ISO string PostgREST sent, so it round-trips into the cursor unchanged
+    o_created_at: str
+
+
+class OrderWithItemsOut(OrderOut):
+    order_item: List[OrderItemOut]
+
+
+class OrderPage(BaseModel):
+    success: bool = True
+    orders: List[OrderOut]
+    next_cursor: Optional[str] = None
+
+
+class OrderPageWithItems(OrderPage):
+    orders: List[OrderWithItemsOut]
+
+
+class SalesSummary(TypedDict):
+    orders: int
+    revenue: float
+    average_ticket: float
+    items_sold: int
+
+
+class RevenuePeriod(TypedDict):
+    # First day of the period, in the shop's time zone
+    period: str
+    orders: int
+    revenue: float
+
+
+class ProductSales(TypedDict):
+    # None once the product was deleted
+    product_id: Optional[str]
+    product_name: str
+    quantity: int
+    revenue: float
+
+
+class OrderAnalytics(BaseModel):
+    success: bool = True
+    date_from: str
+    date_to: str
+    bucket: str
+    summary: SalesSummary
+    revenue: List[RevenuePeriod]
+    top_by_quantity: List[ProductSales]
+    top_by_revenue: List[ProductSales]
+
+
+# ============== ABOUT ==============
+
+class AboutOut(TypedDict):
+    # Also accepts its own field names, so a validated AboutOut can go into AboutResponse
+    __pydantic_config__ = ConfigDict(validate_by_name=True)
+
+    id: str
+    name: Annotated[str, _column("ab_name")]
+    photo_url: Annotated[Optional[str], _column("ab_photo_url")]
+    title: Annotated[Optional[str], _column("ab_title")]
+    story: Annotated[Optional[str], _column("ab_story")]
+    specialty: Annotated[Optional[str], _column("ab_specialty")]
+    experience_years: Annotated[Optional[int], _column("ab_experience_years")]
+    quote: Annotated[Optional[str], _column("ab_quote")]
+    instagram: Annotated[Optional[str], _column("ab_instagram")]
+    whatsapp: Annotated[Optional[str], _column("ab_whatsapp")]
+    email: Annotated[Optional[str], _column("ab_email")]
+    city: Annotated[Optional[str], _column("ab_city")]
+    accepts_orders: Annotated[Optional[bool], _column("ab_accepts_orders")]
+    delivery_areas: Annotated[Optional[str], _column("ab_delivery_areas")]
+
+
+class AboutResponse(BaseModel):
+    success: bool = True
+    about: Optional[AboutOut] = None
@@ -0,0 +1,82 @@
+"""Single-flight coalescing for hot, identical reads.
+
+When many requests on one worker ask for the same data at the same moment
+(a cold catalog cache right after the menu is shared), only the first one
+runs the query. The others await the same task and get the same result.
+A flight ends when its query finishes, so nothing is cached here. The
+catalog cache keeps handling repeated reads; this module only collapses
+the stampede that reaches the database.
+
+Callers share the result objects and must not mutate them. Per query, the
+`db_single_flight_requests_total` counter in /api/_metrics and
+`single_flight.stats()` count the calls that ran the query (leader) and
+the calls that shared one (collapsed). SINGLE_FLIGHT=0 turns it off.
+"""
+import asyncio
+import os
+from collections import defaultdict
+from functools import wraps
+from typing import Any, Awaitable, Callable, Optional
+from . import metrics
+
+SINGLE_FLIGHT = os.getenv("SINGLE_FLIGHT", "1") == "1"
+
+
+class SingleFlight:
+    """In-flight calls by key; later identical calls await the first one"""
+
+    def __init__(self, enabled: bool = SINGLE_FLIGHT):
+        self.enabled = enabled
+        self._calls: dict[tuple, asyncio.Task] = {}
+        # query name -> {"leader": n, "collapsed": n}
+        self._counts: dict[str, dict] = defaultdict(lambda: {"leader": 0, "collapsed": 0})
+
+    async def do(self, name: str, key: tuple, fn: Callable[[], Awaitable[Any]]) -> Any:
+        if not self.enabled:
+            return await fn()
+
+        call = (name, key)
+        task = self._calls.get(call)
+        if task is None:
+            # A task, so the query finishes for the others even if its leader is cancelled
+            task = asyncio.ensure_future(fn())
+            self._calls[call] = task
+            task.add_done_callback(lambda done: self._finish(call, done))
+            result = "leader"
+        else:
+            result = "collapsed"
+        self._counts[name][result] += 1
+        metrics.record_single_flight(name, result)
+        return await asyncio.shield(task)
+
+    def _finish(self, call: tuple, task: asyncio.Task) -> None:
+        if self._calls.get(call) is task:
+            del self._calls[call]
+        if not task.cancelled():
+            # Retrieved here too, in case every caller was cancelled
+            task.exception()
+
+    def stats(self) -> dict:
+        return {
+            "inflight": len(self._calls),
+            "queries": {name: dict(counts) for name, counts in self._counts.items()},
+        }
+
+
+single_flight = SingleFlight()
+
+
+def coalesce(name: str, generation: Optional[Callable[[], Any]] = None):
+    """Decorator: identical concurrent calls of an async function share one run.
+
+    Calls are identical when their arguments match. When given,
+    `generation()` is part of the key too, so callers that arrive after a
+    write (a new generation) never join a read that started before it.
+    """
+    def decorator(fn):
+        @wraps(fn)
+        async def wrapper(*args, **kwargs):
+            key = (args, tuple(sorted(kwargs.items())), generation() if generation else None)
+            return await single_flight.do(name, key, lambda: fn(*args, **kwargs))
+        return wrapper
+    return decorator
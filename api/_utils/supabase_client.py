@@ -1,27 +1,312 @@
 """Supabase client for backend"""
+import asyncio
 import os
+import threading
+import time
+from collections import OrderedDict
 from pathlib import Path
-from supabase import create_client, Client
-from dotenv import load_dotenv
+from typing import TYPE_CHECKING, Optional, Union
 
-# Load .env from project root
+import httpx
+
+if TYPE_CHECKING:
+    from supabase import Client, AsyncClient
+
+# Load .env from project root (there is none on Vercel, so skip importing dotenv)
 env_path = Path(__file__).resolve().parent.parent.parent / ".env"
-load_dotenv(dotenv_path=env_path)
+if env_path.is_file():
+    from dotenv import load_dotenv
+    load_dotenv(dotenv_path=env_path)
 
 SUPABASE_URL = os.getenv("SUPABASE_URL")
 SUPABASE_ANON_KEY = os.getenv("SUPABASE_ANON_KEY")
 SUPABASE_SERVICE_ROLE_KEY = os.getenv("SUPABASE_SERVICE_ROLE_KEY")
 
+# Connection pool shared by every pooled client (keep-alive to PostgREST/GoTrue)
+SUPABASE_POOL_SIZE = int(os.getenv("SUPABASE_POOL_SIZE", "20"))
+SUPABASE_POOL_IDLE_TIMEOUT = float(os.getenv("SUPABASE_POOL_IDLE_TIMEOUT", "30"))
+SUPABASE_HTTP_TIMEOUT = float(os.getenv("SUPABASE_HTTP_TIMEOUT", "10"))
+# Upper bound for RLS-scoped clients kept per user token
+SUPABASE_TOKEN_CLIENTS_MAX = int(os.getenv("SUPABASE_TOKEN_CLIENTS_MAX", "128"))
+# Import supabase and build its sub-clients only on first use (0 = eager, at import)
+SUPABASE_LAZY_INIT = os.getenv("SUPABASE_LAZY_INIT", "1") != "0"
+
+ROLE_ANON = "anon"
+ROLE_ADMIN = "admin"
+
+AnyClient = Union["Client", "AsyncClient", "LazyClient"]
+
+
+class LazyClient:
+    """Supabase client stand-in that builds its sub-clients on first use.
+
+    `table` / `rpc` go to a bare PostgREST client, which is all most requests
+    need. The full supabase client (GoTrue auth, realtime, storage) and its
+    imports are only paid for when another attribute, such as `auth`, is used.
+    """
+
+    def __init__(self, registry: "ClientRegistry", key: str, bearer: str, is_async: bool):
+        self._registry = registry
+        self._key = key
+        self._bearer = bearer
+        self._is_async = is_async
+        self._postgrest = None
+        self._client = None
+
+    @property
+    def postgrest(self):
+        if self._postgrest is None:
+            # Same headers the supabase client gives its PostgREST client
+            headers = {"apiKey": self._key, "Authorization": f"Bearer {self._bearer}"}
+            rest_url = f"{self._registry.url.rstrip('/')}/rest/v1"
+            if self._is_async:
+                from postgrest import AsyncPostgrestClient
+                self._postgrest = AsyncPostgrestClient(
+                    rest_url, headers=headers, http_client=self._registry.async_http_client()
+                )
+            else:
+                from postgrest import SyncPostgrestClient
+                self._postgrest = SyncPostgrestClient(
+                    rest_url, headers=headers, http_client=self._registry.http_client()
+                )
+        return self._postgrest
+
+    def table(self, table_name: str):
+        return self.postgrest.from_(table_name)
+
+    from_ = table
+
+    def rpc(self, fn: str, params: Optional[dict] = None, *args, **kwargs):
+        return self.postgrest.rpc(fn, params or {}, *args, **kwargs)
+
+    def __getattr__(self, name: str):
+        if self._client is None:
+            self._client = self._registry.build_full(self._key, self._bearer, self._is_async)
+        return getattr(self._client, name)
+
+
+class ClientRegistry:
+    """Process-wide registry of long-lived Supabase clients.
+
+    Clients are keyed by role (anon / service role) or by the caller's JWT
+    for RLS-scoped reads, and all of them share a single keep-alive HTTP pool
+    (one for sync clients, one for async clients).
+    Pooled clients are never re-authenticated after creation: the token is
+    baked into the client headers, so one caller's token can't leak to another.
+
+    `transport` / `async_transport` replace the network transport of the
+    shared pools (used by the offline benchmarks).
+    """
+
+    def __init__(
+        self,
+        url: Optional[str],
+        anon_key: Optional[str],
+        service_role_key: Optional[str],
+        pool_size: int = SUPABASE_POOL_SIZE,
+        idle_timeout: float = SUPABASE_POOL_IDLE_TIMEOUT,
+        max_token_clients: int = SUPABASE_TOKEN_CLIENTS_MAX,
+        transport: Optional[httpx.BaseTransport] = None,
+        async_transport: Optional[httpx.AsyncBaseTransport] = None,
+    ):
+        self.url = url
+        self.anon_key = anon_key
+        self.service_role_key = service_role_key
+        self.pool_size = pool_size
+        self.idle_timeout = idle_timeout
+        self.max_token_clients = max_token_clients
+        self.transport = transport
+        self.async_transport = async_transport
+        self._lock = threading.Lock()
+        self._http: Optional[httpx.Client] = None
+        self._async_http: Optional[httpx.AsyncClient] = None
+        self._async_loop: Optional[asyncio.AbstractEventLoop] = None
+        # (role, is_async) -> client
+        self._clients: dict[tuple[str, bool], AnyClient] = {}
+        # (token, is_async) -> (client, last_used)
+        self._token_clients: "OrderedDict[tuple[str, bool], tuple[AnyClient, float]]" = OrderedDict()
+
+    def _limits(self) -> httpx.Limits:
+        return httpx.Limits(
+            max_connections=self.pool_size,
+            max_keepalive_connections=self.pool_size,
+            keepalive_expiry=self.idle_timeout,
+        )
+
+    def http_client(self) -> httpx.Client:
+        """Shared keep-alive HTTP client used by every pooled sync client"""
+        with self._lock:
+            if self._http is None or self._http.is_closed:
+                self._http = httpx.Client(
+                    limits=self._limits(),
+                    timeout=SUPABASE_HTTP_TIMEOUT,
+                    follow_redirects=True,
+                    transport=self.transport,
+                )
+            return self._http
+
+    def async_http_client(self) -> httpx.AsyncClient:
+        """Shared keep-alive HTTP client used by every pooled async client.
+
+        Async connections belong to the event loop that opened them, so the
+        pool (and the async clients built on it) is rebuilt if the loop changes.
+        """
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            loop = None
+        with self._lock:
+            if self._async_http is None or self._async_http.is_closed or loop is not self._async_loop:
+                self._async_http = httpx.AsyncClient(
+                    limits=self._limits(),
+                    timeout=SUPABASE_HTTP_TIMEOUT,
+                    follow_redirects=True,
+                    transport=self.async_transport,
+                )
+                self._async_loop = loop
+                for key in [k for k in self._clients if k[1]]:
+                    del self._clients[key]
+                for key in [k for k in self._token_clients if k[1]]:
+                    del self._token_clients[key]
+            return self._async_http
+
+    def _key_for_role(self, role: str) -> str:
+        if role == ROLE_ADMIN:
+            if not self.url or not self.service_role_key:
+                raise ValueError("SUPABASE_URL and SUPABASE_SERVICE_ROLE_KEY are required")
+            return self.service_role_key
+        if not self.url or not self.anon_key:
+            raise ValueError("SUPABASE_URL and SUPABASE_ANON_KEY are required")
+        return self.anon_key
+
+    def _build(self, key: str, bearer: str, is_async: bool) -> AnyClient:
+        if SUPABASE_LAZY_INIT:
+            return LazyClient(self, key, bearer, is_async)
+        return self.build_full(key, bearer, is_async)
 
-def get_supabase_client() -> Client:
-    """Returns Supabase client with anon key (for public operations)"""
-    if not SUPABASE_URL or not SUPABASE_ANON_KEY:
-        raise ValueError("SUPABASE_URL and SUPABASE_ANON_KEY are required")
-    return create_client(SUPABASE_URL, SUPABASE_ANON_KEY)
+    def build_full(self, key: str, bearer: str, is_async: bool) -> Union["Client", "AsyncClient"]:
+        """Complete supabase client (PostgREST, auth, storage, realtime)"""
+        from supabase import create_client, ClientOptions, AsyncClient, AsyncClientOptions
 
+        headers = {"Authorization": f"Bearer {bearer}"}
+        if is_async:
+            options = AsyncClientOptions(
+                headers=headers,
+                auto_refresh_token=False,
+                persist_session=False,
+                httpx_client=self.async_http_client(),
+            )
+            # The constructor is synchronous; AsyncClient.create only restores a stored session
+            return AsyncClient(self.url, key, options)
+        options = ClientOptions(
+            headers=headers,
+            auto_refresh_token=False,
+            persist_session=False,
+            httpx_client=self.http_client(),
+        )
+        return create_client(self.url, key, options)
 
-def get_supabase_admin_client() -> Client:
+    def get(self, role: str, is_async: bool = False) -> AnyClient:
+        """Long-lived client for a role (anon or admin)"""
+        if is_async:
+            # Make sure the async pool belongs to the running loop
+            self.async_http_client()
+        client = self._clients.get((role, is_async))
+        if client is not None:
+            return client
+        key = self._key_for_role(role)
+        client = self._build(key, key, is_async)
+        with self._lock:
+            return self._clients.setdefault((role, is_async), client)
+
+    def for_token(self, token: str, is_async: bool = False) -> AnyClient:
+        """Long-lived anon client scoped to a user JWT (RLS applies as that user)"""
+        if is_async:
+            self.async_http_client()
+        now = time.monotonic()
+        slot = (token, is_async)
+        with self._lock:
+            entry = self._token_clients.get(slot)
+            if entry is not None and now - entry[1] <= self.idle_timeout:
+                self._token_clients[slot] = (entry[0], now)
+                self._token_clients.move_to_end(slot)
+                return entry[0]
+
+        key = self._key_for_role(ROLE_ANON)
+        client = self._build(key, token, is_async)
+
+        with self._lock:
+            self._token_clients[slot] = (client, now)
+            self._token_clients.move_to_end(slot)
+            self._evict(now)
+        return client
+
+    def _evict(self, now: float) -> None:
+        """Drop idle token clients and keep the registry bounded (lock held)"""
+        for slot in [s for s, (_, used) in self._token_clients.items() if now - used > self.idle_timeout]:
+            del self._token_clients[slot]
+        while len(self._token_clients) > self.max_token_clients:
+            self._token_clients.popitem(last=False)
+
+    def fresh(self, is_async: bool = False) -> AnyClient:
+        """Unpooled anon client for auth flows that store a session on the client"""
+        key = self._key_for_role(ROLE_ANON)
+        return self.build_full(key, key, is_async)
+
+    def close(self) -> None:
+        """Drop every pooled client and close the sync connection pool"""
+        with self._lock:
+            self._clients.clear()
+            self._token_clients.clear()
+            if self._http is not None:
+                self._http.close()
+                self._http = None
+            self._async_http = None
+            self._async_loop = None
+
+
+registry = ClientRegistry(SUPABASE_URL, SUPABASE_ANON_KEY, SUPABASE_SERVICE_ROLE_KEY)
+
+if not SUPABASE_LAZY_INIT:
+    import supabase  # noqa: F401  (pay the import cost at cold start instead of on first request)
+
+
+def get_supabase_client(token: Optional[str] = None) -> "Client":
+    """Returns Supabase client with anon key (for public operations).
+
+    When a user token is given the client is RLS-scoped to that user.
+    """
+    if token:
+        return registry.for_token(token)
+    return registry.get(ROLE_ANON)
+
+
+def get_supabase_admin_client() -> "Client":
     """Returns Supabase client with service role key (for admin operations)"""
-    if not SUPABASE_URL or not SUPABASE_SERVICE_ROLE_KEY:
-        raise ValueError("SUPABASE_URL and SUPABASE_SERVICE_ROLE_KEY are required")
-    return create_client(SUPABASE_URL, SUPABASE_SERVICE_ROLE_KEY)
+    return registry.get(ROLE_ADMIN)
+
+
+def get_supabase_auth_client() -> "Client":
+    """Returns a non-shared anon client for sign in / sign up / sign out.
+
+    GoTrue keeps the signed-in session on the client and rewrites its
+    Authorization header, so these flows must never use a pooled client.
+    """
+    return registry.fresh()
+
+
+def get_async_supabase_client(token: Optional[str] = None) -> "AsyncClient":
+    """Async variant of get_supabase_client (must be called inside the event loop)"""
+    if token:
+        return registry.for_token(token, is_async=True)
+    return registry.get(ROLE_ANON, is_async=True)
+
+
+def get_async_supabase_admin_client() -> "AsyncClient":
+    """Async variant of get_supabase_admin_client"""
+    return registry.get(ROLE_ADMIN, is_async=True)
+
+
+def get_async_supabase_auth_client() -> "AsyncClient":
+    """Async variant of get_supabase_auth_client"""
+    return registry.fresh(is_async=True)
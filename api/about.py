@@ -1,13 +1,16 @@
 """About - Public GET and Admin PUT"""
-from fastapi import FastAPI, HTTPException, Request
+from fastapi import APIRouter, HTTPException, Request
 from fastapi.responses import JSONResponse
 from pydantic import BaseModel
 from typing import Optional
 from datetime import datetime, timezone
-from ._utils.supabase_client import get_supabase_client, get_supabase_admin_client
+from ._utils import repository as repo
+from ._utils.about_settings import about_settings
 from ._utils.auth_middleware import get_current_user
+from ._utils.schemas import AboutResponse
+from ._utils.catalog_cache import catalog_cache, cached_payload_response, store_payload_response, ABOUT
 
-app = FastAPI()
+router = APIRouter(tags=["about"])
 
 
 class AboutUpdate(BaseModel):
@@ -26,59 +29,34 @@ class AboutUpdate(BaseModel):
     delivery_areas: Optional[str] = None
 
 
-@app.get("/api/about")
+@router.get("/api/about")
 async def get_about(request: Request):
     """Get about page content (public)"""
     try:
-        supabase = get_supabase_client()
+        cached = cached_payload_response(request, ABOUT)
+        if cached is not None:
+            return cached
         
-        response = supabase.table("about").select("*").limit(1).execute()
+        version = catalog_cache.version
+        # about is None when none exists yet
+        about = (await about_settings.get()).about
         
-        if not response.data or len(response.data) == 0:
-            # Return empty about if none exists
-            return JSONResponse(content={
-                "success": True,
-                "about": None
-            })
-        
-        ab = response.data[0]
-        
-        return JSONResponse(content={
-            "success": True,
-            "about": {
-                "id": ab["id"],
-                "name": ab["ab_name"],
-                "photo_url": ab["ab_photo_url"],
-                "title": ab["ab_title"],
-                "story": ab["ab_story"],
-                "specialty": ab["ab_specialty"],
-                "experience_years": ab["ab_experience_years"],
-                "quote": ab["ab_quote"],
-                "instagram": ab["ab_instagram"],
-                "whatsapp": ab["ab_whatsapp"],
-                "email": ab["ab_email"],
-                "city": ab["ab_city"],
-                "accepts_orders": ab["ab_accepts_orders"],
-                "delivery_areas": ab["ab_delivery_areas"]
-            }
-        })
+        return store_payload_response(request, ABOUT, AboutResponse(about=about), version)
         
     except Exception as e:
         raise HTTPException(status_code=400, detail=str(e))
 
 
-@app.put("/api/about")
+@router.put("/api/about")
 async def update_about(request: Request):
     """Update about page content (admin only)"""
     try:
-        user = get_current_user(request)
+        user = await get_current_user(request)
         body = await request.json()
         data = AboutUpdate(**body)
         
-        supabase = get_supabase_admin_client()
-        
         # Check if about exists
-        existing = supabase.table("about").select("id").limit(1).execute()
+        about_id = await repo.get_about_id()
         
         update_data = {
             "ab_updated_at": datetime.now(timezone.utc).isoformat()
@@ -111,21 +89,23 @@ async def update_about(request: Request):
         if data.delivery_areas is not None:
             update_data["ab_delivery_areas"] = data.delivery_areas
         
-        if existing.data and len(existing.data) > 0:
+        if about_id:
             # Update existing
-            about_id = existing.data[0]["id"]
-            response = supabase.table("about").update(update_data).eq("id", about_id).execute()
+            rows = await repo.update_about(about_id, update_data)
         else:
             # Insert new (need at least name)
             if not data.name:
                 raise HTTPException(status_code=400, detail="Name is required for new about")
             update_data["ab_name"] = data.name
             update_data["ab_created_at"] = datetime.now(timezone.utc).isoformat()
-            response = supabase.table("about").insert(update_data).execute()
+            rows = await repo.insert_about(update_data)
         
-        if not response.data:
+        if not rows:
             raise HTTPException(status_code=400, detail="Error updating about")
         
+        catalog_cache.invalidate(ABOUT)
+        about_settings.invalidate()
+        
         return JSONResponse(content={
             "success": True,
             "message": "About updated successfully!"
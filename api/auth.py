@@ -1,12 +1,12 @@
 """Auth - All authentication endpoints"""
-from fastapi import FastAPI, HTTPException, Request
+from fastapi import APIRouter, HTTPException, Request
 from fastapi.responses import JSONResponse
 from pydantic import BaseModel, EmailStr
 from datetime import datetime, timezone
-from ._utils.supabase_client import get_supabase_client, get_supabase_admin_client
-from ._utils.auth_middleware import get_current_user
+from ._utils import repository as repo
+from ._utils.auth_middleware import ADMIN_PROFILE_SELECT, get_current_user, get_admin_profile, token_cache
 
-app = FastAPI()
+router = APIRouter(tags=["auth"])
 
 
 class LoginRequest(BaseModel):
@@ -20,31 +20,23 @@ class RegisterRequest(BaseModel):
     name: str | None = None
 
 
-@app.post("/api/auth/login")
+@router.post("/api/auth/login")
 async def login(request: Request):
     """Admin login"""
     try:
         body = await request.json()
         data = LoginRequest(**body)
         
-        supabase = get_supabase_client()
-        
-        auth_response = supabase.auth.sign_in_with_password({
-            "email": data.email,
-            "password": data.password
-        })
+        auth_response = await repo.sign_in(data.email, data.password)
         
         if auth_response.user is None:
             raise HTTPException(status_code=401, detail="Invalid credentials")
         
-        admin_client = get_supabase_admin_client()
-        admin_result = admin_client.table("admin").select("*").eq("id", auth_response.user.id).eq("a_is_active", True).execute()
+        admin_data = await repo.get_admin(auth_response.user.id, active_only=True, columns=ADMIN_PROFILE_SELECT)
         
-        if not admin_result.data or len(admin_result.data) == 0:
+        if not admin_data:
             raise HTTPException(status_code=403, detail="Access denied. You are not an admin.")
         
-        admin_data = admin_result.data[0]
-        
         return JSONResponse(content={
             "success": True,
             "message": "Login successful!",
@@ -73,36 +65,26 @@ async def login(request: Request):
         raise HTTPException(status_code=401, detail=str(e))
 
 
-@app.post("/api/auth/register")
+@router.post("/api/auth/register")
 async def register(request: Request):
     """Register new admin user"""
     try:
         body = await request.json()
         data = RegisterRequest(**body)
         
-        supabase = get_supabase_client()
-        
-        auth_response = supabase.auth.sign_up({
-            "email": data.email,
-            "password": data.password,
-            "options": {
-                "data": {
-                    "name": data.name
-                }
-            }
-        })
+        auth_response = await repo.sign_up(data.email, data.password, data.name)
         
         if auth_response.user is None:
             raise HTTPException(status_code=400, detail="Error creating user")
         
-        admin_client = get_supabase_admin_client()
-        admin_client.table("admin").insert({
+        await repo.insert_admin({
             "id": auth_response.user.id,
             "a_email": data.email,
             "a_name": data.name,
             "a_is_active": True,
             "a_created_at": datetime.now(timezone.utc).isoformat()
-        }).execute()
+        })
+        token_cache.forget_admin(auth_response.user.id)
         
         return JSONResponse(content={
             "success": True,
@@ -117,16 +99,13 @@ async def register(request: Request):
         raise HTTPException(status_code=400, detail=str(e))
 
 
-@app.get("/api/auth/me")
+@router.get("/api/auth/me")
 async def me(request: Request):
     """Get current logged in admin data"""
     try:
-        user = get_current_user(request)
-        
-        admin_client = get_supabase_admin_client()
-        admin_result = admin_client.table("admin").select("*").eq("id", user["id"]).execute()
+        user = await get_current_user(request)
         
-        admin_data = admin_result.data[0] if admin_result.data else None
+        admin_data = await get_admin_profile(request)
         
         return JSONResponse(content={
             "success": True,
@@ -146,12 +125,11 @@ async def me(request: Request):
         raise HTTPException(status_code=400, detail=str(e))
 
 
-@app.post("/api/auth/logout")
+@router.post("/api/auth/logout")
 async def logout(request: Request):
     """Logout user"""
     try:
-        supabase = get_supabase_client()
-        supabase.auth.sign_out()
+        await repo.sign_out()
         
         return JSONResponse(content={
             "success": True,
@@ -1,13 +1,35 @@
 """Consolidated Data API - Categories, Products, Orders"""
-from fastapi import FastAPI, HTTPException, Request
-from fastapi.responses import JSONResponse
-from pydantic import BaseModel
-from typing import Optional, List
-from datetime import datetime, timezone
-from ._utils.supabase_client import get_supabase_client, get_supabase_admin_client
-from ._utils.auth_middleware import get_current_user
-
-app = FastAPI()
+from fastapi import APIRouter, HTTPException, Request
+from fastapi.responses import JSONResponse, StreamingResponse
+from pydantic import BaseModel, TypeAdapter, ValidationError, ValidationInfo, field_validator
+from typing import Literal, Optional, List
+from datetime import datetime, time, timedelta, timezone
+from uuid import UUID
+from zoneinfo import ZoneInfo
+import asyncio
+import csv
+import io
+import json
+import os
+import re
+from ._utils import repository as repo
+from ._utils.auth_middleware import get_current_user, extract_token
+from ._utils.query_trace import set_request_budget
+from ._utils.pagination import (
+    encode_cursor, decode_cursor, parse_date_range, parse_page_size, parse_flag,
+)
+from ._utils.schemas import (
+    ModelResponse, select_for, CategoryOut, ProductOut, CatalogProductOut, CatalogCategoryOut,
+    OrderOut, OrderItemOut,
+    CategoryList, CategoryDetail, ProductList, ProductDetail, Catalog,
+    OrderPage, OrderPageWithItems, OrderAnalytics,
+)
+from ._utils.catalog_cache import (
+    catalog_cache, cached_payload_response, store_payload_response, payload_response, encode_payload,
+    PRODUCTS, CATEGORIES, CATALOG, PRIVATE_CACHE_CONTROL,
+)
+
+router = APIRouter(tags=["data"])
 
 
 # ============== MODELS ==============
@@ -50,6 +72,55 @@ class ProductUpdate(BaseModel):
     sort_order: Optional[int] = None
 
 
+def _parse_price(raw: str, decimal: str) -> str:
+    """A CSV price written with `decimal` ("," or ".") as "1234.50"; ValueError when it does not fit or is ambiguous"""
+    thousands = "." if decimal == "," else ","
+    match = re.fullmatch(
+        rf"(\d{{1,3}}(?:{re.escape(thousands)}\d{{3}})+|\d+)(?:{re.escape(decimal)}(\d+))?",
+        raw.replace(" ", ""),
+    )
+    if match is None:
+        raise ValueError(f"{raw!r} is not a price with decimal separator '{decimal}'")
+    whole, cents = match.groups()
+    if thousands in whole and cents is None:
+        # 1.234 (or 1,234) reads as a thousand in one locale and as a decimal in the other
+        raise ValueError(f"{raw!r} is ambiguous, write it with cents (e.g. {whole}{decimal}00)")
+    return f"{whole.replace(thousands, '')}.{cents or 0}"
+
+
+class _ImportFields(BaseModel):
+    # Category by name (case-insensitive), instead of category_id
+    category: Optional[str] = None
+    
+    @field_validator("price", mode="before", check_fields=False)
+    @classmethod
+    def _csv_price(cls, value, info: ValidationInfo):
+        # CSV prices are text in the file's convention (validation context "decimal")
+        decimal = (info.context or {}).get("decimal")
+        if decimal and isinstance(value, str):
+            return _parse_price(value, decimal)
+        return value
+
+
+class ProductImportRow(_ImportFields, ProductCreate):
+    pass
+
+
+class ProductImportUpdate(_ImportFields, ProductUpdate):
+    # Updates this product; like PUT, only the fields the row gives are changed
+    id: UUID
+
+
+class ProductBatch(BaseModel):
+    ids: List[UUID]
+    action: Literal["set_price", "adjust_price", "set_availability", "move_category", "delete"]
+    price: Optional[float] = None
+    # adjust_price: +10 raises prices by 10%, -5 lowers them by 5%
+    percent: Optional[float] = None
+    is_available: Optional[bool] = None
+    category_id: Optional[str] = None
+
+
 class OrderItem(BaseModel):
     product_id: str
     product_name: str
@@ -64,96 +135,87 @@ class OrderCreate(BaseModel):
     total: float
 
 
+# ============== PROJECTIONS ==============
+# Derived from the response models, so only the columns a response is built
+# from are fetched (see _utils/schemas.py)
+
+CATEGORY_SELECT = select_for(CategoryOut)
+PRODUCT_SELECT = select_for(ProductOut)
+ORDER_SELECT = select_for(OrderOut)
+ORDER_ITEM_SELECT = select_for(OrderItemOut)
+
+
 # ============== CATEGORIES ==============
 
-@app.get("/api/categories")
+@router.get("/api/categories")
 async def list_categories(request: Request):
     """List all active categories (public)"""
     try:
-        supabase = get_supabase_client()
-        response = supabase.table("category").select("*").eq("c_is_active", True).order("c_sort_order").execute()
-        
-        categories = []
-        for c in response.data:
-            categories.append({
-                "id": c["id"],
-                "c_name": c["c_name"],
-                "c_description": c["c_description"],
-                "c_image_url": c["c_image_url"],
-                "c_is_active": c["c_is_active"],
-                "c_sort_order": c["c_sort_order"]
-            })
+        cached = cached_payload_response(request, CATEGORIES)
+        if cached is not None:
+            return cached
         
-        return JSONResponse(content={"success": True, "categories": categories})
+        version = catalog_cache.version
+        rows = await repo.list_active_categories(CATEGORY_SELECT)
+        
+        return store_payload_response(request, CATEGORIES, CategoryList(categories=rows), version)
     except Exception as e:
         raise HTTPException(status_code=400, detail=str(e))
 
 
-@app.post("/api/categories")
+@router.post("/api/categories")
 async def create_category(request: Request):
     """Create new category (admin only)"""
     try:
-        get_current_user(request)
+        await get_current_user(request)
         body = await request.json()
         data = CategoryCreate(**body)
         
-        supabase = get_supabase_admin_client()
-        response = supabase.table("category").insert({
+        rows = await repo.insert_category({
             "c_name": data.name,
             "c_description": data.description,
             "c_image_url": data.image_url,
             "c_is_active": data.is_active,
             "c_sort_order": data.sort_order,
             "c_created_at": datetime.now(timezone.utc).isoformat()
-        }).execute()
+        })
         
-        if not response.data:
+        if not rows:
             raise HTTPException(status_code=400, detail="Error creating category")
         
-        return JSONResponse(content={"success": True, "message": "Category created!", "category": response.data[0]})
+        catalog_cache.invalidate(CATEGORIES)
+        
+        return JSONResponse(content={"success": True, "message": "Category created!", "category": rows[0]})
     except HTTPException:
         raise
     except Exception as e:
         raise HTTPException(status_code=400, detail=str(e))
 
 
-@app.get("/api/categories/{category_id}")
+@router.get("/api/categories/{category_id}")
 async def get_category(request: Request, category_id: str):
     """Get single category"""
     try:
-        supabase = get_supabase_client()
-        response = supabase.table("category").select("*").eq("id", category_id).single().execute()
+        c = await repo.get_category(category_id, CATEGORY_SELECT)
         
-        if not response.data:
+        if not c:
             raise HTTPException(status_code=404, detail="Category not found")
         
-        c = response.data
-        return JSONResponse(content={
-            "success": True,
-            "category": {
-                "id": c["id"],
-                "c_name": c["c_name"],
-                "c_description": c["c_description"],
-                "c_image_url": c["c_image_url"],
-                "c_is_active": c["c_is_active"],
-                "c_sort_order": c["c_sort_order"]
-            }
-        })
+        return ModelResponse(CategoryDetail(category=c))
     except HTTPException:
         raise
     except Exception as e:
         raise HTTPException(status_code=400, detail=str(e))
 
 
-@app.put("/api/categories/{category_id}")
+@router.put("/api/categories/{category_id}")
 async def update_category(request: Request, category_id: str):
     """Update category (admin only)"""
     try:
-        get_current_user(request)
+        await get_current_user(request)
         body = await request.json()
         data = CategoryUpdate(**body)
         
-        supabase = get_supabase_admin_client()
         update_data = {"c_last_update": datetime.now(timezone.utc).isoformat()}
         
         if data.name is not None:
@@ -167,11 +229,14 @@ async def update_category(request: Request, category_id: str):
         if data.sort_order is not None:
             update_data["c_sort_order"] = data.sort_order
         
-        response = supabase.table("category").update(update_data).eq("id", category_id).execute()
+        rows = await repo.update_category(category_id, update_data)
         
-        if not response.data:
+        if not rows:
             raise HTTPException(status_code=404, detail="Category not found")
         
+        # Products embed the category name
+        catalog_cache.invalidate(CATEGORIES, PRODUCTS)
+        
         return JSONResponse(content={"success": True, "message": "Category updated!"})
     except HTTPException:
         raise
@@ -179,20 +244,20 @@ async def update_category(request: Request, category_id: str):
         raise HTTPException(status_code=400, detail=str(e))
 
 
-@app.delete("/api/categories/{category_id}")
+@router.delete("/api/categories/{category_id}")
 async def delete_category(request: Request, category_id: str):
     """Delete category (admin only)"""
     try:
-        get_current_user(request)
-        supabase = get_supabase_admin_client()
+        await get_current_user(request)
         # Delete all products linked to this category and check result
-        prod_del = supabase.table("product").delete().eq("p_category_id", category_id).execute()
+        prod_del = await repo.delete_products_by_category(category_id)
         if hasattr(prod_del, "error") and prod_del.error:
             raise HTTPException(status_code=400, detail=f"Erro ao apagar produtos: {prod_del.error}")
         # Now delete the category itself
-        cat_del = supabase.table("category").delete().eq("id", category_id).execute()
+        cat_del = await repo.delete_category(category_id)
         if hasattr(cat_del, "error") and cat_del.error:
             raise HTTPException(status_code=400, detail=f"Erro ao apagar categoria: {cat_del.error}")
+        catalog_cache.invalidate(CATEGORIES, PRODUCTS)
         return JSONResponse(content={"success": True, "message": "Category and its products deleted!"})
     except HTTPException:
         raise
@@ -202,112 +267,92 @@ async def delete_category(request: Request, category_id: str):
 
 # ============== PRODUCTS ==============
 
-@app.get("/api/products")
+@router.get("/api/products")
 async def list_products(request: Request):
-    """List all products (public) - filtering done on frontend"""
+    """List all products (public) - see /api/catalog for grouped and filtered reads"""
     try:
-        supabase = get_supabase_client()
-        auth_header = request.headers.get("Authorization")
-        if auth_header and "Bearer " in auth_header:
-            token = auth_header.split(" ")[1]
-            supabase.postgrest.auth(token)
-        response = supabase.table("product") \
-            .select("*, category(c_name)") \
-            .order("p_sort_order") \
-            .execute()
-        
-        products = []
-        for p in response.data:
-            products.append({
-                "id": p["id"],
-                "p_name": p["p_name"],
-                "p_description": p["p_description"],
-                "p_price": float(p["p_price"]) if p["p_price"] else 0,
-                "p_image_url": p["p_image_url"],
-                "p_is_available": p["p_is_available"],
-                "p_is_featured": p["p_is_featured"],
-                "p_category_id": p["p_category_id"],
-                "p_sort_order": p.get("p_sort_order", 0),
-                "category_name": p["category"]["c_name"] if p.get("category") else None
-            })
+        token = extract_token(request)
+        # Logged-in admins see unavailable products through RLS, so only anonymous reads are cached
+        if not token:
+            cached = cached_payload_response(request, PRODUCTS)
+            if cached is not None:
+                return cached
+        
+        version = catalog_cache.version
+        rows = await repo.list_products(token, PRODUCT_SELECT)
         
-        return JSONResponse(content={"success": True, "products": products})
+        products = ProductList(products=rows)
+        
+        if not token:
+            return store_payload_response(request, PRODUCTS, products, version)
+        return ModelResponse(products, headers={"Cache-Control": PRIVATE_CACHE_CONTROL})
     except Exception as e:
         raise HTTPException(status_code=400, detail=str(e))
 
 
-@app.post("/api/products")
+def _product_columns(data: ProductCreate) -> dict:
+    """Table columns of a product as sent on create"""
+    return {
+        "p_name": data.name,
+        "p_description": data.description,
+        "p_price": data.price,
+        "p_category_id": data.category_id,
+        "p_image_url": data.image_url,
+        "p_is_available": data.is_available,
+        "p_is_featured": data.is_featured,
+        "p_sort_order": data.sort_order,
+    }
+
+
+@router.post("/api/products")
 async def create_product(request: Request):
     """Create new product (admin only)"""
     try:
-        get_current_user(request)
+        await get_current_user(request)
         body = await request.json()
         data = ProductCreate(**body)
         
-        supabase = get_supabase_admin_client()
-        response = supabase.table("product").insert({
-            "p_name": data.name,
-            "p_description": data.description,
-            "p_price": data.price,
-            "p_category_id": data.category_id,
-            "p_image_url": data.image_url,
-            "p_is_available": data.is_available,
-            "p_is_featured": data.is_featured,
-            "p_sort_order": data.sort_order,
+        rows = await repo.insert_product({
+            **_product_columns(data),
             "p_created_at": datetime.now(timezone.utc).isoformat()
-        }).execute()
+        })
         
-        if not response.data:
+        if not rows:
             raise HTTPException(status_code=400, detail="Error creating product")
         
-        return JSONResponse(content={"success": True, "message": "Product created!", "product": response.data[0]})
+        catalog_cache.invalidate(PRODUCTS)
+        
+        return JSONResponse(content={"success": True, "message": "Product created!", "product": rows[0]})
     except HTTPException:
         raise
     except Exception as e:
         raise HTTPException(status_code=400, detail=str(e))
 
 
-@app.get("/api/products/{product_id}")
+@router.get("/api/products/{product_id}")
 async def get_product(request: Request, product_id: str):
     """Get product by ID"""
     try:
-        supabase = get_supabase_admin_client()
-        response = supabase.table("product").select("*, category(c_name)").eq("id", product_id).single().execute()
+        p = await repo.get_product(product_id, PRODUCT_SELECT)
         
-        if not response.data:
+        if not p:
             raise HTTPException(status_code=404, detail="Product not found")
         
-        p = response.data
-        return JSONResponse(content={
-            "success": True,
-            "product": {
-                "id": p["id"],
-                "p_name": p["p_name"],
-                "p_description": p["p_description"],
-                "p_price": float(p["p_price"]) if p["p_price"] else 0,
-                "p_image_url": p["p_image_url"],
-                "p_is_available": p["p_is_available"],
-                "p_is_featured": p["p_is_featured"],
-                "p_category_id": p["p_category_id"],
-                "p_sort_order": p.get("p_sort_order", 0),
-                "category_name": p["category"]["c_name"] if p.get("category") else None
-            }
-        })
+        return ModelResponse(ProductDetail(product=p))
     except HTTPException:
         raise
     except Exception as e:
         raise HTTPException(status_code=400, detail=str(e))
 
 
-@app.put("/api/products/{product_id}")
+@router.put("/api/products/{product_id}")
 async def update_product(request: Request, product_id: str):
     """Update product (admin only)"""
     try:
-        get_current_user(request)
+        await get_current_user(request)
         body = await request.json()
         data = ProductUpdate(**body)
         
-        supabase = get_supabase_admin_client()
         update_data = {"p_last_update": datetime.now(timezone.utc).isoformat()}
         
         if data.name is not None:
@@ -327,25 +372,27 @@ async def update_product(request: Request, product_id: str):
         if data.sort_order is not None:
             update_data["p_sort_order"] = data.sort_order
         
-        response = supabase.table("product").update(update_data).eq("id", product_id).execute()
+        rows = await repo.update_product(product_id, update_data)
         
-        if not response.data:
+        if not rows:
             raise HTTPException(status_code=404, detail="Product not found")
         
-        return JSONResponse(content={"success": True, "message": "Product updated!", "product": response.data[0]})
+        catalog_cache.invalidate(PRODUCTS)
+        
+        return JSONResponse(content={"success": True, "message": "Product updated!", "product": rows[0]})
     except HTTPException:
         raise
     except Exception as e:
         raise HTTPException(status_code=400, detail=str(e))
 
 
-@app.delete("/api/products/{product_id}")
+@router.delete("/api/products/{product_id}")
 async def delete_product(request: Request, product_id: str):
     """Delete product (admin only)"""
     try:
-        get_current_user(request)
-        supabase = get_supabase_admin_client()
-        supabase.table("product").delete().eq("id", product_id).execute()
+        await get_current_user(request)
+        await repo.delete_product(product_id)
+        catalog_cache.invalidate(PRODUCTS)
         return JSONResponse(content={"success": True, "message": "Product deleted!"})
     except HTTPException:
         raise
@@ -353,54 +400,551 @@ async def delete_product(request: Request, product_id: str):
         raise HTTPException(status_code=400, detail=str(e))
 
 
-# ============== ORDERS ==============
+# ============== PRODUCT BATCH ==============
 
-@app.get("/api/orders")
-async def list_orders(request: Request):
-    """List all orders (admin only)"""
+BATCH_MAX_IDS = 200
+
+# action -> (body field, column) for the actions that set one column
+BATCH_UPDATES = {
+    "set_price": ("price", "p_price"),
+    "set_availability": ("is_available", "p_is_available"),
+    "move_category": ("category_id", "p_category_id"),
+}
+
+
+@router.post("/api/products/batch")
+async def batch_products(request: Request):
+    """Apply one action to many products at once (admin only)
+
+    Body: {"ids": [...], "action": ..., plus the action's value}:
+    set_price (price), adjust_price (percent), set_availability
+    (is_available), move_category (category_id) or delete. Each action is
+    one UPDATE or DELETE over all the ids; ids that match no product come
+    back in not_found.
+    """
     try:
-        get_current_user(request)
-        supabase = get_supabase_admin_client()
-        response = supabase.table("order").select("*, order_item(*)").order("o_created_at", desc=True).execute()
-        
-        orders = []
-        for o in response.data:
-            orders.append({
-                "id": o["id"],
-                "o_customer_name": o["o_customer_name"],
-                "o_customer_order": o["o_customer_order"],
-                "o_total": float(o["o_total"]) if o["o_total"] else 0,
-                "o_created_at": o["o_created_at"],
-                "order_item": o.get("order_item", [])
+        await get_current_user(request)
+        body = await request.json()
+        data = ProductBatch(**body)
+        ids = list(dict.fromkeys(str(product_id) for product_id in data.ids))
+        
+        if not ids:
+            raise HTTPException(status_code=400, detail="ids must not be empty")
+        if len(ids) > BATCH_MAX_IDS:
+            raise HTTPException(status_code=400, detail=f"At most {BATCH_MAX_IDS} products per batch")
+        
+        if data.action == "delete":
+            done = [p["id"] for p in await repo.delete_products(ids)]
+        elif data.action == "adjust_price":
+            if data.percent is None:
+                raise HTTPException(status_code=400, detail="percent is required for adjust_price")
+            if data.percent <= -100:
+                raise HTTPException(status_code=400, detail="percent must be greater than -100")
+            done = await repo.adjust_product_prices(ids, data.percent)
+        else:
+            field, column = BATCH_UPDATES[data.action]
+            value = getattr(data, field)
+            if value is None:
+                raise HTTPException(status_code=400, detail=f"{field} is required for {data.action}")
+            rows = await repo.update_products(ids, {
+                column: value,
+                "p_last_update": datetime.now(timezone.utc).isoformat()
             })
+            done = [p["id"] for p in rows]
+        
+        # Once for the whole batch
+        if done:
+            catalog_cache.invalidate(PRODUCTS)
         
-        return JSONResponse(content={"success": True, "orders": orders})
+        found = set(done)
+        verb = "deleted" if data.action == "delete" else "updated"
+        return JSONResponse(content={
+            "success": True,
+            "message": f"{len(done)} products {verb}!",
+            "action": data.action,
+            "ids": done,
+            "not_found": [product_id for product_id in ids if product_id not in found],
+        })
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+# ============== PRODUCT IMPORT ==============
+
+IMPORT_MAX_ROWS = 5000
+# Rows per database write, and per progress line when streaming
+IMPORT_CHUNK_SIZE = 200
+
+
+# ?decimal= for CSV prices; by default the delimiter decides (";" -> comma, "," -> point)
+IMPORT_DECIMALS = {"comma": ",", "point": "."}
+
+
+def _parse_import(body: bytes, content_type: str, decimal: Optional[str] = None) -> tuple:
+    """(rows, decimal): (row number, raw fields) from a CSV with a header line or a JSON array of objects
+
+    CSV rows are numbered by their line in the file and JSON rows from 1.
+    Blank CSV cells are left out, so they keep the ProductCreate default
+    (or, on update, the current value). `decimal` is the separator CSV
+    prices are read with, None for JSON.
+    """
+    if "csv" in content_type:
+        text = body.decode("utf-8-sig")
+        header = text.split("\n", 1)[0]
+        # Spreadsheets set to pt-BR export with ";" and a decimal comma
+        delimiter = ";" if header.count(";") > header.count(",") else ","
+        reader = csv.DictReader(io.StringIO(text), delimiter=delimiter)
+        rows = []
+        for record in reader:
+            fields = {
+                key.strip(): value.strip()
+                for key, value in record.items()
+                if isinstance(key, str) and isinstance(value, str) and value.strip()
+            }
+            if fields:
+                rows.append((reader.line_num, fields))
+        return rows, decimal or ("," if delimiter == ";" else ".")
+    
+    payload = json.loads(body)
+    if isinstance(payload, dict):
+        payload = payload.get("products")
+    if not isinstance(payload, list):
+        raise HTTPException(status_code=400, detail="Expected a JSON array of products or a CSV file")
+    return list(enumerate(payload, start=1)), None
+
+
+def _validation_message(error: ValidationError) -> str:
+    return "; ".join(
+        f"{'.'.join(str(part) for part in e['loc']) or 'row'}: {e['msg']}" for e in error.errors()
+    )
+
+
+def _import_result(row: int, status: str, product_id: Optional[str] = None, error: Optional[str] = None) -> dict:
+    return {"row": row, "status": status, "id": product_id, "error": error}
+
+
+async def _import_chunks(rows: List[tuple], decimal: Optional[str] = None):
+    """Validate and write the rows IMPORT_CHUNK_SIZE at a time, yielding each chunk's results"""
+    # One lookup per chunk is expected here, not an N+1
+    set_request_budget(None)
+    categories = await repo.list_categories("id, c_name")
+    by_name = {c["c_name"].strip().casefold(): c["id"] for c in categories}
+    category_ids = {c["id"] for c in categories}
+    seen_ids = set()
+    written = False
+    
+    try:
+        for start in range(0, len(rows), IMPORT_CHUNK_SIZE):
+            chunk = rows[start:start + IMPORT_CHUNK_SIZE]
+            results = {}
+            inserts, updates = [], []
+            
+            for row, fields in chunk:
+                model = ProductImportUpdate if isinstance(fields, dict) and fields.get("id") else ProductImportRow
+                try:
+                    data = model.model_validate(fields, context={"decimal": decimal})
+                except ValidationError as e:
+                    results[row] = _import_result(row, "error", error=_validation_message(e))
+                    continue
+                if data.category:
+                    data.category_id = by_name.get(data.category.strip().casefold())
+                    if data.category_id is None:
+                        results[row] = _import_result(row, "error", error=f"Unknown category: {data.category}")
+                        continue
+                elif data.category_id and data.category_id not in category_ids:
+                    results[row] = _import_result(row, "error", error=f"Unknown category_id: {data.category_id}")
+                    continue
+                if model is ProductImportRow:
+                    inserts.append((row, _product_columns(data)))
+                    continue
+                product_id = str(data.id)
+                if product_id in seen_ids:
+                    results[row] = _import_result(row, "error", product_id, "Duplicate id in the file")
+                    continue
+                seen_ids.add(product_id)
+                # Only what the row gives: a column left out keeps its current value
+                changes = data.model_dump(exclude_unset=True, exclude_none=True, exclude={"id", "category"})
+                updates.append((row, {"id": product_id, **{f"p_{field}": value for field, value in changes.items()}}))
+            
+            stamp = datetime.now(timezone.utc).isoformat()
+            if updates:
+                try:
+                    # One UPDATE for the chunk; columns a row leaves out keep their value
+                    updated = set(await repo.update_products_partial([p for _, p in updates]))
+                    written = written or bool(updated)
+                    for row, p in updates:
+                        if p["id"] in updated:
+                            results[row] = _import_result(row, "updated", p["id"])
+                        else:
+                            results[row] = _import_result(row, "error", p["id"], "Product not found")
+                except Exception as e:
+                    for row, p in updates:
+                        results[row] = _import_result(row, "error", p["id"], str(e))
+            if inserts:
+                try:
+                    saved = await repo.insert_products([{**p, "p_created_at": stamp} for _, p in inserts])
+                    written = True
+                    for (row, _), p in zip(inserts, saved):
+                        results[row] = _import_result(row, "created", p["id"])
+                except Exception as e:
+                    for row, _ in inserts:
+                        results[row] = _import_result(row, "error", error=str(e))
+            
+            yield [results[row] for row, _ in chunk]
+    finally:
+        if written:
+            catalog_cache.invalidate(PRODUCTS)
+
+
+def _import_summary(results: List[dict], total: int) -> dict:
+    counts = {"created": 0, "updated": 0, "error": 0}
+    for r in results:
+        counts[r["status"]] += 1
+    return {
+        "total": total,
+        "processed": len(results),
+        "created": counts["created"],
+        "updated": counts["updated"],
+        "failed": counts["error"],
+    }
+
+
+async def _import_ndjson(rows: List[tuple], decimal: Optional[str]):
+    """One progress line per chunk, with its results, then the summary"""
+    results = []
+    async for chunk in _import_chunks(rows, decimal):
+        results.extend(chunk)
+        yield json.dumps(
+            {"type": "progress", **_import_summary(results, len(rows)), "results": chunk},
+            ensure_ascii=False, separators=(",", ":"),
+        ) + "\n"
+    yield json.dumps({"type": "done", **_import_summary(results, len(rows))}, separators=(",", ":")) + "\n"
+
+
+@router.post("/api/products/import")
+async def import_products(request: Request):
+    """Create or update many products from a CSV or a JSON array (admin only)
+
+    Each row is validated like POST /api/products. A row may name its
+    `category` instead of giving category_id, and a row with `id` updates
+    the columns it gives on that product. CSV prices use a decimal comma
+    when the file is ";"-separated and a point otherwise (override with
+    ?decimal=comma|point); ambiguous prices such as 1.234 are row errors.
+    Rows are written IMPORT_CHUNK_SIZE at a time, so a bad
+    row or a failed chunk does not undo the others; every row gets a
+    result. With `Accept: application/x-ndjson` the results stream one
+    chunk at a time, followed by a summary line.
+    """
+    try:
+        await get_current_user(request)
+        decimal = request.query_params.get("decimal")
+        if decimal is not None and decimal not in IMPORT_DECIMALS:
+            raise HTTPException(status_code=400, detail="decimal must be 'comma' or 'point'")
+        rows, decimal = _parse_import(
+            await request.body(), request.headers.get("content-type", ""), IMPORT_DECIMALS.get(decimal)
+        )
+        
+        if not rows:
+            raise HTTPException(status_code=400, detail="No products to import")
+        if len(rows) > IMPORT_MAX_ROWS:
+            raise HTTPException(status_code=400, detail=f"At most {IMPORT_MAX_ROWS} products per import")
+        
+        if "application/x-ndjson" in request.headers.get("accept", ""):
+            return StreamingResponse(_import_ndjson(rows, decimal), media_type="application/x-ndjson")
+        
+        results = []
+        async for chunk in _import_chunks(rows, decimal):
+            results.extend(chunk)
+        return JSONResponse(content={"success": True, **_import_summary(results, len(rows)), "results": results})
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+# ============== CATALOG ==============
+
+CATALOG_PRODUCT_SELECT = select_for(CatalogProductOut)
+SEARCH_MAX_TERMS = 5
+# Serve the public menu from the catalog_snapshot row (1) or join category and product on every miss (0)
+CATALOG_SNAPSHOT = os.getenv("CATALOG_SNAPSHOT", "1") == "1"
+
+
+_snapshot_schema = TypeAdapter(List[CatalogCategoryOut])
+
+
+async def _catalog_snapshot() -> Optional[Catalog]:
+    """The anonymous menu read from its precomputed row; None to use the join"""
+    if not CATALOG_SNAPSHOT:
+        return None
+    document = await repo.get_catalog_snapshot()
+    if document is None:
+        return None
+    # Parsed and validated in one pass by pydantic-core
+    return Catalog.model_construct(categories=_snapshot_schema.validate_json(document))
+
+
+def _search_pattern(q: Optional[str]) -> Optional[str]:
+    """ILIKE pattern with the words of `q` in order ("bolo choc" -> "*bolo*choc*")"""
+    # Only letters and digits, so nothing can break out of the PostgREST filter
+    terms = re.findall(r"[^\W_]+", q or "")[:SEARCH_MAX_TERMS]
+    return f"*{'*'.join(terms)}*" if terms else None
+
+
+@router.get("/api/catalog")
+async def get_catalog(request: Request):
+    """Active categories in sort order, each with its products in sort order (public)
+
+    Query params: category (id), available / featured (true | false),
+    q (words searched in product name and description). When searching or
+    filtering by featured, categories without a matching product are left out.
+    """
+    try:
+        token = extract_token(request)
+        category_id = request.query_params.get("category") or None
+        available = parse_flag(request, "available", None)
+        featured = parse_flag(request, "featured", None)
+        search = _search_pattern(request.query_params.get("q"))
+        filtered = any(value is not None for value in (category_id, available, featured, search))
+        
+        # Same rule as /api/products: only anonymous reads are cached
+        if not token and not filtered:
+            cached = cached_payload_response(request, CATALOG)
+            if cached is not None:
+                return cached
+        
+        version = catalog_cache.version
+        if not token and not filtered:
+            snapshot = await _catalog_snapshot()
+            if snapshot is not None:
+                return store_payload_response(request, CATALOG, snapshot, version)
+        
+        categories, products = await asyncio.gather(
+            repo.list_active_categories(CATEGORY_SELECT),
+            repo.list_products(
+                token, CATALOG_PRODUCT_SELECT,
+                category_id=category_id, available=available, featured=featured, search=search,
+            ),
+        )
+        
+        # One pass over the products, already in p_sort_order
+        by_category = {}
+        for p in products:
+            by_category.setdefault(p["p_category_id"], []).append(p)
+        grouped = [
+            {**c, "products": by_category.get(c["id"], [])}
+            for c in categories
+            if category_id is None or c["id"] == category_id
+        ]
+        if search or featured is not None:
+            grouped = [c for c in grouped if c["products"]]
+        catalog = Catalog(categories=grouped)
+        
+        if token:
+            return ModelResponse(catalog, headers={"Cache-Control": PRIVATE_CACHE_CONTROL})
+        if filtered:
+            # Not kept in memory (one entry per search), but still cacheable at the edge
+            return payload_response(request, encode_payload(catalog), "BYPASS")
+        return store_payload_response(request, CATALOG, catalog, version)
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+# ============== ORDERS ==============
+
+@router.get("/api/orders")
+async def list_orders(request: Request):
+    """List orders newest first, one keyset page at a time (admin only)
+
+    Query params: limit (capped), cursor (from the previous page's next_cursor),
+    from / to (dates), customer (name contains), items (false to omit line items).
+    """
+    try:
+        await get_current_user(request)
+        limit = parse_page_size(request)
+        date_from, date_to = parse_date_range(request)
+        include_items = parse_flag(request, "items", True)
+        
+        # Fetch one extra row to know whether there is a next page
+        rows = await repo.list_orders_page(
+            limit + 1,
+            after=decode_cursor(request.query_params.get("cursor")),
+            date_from=date_from,
+            date_to=date_to,
+            customer=request.query_params.get("customer") or None,
+            include_items=include_items,
+            columns=ORDER_SELECT,
+            item_columns=ORDER_ITEM_SELECT,
+        )
+        has_more = len(rows) > limit
+        rows = rows[:limit]
+        
+        page = OrderPageWithItems if include_items else OrderPage
+        return ModelResponse(page(
+            orders=rows,
+            next_cursor=encode_cursor(rows[-1]) if has_more else None
+        ))
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+# Days (and the `from` / `to` dates) of the sales analytics follow the shop's clock
+ANALYTICS_TIME_ZONE = os.getenv("ANALYTICS_TIME_ZONE", "America/Sao_Paulo")
+ANALYTICS_BUCKETS = ("day", "week", "month")
+ANALYTICS_DEFAULT_DAYS = 30
+ANALYTICS_MAX_DAYS = 366
+ANALYTICS_TOP_DEFAULT = 10
+ANALYTICS_TOP_MAX = 50
+
+
+@router.get("/api/orders/analytics")
+async def order_analytics(request: Request):
+    """Revenue per period, average ticket and best sellers (admin only)
+
+    Aggregated by the database, so only the totals leave it. Query params:
+    from / to (dates, default the last 30 days), bucket (day | week | month),
+    limit (products per ranking).
+    """
+    try:
+        await get_current_user(request)
+        shop_tz = ZoneInfo(ANALYTICS_TIME_ZONE)
+        date_from, date_to = parse_date_range(request, shop_tz)
+        bucket = request.query_params.get("bucket", "day")
+        if bucket not in ANALYTICS_BUCKETS:
+            raise HTTPException(status_code=400, detail="bucket must be 'day', 'week' or 'month'")
+        top_limit = parse_page_size(request, default=ANALYTICS_TOP_DEFAULT, maximum=ANALYTICS_TOP_MAX)
+        
+        # Default: the last 30 days, today included
+        end = (
+            datetime.fromisoformat(date_to) if date_to
+            else datetime.combine(datetime.now(shop_tz).date() + timedelta(days=1), time(), shop_tz)
+        )
+        start = datetime.fromisoformat(date_from) if date_from else end - timedelta(days=ANALYTICS_DEFAULT_DAYS)
+        if end <= start:
+            raise HTTPException(status_code=400, detail="'to' must be after 'from'")
+        if end - start > timedelta(days=ANALYTICS_MAX_DAYS):
+            raise HTTPException(status_code=400, detail=f"The range can span at most {ANALYTICS_MAX_DAYS} days")
+        
+        result = await repo.order_analytics(
+            start.isoformat(), end.isoformat(), bucket, top_limit, ANALYTICS_TIME_ZONE
+        )
+        
+        return ModelResponse(OrderAnalytics(
+            date_from=start.isoformat(),
+            date_to=end.isoformat(),
+            bucket=bucket,
+            **result
+        ))
     except HTTPException:
         raise
     except Exception as e:
         raise HTTPException(status_code=400, detail=str(e))
 
 
-@app.post("/api/orders")
+EXPORT_PAGE_SIZE = 500
+
+EXPORT_CSV_COLUMNS = [
+    "order_id", "o_created_at", "o_customer_name", "o_customer_order", "o_total",
+    "oi_product_id", "oi_product_name", "oi_product_price", "oi_quantity", "oi_subtotal",
+]
+
+
+async def _iter_orders(date_from: Optional[str], date_to: Optional[str]):
+    """Walk the whole (filtered) history page by page with the keyset cursor"""
+    # One query per page is expected here, not an N+1
+    set_request_budget(None)
+    after = None
+    while True:
+        rows = await repo.list_orders_page(EXPORT_PAGE_SIZE, after=after, date_from=date_from, date_to=date_to)
+        for o in rows:
+            yield o
+        if len(rows) < EXPORT_PAGE_SIZE:
+            return
+        after = (rows[-1]["o_created_at"], rows[-1]["id"])
+
+
+async def _export_ndjson(date_from: Optional[str], date_to: Optional[str]):
+    async for o in _iter_orders(date_from, date_to):
+        yield json.dumps(o, ensure_ascii=False, separators=(",", ":")) + "\n"
+
+
+async def _export_csv(date_from: Optional[str], date_to: Optional[str]):
+    """One CSV row per order item (orders without items get a single row)"""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(EXPORT_CSV_COLUMNS)
+    yield buffer.getvalue()
+    
+    async for o in _iter_orders(date_from, date_to):
+        buffer.seek(0)
+        buffer.truncate()
+        head = [o["id"], o["o_created_at"], o["o_customer_name"], o["o_customer_order"] or "", o["o_total"]]
+        for item in o.get("order_item") or [{}]:
+            writer.writerow(head + [
+                item.get("oi_product_id", ""),
+                item.get("oi_product_name", ""),
+                item.get("oi_product_price", ""),
+                item.get("oi_quantity", ""),
+                item.get("oi_subtotal", ""),
+            ])
+        yield buffer.getvalue()
+
+
+@router.get("/api/orders/export")
+async def export_orders(request: Request):
+    """Stream the order history as NDJSON or CSV (admin only)
+
+    Query params: format (ndjson | csv), from / to (dates).
+    """
+    try:
+        await get_current_user(request)
+        export_format = request.query_params.get("format", "ndjson").lower()
+        date_from, date_to = parse_date_range(request)
+        
+        stamp = datetime.now(timezone.utc).strftime("%Y%m%d")
+        if export_format == "csv":
+            return StreamingResponse(
+                _export_csv(date_from, date_to),
+                media_type="text/csv; charset=utf-8",
+                headers={"Content-Disposition": f'attachment; filename="pedidos-{stamp}.csv"'}
+            )
+        if export_format == "ndjson":
+            return StreamingResponse(
+                _export_ndjson(date_from, date_to),
+                media_type="application/x-ndjson",
+                headers={"Content-Disposition": f'attachment; filename="pedidos-{stamp}.ndjson"'}
+            )
+        raise HTTPException(status_code=400, detail="format must be 'ndjson' or 'csv'")
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+@router.post("/api/orders")
 async def create_order(request: Request):
     """Create new order (public)"""
     try:
         body = await request.json()
         data = OrderCreate(**body)
         
-        supabase = get_supabase_admin_client()
-        
-        order_response = supabase.table("order").insert({
+        order_rows = await repo.insert_order({
             "o_customer_name": data.customer_name,
             "o_customer_order": data.customer_order,
             "o_total": data.total,
             "o_created_at": datetime.now(timezone.utc).isoformat()
-        }).execute()
+        })
         
-        if not order_response.data:
+        if not order_rows:
             raise HTTPException(status_code=400, detail="Error creating order")
         
-        order_id = order_response.data[0]["id"]
+        order_id = order_rows[0]["id"]
         
         order_items = []
         for item in data.items:
@@ -415,7 +959,7 @@ async def create_order(request: Request):
             })
         
         if order_items:
-            supabase.table("order_item").insert(order_items).execute()
+            await repo.insert_order_items(order_items)
         
         return JSONResponse(content={"success": True, "message": "Order created!", "order_id": order_id})
     except HTTPException:
@@ -424,17 +968,13 @@ async def create_order(request: Request):
         raise HTTPException(status_code=400, detail=str(e))
 
 
-@app.delete("/api/orders")
+@router.delete("/api/orders")
 async def delete_all_orders(request: Request):
     """Delete all orders (admin only)"""
     try:
-        get_current_user(request)
-        supabase = get_supabase_admin_client()
-        
-        # Delete all order items first
-        supabase.table("order_item").delete().neq("id", "00000000-0000-0000-0000-000000000000").execute()
-        # Delete all orders
-        supabase.table("order").delete().neq("id", "00000000-0000-0000-0000-000000000000").execute()
+        await get_current_user(request)
+        # Delete all order items first, then all orders
+        await repo.delete_all_orders()
         
         return JSONResponse(content={"success": True, "message": "All orders deleted!"})
     except HTTPException:
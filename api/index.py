@@ -1,8 +1,25 @@
-"""API Principal - Health Check"""
-from fastapi import FastAPI
-from fastapi.responses import JSONResponse
+"""API Principal - um único app ASGI com todas as rotas.
 
-app = FastAPI()
+Cada módulo (auth, users, checkout, about, reorder, data) expõe um
+APIRouter. Todas as rotas /api/* caem nesta função serverless, então
+caches e pools de conexão são compartilhados e há um único cold start.
+O servidor local (api/_server.py) usa este mesmo app.
+"""
+import os
+import secrets
+from fastapi import FastAPI, HTTPException, Request
+from fastapi.responses import JSONResponse, PlainTextResponse
+from . import about, auth, checkout, data, reorder, users
+from ._utils.metrics import MetricsMiddleware, metrics
+
+# Se definido, /api/_metrics exige "Authorization: Bearer <METRICS_TOKEN>"
+METRICS_TOKEN = os.getenv("METRICS_TOKEN")
+
+app = FastAPI(title="Dolce Vitta API")
+app.add_middleware(MetricsMiddleware)
+
+for module in (auth, users, checkout, about, reorder, data):
+    app.include_router(module.router)
 
 
 @app.get("/api")
@@ -15,8 +32,27 @@ def handler():
             "version": "1.0.0",
             "endpoints": {
                 "auth": "/api/auth",
-                "items": "/api/items",
-                "users": "/api/users"
+                "users": "/api/users",
+                "categories": "/api/categories",
+                "products": "/api/products",
+                "orders": "/api/orders",
+                "checkout": "/api/checkout",
+                "about": "/api/about",
+                "reorder": "/api/reorder"
             }
         }
     )
+
+
+@app.get("/api/_metrics")
+def prometheus_metrics(request: Request):
+    """Histogramas de latência por rota no formato texto do Prometheus (por instância)"""
+    if METRICS_TOKEN:
+        expected = f"Bearer {METRICS_TOKEN}"
+        if not secrets.compare_digest(request.headers.get("Authorization", ""), expected):
+            raise HTTPException(status_code=401, detail="Invalid metrics token")
+    return PlainTextResponse(
+        metrics.render_prometheus(),
+        media_type="text/plain; version=0.0.4",
+        headers={"Cache-Control": "no-store"}
+    )
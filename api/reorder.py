@@ -1,13 +1,13 @@
 """Reorder - Batch update sort order for categories and products"""
-from fastapi import FastAPI, HTTPException, Request
+from fastapi import APIRouter, HTTPException, Request
 from fastapi.responses import JSONResponse
 from pydantic import BaseModel
 from typing import List
-from datetime import datetime, timezone
-from ._utils.supabase_client import get_supabase_admin_client
+from ._utils import repository as repo
 from ._utils.auth_middleware import get_current_user
+from ._utils.catalog_cache import catalog_cache, PRODUCTS, CATEGORIES
 
-app = FastAPI()
+router = APIRouter(tags=["reorder"])
 
 
 class ReorderItem(BaseModel):
@@ -17,27 +17,27 @@ class ReorderItem(BaseModel):
 
 class ReorderRequest(BaseModel):
     items: List[ReorderItem]
+    # Only write rows whose sort order actually changed
+    only_changed: bool = True
 
 
-@app.put("/api/reorder/categories")
+@router.put("/api/reorder/categories")
 async def reorder_categories(request: Request):
     """Reorder categories (admin only)"""
     try:
-        user = get_current_user(request)
+        user = await get_current_user(request)
         body = await request.json()
         data = ReorderRequest(**body)
         
-        supabase = get_supabase_admin_client()
+        updated = await repo.reorder_categories([item.model_dump() for item in data.items], data.only_changed)
         
-        for item in data.items:
-            supabase.table("category").update({
-                "c_sort_order": item.sort_order,
-                "c_last_update": datetime.now(timezone.utc).isoformat()
-            }).eq("id", item.id).execute()
+        if updated:
+            catalog_cache.invalidate(CATEGORIES)
         
         return JSONResponse(content={
             "success": True,
-            "message": "Categories reordered successfully!"
+            "message": "Categories reordered successfully!",
+            "updated": updated
         })
         
     except HTTPException:
@@ -46,25 +46,23 @@ async def reorder_categories(request: Request):
         raise HTTPException(status_code=400, detail=str(e))
 
 
-@app.put("/api/reorder/products")
+@router.put("/api/reorder/products")
 async def reorder_products(request: Request):
     """Reorder products (admin only)"""
     try:
-        user = get_current_user(request)
+        user = await get_current_user(request)
         body = await request.json()
         data = ReorderRequest(**body)
         
-        supabase = get_supabase_admin_client()
+        updated = await repo.reorder_products([item.model_dump() for item in data.items], data.only_changed)
         
-        for item in data.items:
-            supabase.table("product").update({
-                "p_sort_order": item.sort_order,
-                "p_last_update": datetime.now(timezone.utc).isoformat()
-            }).eq("id", item.id).execute()
+        if updated:
+            catalog_cache.invalidate(PRODUCTS)
         
         return JSONResponse(content={
             "success": True,
-            "message": "Products reordered successfully!"
+            "message": "Products reordered successfully!",
+            "updated": updated
         })
         
     except HTTPException:
@@ -1,13 +1,13 @@
 """Users - Profile and Account management"""
-from fastapi import FastAPI, HTTPException, Request
+from fastapi import APIRouter, HTTPException, Request
 from fastapi.responses import JSONResponse
 from pydantic import BaseModel
 from typing import Optional
 from datetime import datetime, timezone
-from ._utils.supabase_client import get_supabase_admin_client
-from ._utils.auth_middleware import get_current_user
+from ._utils import repository as repo
+from ._utils.auth_middleware import get_current_user, get_admin_profile, token_cache
 
-app = FastAPI()
+router = APIRouter(tags=["users"])
 
 
 class UserUpdate(BaseModel):
@@ -16,19 +16,15 @@ class UserUpdate(BaseModel):
     avatar_url: Optional[str] = None
 
 
-@app.get("/api/users/profile")
+@router.get("/api/users/profile")
 async def get_profile(request: Request):
     """Get logged in admin profile"""
     try:
-        user = get_current_user(request)
-        supabase = get_supabase_admin_client()
+        admin = await get_admin_profile(request)
         
-        response = supabase.table("admin").select("*").eq("id", user["id"]).single().execute()
-        
-        if not response.data:
+        if not admin:
             raise HTTPException(status_code=404, detail="Profile not found")
         
-        admin = response.data
         return JSONResponse(content={
             "success": True,
             "profile": {
@@ -48,16 +44,14 @@ async def get_profile(request: Request):
         raise HTTPException(status_code=400, detail=str(e))
 
 
-@app.put("/api/users/profile")
+@router.put("/api/users/profile")
 async def update_profile(request: Request):
     """Update logged in admin profile"""
     try:
-        user = get_current_user(request)
+        user = await get_current_user(request)
         body = await request.json()
         data = UserUpdate(**body)
         
-        supabase = get_supabase_admin_client()
-        
         update_data = {
             "a_last_update": datetime.now(timezone.utc).isoformat()
         }
@@ -68,12 +62,13 @@ async def update_profile(request: Request):
         if data.avatar_url is not None:
             update_data["a_avatar_url"] = data.avatar_url
         
-        response = supabase.table("admin").update(update_data).eq("id", user["id"]).execute()
+        rows = await repo.update_admin(user["id"], update_data)
+        token_cache.forget_admin(user["id"])
         
-        if not response.data:
+        if not rows:
             raise HTTPException(status_code=404, detail="Profile not found")
         
-        admin = response.data[0]
+        admin = rows[0]
         return JSONResponse(content={
             "success": True,
             "message": "Profile updated successfully!",
@@ -92,14 +87,13 @@ async def update_profile(request: Request):
         raise HTTPException(status_code=400, detail=str(e))
 
 
-@app.delete("/api/users/account")
+@router.delete("/api/users/account")
 async def delete_account(request: Request):
     """Delete user account"""
     try:
-        user = get_current_user(request)
-        supabase_admin = get_supabase_admin_client()
-        
-        supabase_admin.auth.admin.delete_user(user["id"])
+        user = await get_current_user(request)
+        await repo.delete_auth_user(user["id"])
+        token_cache.forget_user(user["id"])
         
         return JSONResponse(content={
             "success": True,
@@ -0,0 +1 @@
+"""Offline performance benchmarks for the backend (run with `python -m benchmarks.<name>`)"""
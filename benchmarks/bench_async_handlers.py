@@ -0,0 +1,84 @@
+"""Requests/sec of the catalog endpoints: blocking sync client vs async repository.
+
+Both variants run against the in-process PostgREST stand-in with a simulated
+round-trip latency, driven by an in-process ASGI client at 50 and 200
+concurrent connections.
+
+    python -m benchmarks.bench_async_handlers [--latency 0.02] [--requests 1000]
+"""
+import argparse
+import asyncio
+import time
+
+import httpx
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse
+
+from api._utils.supabase_client import registry, get_supabase_client
+from api._utils.auth_middleware import extract_token
+from .fake_postgrest import FakePostgrest, seed_tables
+
+
+def build_blocking_app() -> FastAPI:
+    """The pre-repository handler: sync .execute() inside an async def"""
+    app = FastAPI()
+
+    @app.get("/api/products")
+    async def list_products(request: Request):
+        supabase = get_supabase_client(extract_token(request))
+        response = supabase.table("product").select("*, category(c_name)").order("p_sort_order").execute()
+        products = [{
+            "id": p["id"],
+            "p_name": p["p_name"],
+            "p_description": p["p_description"],
+            "p_price": float(p["p_price"]) if p["p_price"] else 0,
+            "p_image_url": p["p_image_url"],
+            "p_is_available": p["p_is_available"],
+            "p_is_featured": p["p_is_featured"],
+            "p_category_id": p["p_category_id"],
+            "p_sort_order": p.get("p_sort_order", 0),
+            "category_name": p["category"]["c_name"] if p.get("category") else None
+        } for p in response.data]
+        return JSONResponse(content={"success": True, "products": products})
+
+    return app
+
+
+async def run_load(app, path: str, concurrency: int, total: int) -> float:
+    """Fire `total` GETs with at most `concurrency` in flight; returns req/s"""
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        semaphore = asyncio.Semaphore(concurrency)
+
+        async def one():
+            async with semaphore:
+                response = await client.get(path)
+                response.raise_for_status()
+
+        started = time.perf_counter()
+        await asyncio.gather(*(one() for _ in range(total)))
+        return total / (time.perf_counter() - started)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--latency", type=float, default=0.02, help="simulated DB round-trip (s)")
+    parser.add_argument("--requests", type=int, default=1000)
+    parser.add_argument("--products", type=int, default=100)
+    args = parser.parse_args()
+
+    from api.index import app as async_app
+
+    fake = FakePostgrest(seed_tables(products=args.products), latency=args.latency)
+    fake.install(registry)
+
+    print(f"latency={args.latency * 1000:.0f}ms  requests={args.requests}  products={args.products}")
+    print(f"{'variant':<12}{'concurrency':>12}{'req/s':>12}")
+    for concurrency in (50, 200):
+        for name, app in (("blocking", build_blocking_app()), ("async", async_app)):
+            rps = asyncio.run(run_load(app, "/api/products", concurrency, args.requests))
+            print(f"{name:<12}{concurrency:>12}{rps:>12.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,83 @@
+"""Per-request auth overhead for an admin endpoint (/api/auth/me style).
+
+- unverified: the old path, decode without checking the signature and
+  fetch the admin row on every request
+- verify: signature checked locally, admin row fetched (token cache cold)
+- cached: token already in the verified-token LRU with its admin profile
+
+    python -m benchmarks.bench_auth [--latency 0.02] [--requests 2000]
+"""
+import argparse
+import asyncio
+import time
+import uuid
+
+from jose import jwt
+from starlette.requests import Request
+
+from api._utils import repository as repo
+from api._utils.auth_middleware import get_admin_profile, signing_keys, token_cache
+from api._utils.supabase_client import registry
+from .fake_postgrest import FakePostgrest, seed_tables
+
+SECRET = "bench-jwt-secret"
+
+
+def make_request(token: str) -> Request:
+    return Request({"type": "http", "headers": [(b"authorization", f"Bearer {token}".encode())]})
+
+
+async def unverified(token: str):
+    payload = jwt.decode(token, "", options={"verify_signature": False, "verify_aud": False})
+    return await repo.get_admin(payload["sub"])
+
+
+async def verify(token: str):
+    token_cache.clear()
+    return await get_admin_profile(make_request(token))
+
+
+async def cached(token: str):
+    return await get_admin_profile(make_request(token))
+
+
+async def measure(fn, token: str, total: int) -> float:
+    """Mean microseconds per call"""
+    await fn(token)
+    started = time.perf_counter()
+    for _ in range(total):
+        await fn(token)
+    return (time.perf_counter() - started) / total * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--latency", type=float, default=0.02, help="simulated DB round-trip (s)")
+    parser.add_argument("--requests", type=int, default=2000)
+    args = parser.parse_args()
+
+    fake = FakePostgrest(seed_tables(products=0), latency=args.latency)
+    fake.install(registry)
+    signing_keys.secret = SECRET
+    user_id = str(uuid.uuid4())
+    fake.tables["admin"].append({"id": user_id, "a_email": "admin@example.com", "a_name": "Admin", "a_is_active": True})
+    token = jwt.encode({
+        "sub": user_id,
+        "email": "admin@example.com",
+        "role": "authenticated",
+        "aud": "authenticated",
+        "exp": int(time.time()) + 3600,
+    }, SECRET, algorithm="HS256")
+
+    # Network-bound variants get fewer iterations
+    slow = max(20, min(args.requests, int(2 / max(args.latency, 0.001))))
+    print(f"latency={args.latency * 1000:.0f}ms")
+    print(f"{'path':<12}{'us/request':>12}{'db hops':>9}")
+    for name, fn, total in (("unverified", unverified, slow), ("verify", verify, slow), ("cached", cached, args.requests)):
+        before = fake.requests
+        us = asyncio.run(measure(fn, token, total))
+        print(f"{name:<12}{us:>12.1f}{(fake.requests - before) / (total + 1):>9.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,71 @@
+"""Cold public menu: category + product join vs the catalog_snapshot row.
+
+Every request runs right after the catalog cache was invalidated, so each
+one goes to PostgREST, which is what a worker does after an admin write.
+With the snapshot off, /api/catalog reads categories and products and
+groups them in the API. With it on, it reads the one precomputed row. The
+report shows the PostgREST queries per request and the request latency.
+
+The stand-in does not plan joins or evaluate RLS, so this measures
+round-trips and API work; on Postgres the snapshot also skips the
+per-row policy checks and the join itself.
+
+    python -m benchmarks.bench_catalog_snapshot [--latency 0.02] [--products 300] [--requests 200]
+"""
+import argparse
+import asyncio
+import time
+
+import httpx
+
+import api.data as data
+from api._utils.catalog_cache import catalog_cache
+from api._utils.supabase_client import registry
+from .bench_checkout import percentile
+from .fake_postgrest import FakePostgrest, seed_tables
+
+PATH = "/api/catalog"
+
+
+async def cold_requests(client: httpx.AsyncClient, path: str, count: int) -> list:
+    """Latencies (ms) of `count` requests that each miss the catalog cache"""
+    samples = []
+    for _ in range(count):
+        catalog_cache.invalidate()
+        started = time.perf_counter()
+        response = await client.get(path)
+        assert response.status_code == 200, response.text
+        assert response.headers.get("X-Cache") == "MISS", response.headers
+        samples.append((time.perf_counter() - started) * 1000)
+    return samples
+
+
+async def run(app, fake: FakePostgrest, args) -> None:
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://bench") as client:
+        for enabled in (False, True):
+            data.CATALOG_SNAPSHOT = enabled
+            before = fake.requests
+            samples = await cold_requests(client, PATH, args.requests)
+            queries = (fake.requests - before) / args.requests
+            source = "snapshot" if enabled else "join"
+            print(f"{source:<10}{queries:>12.1f}{percentile(samples, 0.5):>9.2f}{percentile(samples, 0.95):>9.2f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--latency", type=float, default=0.02, help="simulated DB round-trip (s)")
+    parser.add_argument("--products", type=int, default=300)
+    parser.add_argument("--requests", type=int, default=200, help="cold requests per endpoint and mode")
+    args = parser.parse_args()
+
+    from api.index import app
+
+    fake = FakePostgrest(seed_tables(products=args.products), latency=args.latency)
+    fake.install(registry)
+    print(f"{PATH} cold, latency={args.latency * 1000:.0f}ms products={args.products}")
+    print(f"{'source':<10}{'queries/req':>12}{'p50 ms':>9}{'p95 ms':>9}")
+    asyncio.run(run(app, fake, args))
+
+
+if __name__ == "__main__":
+    main()
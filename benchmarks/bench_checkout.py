@@ -0,0 +1,90 @@
+"""Checkout latency: four sequential round-trips vs the create_order RPC.
+
+The legacy path is the pre-RPC handler body (fetch products, insert order,
+insert items, fetch the WhatsApp number). The RPC path is what the handler
+does now: one create_order call, with the WhatsApp number read from the
+cached about settings. Both run against the in-process PostgREST stand-in
+with a simulated round-trip latency.
+
+    python -m benchmarks.bench_checkout [--latency 0.02] [--orders 200]
+"""
+import argparse
+import asyncio
+import random
+import statistics
+import time
+
+from api._utils import repository as repo
+from api._utils.about_settings import about_settings
+from api._utils.supabase_client import registry
+from .fake_postgrest import FakePostgrest, seed_tables
+
+
+async def legacy_checkout(customer_name: str, items: list) -> str:
+    products = {p["id"]: p for p in await repo.get_products_by_ids([i["product_id"] for i in items])}
+    lines = []
+    for item in items:
+        product = products.get(item["product_id"])
+        if product:
+            lines.append((product, item["quantity"], float(product["p_price"]) * item["quantity"]))
+    order_rows = await repo.insert_order({
+        "o_customer_name": customer_name,
+        "o_total": sum(subtotal for _, _, subtotal in lines),
+    })
+    order_id = order_rows[0]["id"]
+    await repo.insert_order_items([{
+        "oi_order_id": order_id,
+        "oi_product_id": product["id"],
+        "oi_product_name": product["p_name"],
+        "oi_product_price": product["p_price"],
+        "oi_quantity": quantity,
+        "oi_subtotal": subtotal,
+    } for product, quantity, subtotal in lines])
+    await repo.get_about("ab_whatsapp")
+    return order_id
+
+
+async def rpc_checkout(customer_name: str, items: list) -> str:
+    order, _ = await asyncio.gather(repo.create_order(customer_name, items), about_settings.get())
+    return order["order_id"]
+
+
+def percentile(samples: list, pct: float) -> float:
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * pct))]
+
+
+async def run(checkout, carts: list) -> list:
+    samples = []
+    for i, items in enumerate(carts):
+        started = time.perf_counter()
+        await checkout(f"Cliente {i}", items)
+        samples.append((time.perf_counter() - started) * 1000)
+    return samples
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--latency", type=float, default=0.02, help="simulated DB round-trip (s)")
+    parser.add_argument("--orders", type=int, default=200)
+    args = parser.parse_args()
+
+    fake = FakePostgrest(seed_tables(products=100), latency=args.latency)
+    fake.install(registry)
+    rnd = random.Random(7)
+    ids = [p["id"] for p in fake.tables["product"]]
+    carts = [
+        [{"product_id": pid, "quantity": rnd.randint(1, 3)} for pid in rnd.sample(ids, rnd.randint(1, 5))]
+        for _ in range(args.orders)
+    ]
+
+    print(f"latency={args.latency * 1000:.0f}ms orders={args.orders}")
+    print(f"{'path':<10}{'p50 ms':>10}{'p95 ms':>10}{'requests':>10}")
+    for name, checkout in (("legacy", legacy_checkout), ("rpc", rpc_checkout)):
+        before = fake.requests
+        samples = asyncio.run(run(checkout, carts))
+        print(f"{name:<10}{statistics.median(samples):>10.1f}{percentile(samples, 0.95):>10.1f}{fake.requests - before:>10}")
+
+
+if __name__ == "__main__":
+    main()
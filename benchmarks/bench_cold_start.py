@@ -0,0 +1,116 @@
+"""Cold-start profile: import time, time to first response and import breakdown.
+
+Every run is a fresh interpreter (`python -X importtime`) that imports an
+app, then serves one request in-process against the PostgREST stand-in.
+`data` and `checkout` mount a single router on a bare FastAPI app (what the
+per-file Vercel functions used to load); `index` is the consolidated app.
+Each target is measured with SUPABASE_LAZY_INIT=0 (eager) and 1 (lazy).
+
+    python -m benchmarks.bench_cold_start [--runs 5] [--top 15]
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+from collections import defaultdict
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+
+TARGETS = {
+    "data": ("GET", "/api/products"),
+    "checkout": ("POST", "/api/checkout"),
+    "index": ("GET", "/api/products"),
+}
+
+# Runs inside the child interpreter; prints one JSON line
+CHILD = r"""
+import json, sys, time
+started = time.perf_counter()
+target, method, path = sys.argv[1:4]
+if target == "index":
+    from api.index import app
+else:
+    import importlib
+    from fastapi import FastAPI
+    app = FastAPI()
+    app.include_router(importlib.import_module(f"api.{target}").router)
+imported = time.perf_counter()
+
+import asyncio, httpx
+from api._utils.supabase_client import registry
+from benchmarks.fake_postgrest import FakePostgrest, seed_tables
+fake = FakePostgrest(seed_tables(products=20))
+fake.install(registry)
+body = {"customer_name": "Bia", "items": [{"product_id": fake.tables["product"][0]["id"], "quantity": 1}]}
+
+async def first_request():
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://cold") as client:
+        sent = time.perf_counter()
+        response = await client.request(method, path, json=body if method == "POST" else None)
+        return response.status_code, time.perf_counter() - sent
+
+status, elapsed = asyncio.run(first_request())
+print(json.dumps({"import_ms": (imported - started) * 1000, "first_response_ms": elapsed * 1000, "status": status}))
+"""
+
+
+def run_child(target: str, lazy: bool) -> tuple:
+    """(timings, importtime lines) for one fresh interpreter"""
+    method, path = TARGETS[target]
+    env = {
+        **os.environ,
+        "PYTHONPATH": str(ROOT),
+        "SUPABASE_LAZY_INIT": "1" if lazy else "0",
+        "SUPABASE_URL": "http://fake-supabase.local",
+        "SUPABASE_ANON_KEY": "fake-anon-key",
+        "SUPABASE_SERVICE_ROLE_KEY": "fake-service-role-key",
+    }
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", CHILD, target, method, path],
+        cwd=ROOT, env=env, capture_output=True, text=True, check=True,
+    )
+    return json.loads(proc.stdout.strip().splitlines()[-1]), proc.stderr.splitlines()
+
+
+def import_breakdown(lines: list) -> dict:
+    """Self import time (ms) per top-level package"""
+    totals = defaultdict(float)
+    for line in lines:
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, _, name = line[len("import time:"):].split("|")
+        totals[name.strip().split(".")[0]] += int(self_us) / 1000
+    return totals
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--top", type=int, default=15, help="packages to list in the import breakdown")
+    args = parser.parse_args()
+
+    print(f"{'target':<10}{'mode':<7}{'import ms':>11}{'first resp ms':>15}{'total ms':>10}")
+    breakdowns = {}
+    for target in TARGETS:
+        for lazy in (False, True):
+            runs = [run_child(target, lazy) for _ in range(args.runs)]
+            for timings, _ in runs:
+                assert timings["status"] == 200, timings
+            import_ms = statistics.median(t["import_ms"] for t, _ in runs)
+            first_ms = statistics.median(t["first_response_ms"] for t, _ in runs)
+            mode = "lazy" if lazy else "eager"
+            print(f"{target:<10}{mode:<7}{import_ms:>11.1f}{first_ms:>15.1f}{import_ms + first_ms:>10.1f}")
+            if target == "index":
+                breakdowns[mode] = import_breakdown(runs[-1][1])
+
+    for mode, totals in breakdowns.items():
+        print(f"\nindex ({mode}) - heaviest packages, self import time incl. first request:")
+        for name, ms in sorted(totals.items(), key=lambda kv: kv[1], reverse=True)[:args.top]:
+            print(f"  {name:<28}{ms:>8.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,83 @@
+"""Onboarding a menu: one POST /api/products per item vs one POST /api/products/import.
+
+Both paths go through the app with an admin token, against the in-process
+PostgREST stand-in with a simulated round-trip latency. The report shows
+the wall time and the PostgREST queries for each menu size.
+
+    python -m benchmarks.bench_import [--latency 0.005]
+"""
+import argparse
+import asyncio
+import time
+
+import httpx
+
+from .load_test import build_context
+
+CATEGORY_NAMES = ("Bolos", "Tortas", "Doces")
+
+
+def menu(size: int) -> list:
+    return [
+        {
+            "name": f"Produto {i}",
+            "price": 10 + i % 90,
+            "category": CATEGORY_NAMES[i % len(CATEGORY_NAMES)],
+            "sort_order": i,
+        }
+        for i in range(size)
+    ]
+
+
+async def one_by_one(client: httpx.AsyncClient, headers: dict, products: list, category_ids: dict) -> None:
+    for p in products:
+        body = {key: value for key, value in p.items() if key != "category"}
+        body["category_id"] = category_ids[p["category"]]
+        response = await client.post("/api/products", json=body, headers=headers)
+        assert response.status_code == 200, response.text
+
+
+async def bulk(client: httpx.AsyncClient, headers: dict, products: list) -> None:
+    response = await client.post("/api/products/import", json=products, headers=headers)
+    assert response.status_code == 200, response.text
+    assert response.json()["failed"] == 0, response.text
+
+
+async def run(app, args) -> None:
+    ctx = build_context(products=10, orders=1, latency=args.latency)
+    ctx.fake.tables["category"].extend(
+        {"id": f"c0000000-0000-0000-0000-00000000000{i}", "c_name": name, "c_is_active": True, "c_sort_order": 100 + i}
+        for i, name in enumerate(CATEGORY_NAMES)
+    )
+    category_ids = {c["c_name"]: c["id"] for c in ctx.fake.tables["category"]}
+
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://bench") as client:
+        for size in args.sizes:
+            products = menu(size)
+            row = [size]
+            for name, call in (
+                ("one by one", one_by_one(client, ctx.admin_headers, products, category_ids)),
+                ("import", bulk(client, ctx.admin_headers, products)),
+            ):
+                before = ctx.fake.requests
+                started = time.perf_counter()
+                await call
+                row += [(time.perf_counter() - started) * 1000, ctx.fake.requests - before]
+            print(f"{row[0]:>6}{row[1]:>14.0f}{row[2]:>10}{row[3]:>12.0f}{row[4]:>10}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--latency", type=float, default=0.005, help="simulated DB round-trip (s)")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[100, 1000])
+    args = parser.parse_args()
+
+    from api.index import app
+
+    print(f"latency={args.latency * 1000:.0f}ms")
+    print(f"{'items':>6}{'per-item ms':>14}{'queries':>10}{'import ms':>12}{'queries':>10}")
+    asyncio.run(run(app, args))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,72 @@
+"""PostgREST payload size and parse time: `select=*` vs the endpoint projections.
+
+For each hot query the stand-in is asked for the same rows twice, once with
+the old `*` select and once with the projection the endpoint now declares.
+The report shows the bytes sent by PostgREST and the time to parse them.
+
+    python -m benchmarks.bench_payload_size [--products 300] [--repeat 200]
+"""
+import argparse
+import json
+import time
+
+import httpx
+
+from api.data import CATEGORY_SELECT, ORDER_ITEM_SELECT, ORDER_SELECT, PRODUCT_SELECT
+from api._utils.about_settings import ABOUT_SELECT
+from api._utils.auth_middleware import ADMIN_PROFILE_SELECT
+from .fake_postgrest import FAKE_SUPABASE_URL, FakePostgrest, seed_tables
+
+
+def queries(fake: FakePostgrest) -> list:
+    """(name, table, extra params, old select, projected select)"""
+    product_ids = [p["id"] for p in fake.tables["product"][:4]]
+    admin_id = fake.tables["admin"][0]["id"]
+    order_select = f"{ORDER_SELECT},order_item({ORDER_ITEM_SELECT})"
+    return [
+        ("products list", "product", {"order": "p_sort_order"}, "*,category(c_name)", PRODUCT_SELECT),
+        ("product detail", "product", {"id": f"eq.{product_ids[0]}"}, "*,category(c_name)", PRODUCT_SELECT),
+        ("categories", "category", {"c_is_active": "eq.true", "order": "c_sort_order"}, "*", CATEGORY_SELECT),
+        ("about", "about", {"limit": "1"}, "*", ABOUT_SELECT),
+        ("admin profile", "admin", {"id": f"eq.{admin_id}"}, "*", ADMIN_PROFILE_SELECT),
+        ("orders page", "order", {"order": "o_created_at.desc,id.desc", "limit": "21"}, "*,order_item(*)", order_select),
+        ("cart pricing", "product", {"id": f"in.({','.join(product_ids)})"}, "*", "id,p_name,p_price"),
+    ]
+
+
+def fetch(fake: FakePostgrest, table: str, params: dict, select: str) -> bytes:
+    request = httpx.Request("GET", f"{FAKE_SUPABASE_URL}/rest/v1/{table}", params={"select": select, **params})
+    return fake.respond(request).content
+
+
+def parse_us(body: bytes, repeat: int) -> float:
+    started = time.perf_counter()
+    for _ in range(repeat):
+        json.loads(body)
+    return (time.perf_counter() - started) / repeat * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--products", type=int, default=300)
+    parser.add_argument("--repeat", type=int, default=200, help="parses per measurement")
+    args = parser.parse_args()
+
+    fake = FakePostgrest(seed_tables(products=args.products, orders=500))
+    fake.tables["admin"].append({
+        "id": "11111111-1111-1111-1111-111111111111", "a_email": "admin@example.com", "a_name": "Admin",
+        "a_phone": "+55 11 98888-7777", "a_avatar_url": "https://cdn.example.com/avatar.jpg", "a_is_active": True,
+        "a_created_at": "2024-01-01T00:00:00+00:00", "a_last_update": "2024-06-01T00:00:00+00:00",
+    })
+
+    print(f"{'query':<16}{'* bytes':>10}{'proj bytes':>12}{'saved':>8}{'* parse us':>12}{'proj parse us':>15}")
+    for name, table, params, old, projected in queries(fake):
+        full = fetch(fake, table, params, old)
+        slim = fetch(fake, table, params, projected)
+        saved = 1 - len(slim) / len(full)
+        print(f"{name:<16}{len(full):>10}{len(slim):>12}{saved:>8.0%}"
+              f"{parse_us(full, args.repeat):>12.1f}{parse_us(slim, args.repeat):>15.1f}")
+
+
+if __name__ == "__main__":
+    main()
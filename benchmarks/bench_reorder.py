@@ -0,0 +1,62 @@
+"""Latency of a product reorder: one UPDATE per item vs one reorder_products RPC.
+
+Runs against the in-process PostgREST stand-in with a simulated round-trip
+latency. "diff" is the RPC in only_changed mode after moving a single
+product to the top, where just the shifted rows need writing.
+
+    python -m benchmarks.bench_reorder [--latency 0.005]
+"""
+import argparse
+import asyncio
+import time
+
+from api._utils import repository as repo
+from api._utils.supabase_client import registry
+from .fake_postgrest import FakePostgrest, seed_tables
+
+
+async def per_item(items):
+    for item in items:
+        await repo.update_product(item["id"], {"p_sort_order": item["sort_order"]})
+
+
+async def timed(coro) -> float:
+    started = time.perf_counter()
+    await coro
+    return (time.perf_counter() - started) * 1000
+
+
+async def run(size: int, latency: float) -> dict:
+    fake = FakePostgrest(seed_tables(categories=1, products=size), latency=latency)
+    fake.install(registry)
+    ids = [p["id"] for p in fake.tables["product"]]
+    # Drag the last product to the top
+    moved = [ids[-1]] + ids[:-1]
+    items = [{"id": pid, "sort_order": i} for i, pid in enumerate(moved)]
+
+    results = {}
+    results["per_item"] = await timed(per_item(items))
+    requests_before = fake.requests
+    results["rpc_full"] = await timed(repo.reorder_products(items, only_changed=False))
+    results["rpc_requests"] = fake.requests - requests_before
+
+    for i, p in enumerate(fake.tables["product"]):
+        p["p_sort_order"] = i
+    results["rpc_diff"] = await timed(repo.reorder_products(items, only_changed=True))
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--latency", type=float, default=0.005, help="simulated DB round-trip (s)")
+    args = parser.parse_args()
+
+    print(f"latency={args.latency * 1000:.0f}ms")
+    print(f"{'items':>6}{'per-item ms':>14}{'rpc ms':>10}{'rpc diff ms':>14}{'rpc calls':>11}")
+    for size in (10, 100, 1000):
+        r = asyncio.run(run(size, args.latency))
+        print(f"{size:>6}{r['per_item']:>14.1f}{r['rpc_full']:>10.1f}{r['rpc_diff']:>14.1f}{r['rpc_requests']:>11}")
+
+
+if __name__ == "__main__":
+    main()
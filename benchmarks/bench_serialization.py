@@ -0,0 +1,105 @@
+"""Response serialization: hand-built dicts + json.dumps vs response models.
+
+The rows are what PostgREST returns for each endpoint's projection. The
+"dicts" path rebuilds them field by field and encodes them the way
+JSONResponse does, which is what the handlers did before. The "models"
+path validates them into the response models and encodes them with
+pydantic-core. Both must produce the same JSON; the report shows the time
+from rows to response bytes.
+
+    python -m benchmarks.bench_serialization [--products 500] [--orders 10000] [--repeat 10]
+"""
+import argparse
+import json
+import statistics
+import time
+
+import httpx
+
+from api.data import ORDER_ITEM_SELECT, ORDER_SELECT, PRODUCT_SELECT
+from api._utils.schemas import OrderPageWithItems, ProductList, encode_json
+from .fake_postgrest import FAKE_SUPABASE_URL, FakePostgrest, seed_tables
+
+PRODUCT_KEYS = (
+    "id", "p_name", "p_description", "p_price", "p_image_url",
+    "p_is_available", "p_is_featured", "p_category_id", "p_sort_order",
+)
+ORDER_KEYS = ("id", "o_customer_name", "o_customer_order", "o_total", "o_created_at")
+
+
+def json_response_body(content: dict) -> bytes:
+    """What JSONResponse.render does"""
+    return json.dumps(content, ensure_ascii=False, allow_nan=False, indent=None, separators=(",", ":")).encode("utf-8")
+
+
+def products_dicts(rows: list) -> bytes:
+    products = []
+    for p in rows:
+        product = {key: p.get(key) for key in PRODUCT_KEYS}
+        product["p_price"] = float(p["p_price"]) if p["p_price"] else 0
+        product["category_name"] = p["category"]["c_name"] if p.get("category") else None
+        products.append(product)
+    return json_response_body({"success": True, "products": products})
+
+
+def products_models(rows: list) -> bytes:
+    return encode_json(ProductList(products=rows))
+
+
+def orders_dicts(rows: list) -> bytes:
+    orders = []
+    for o in rows:
+        order = {key: o[key] for key in ORDER_KEYS}
+        order["o_total"] = float(o["o_total"]) if o["o_total"] else 0
+        order["order_item"] = o.get("order_item", [])
+        orders.append(order)
+    return json_response_body({"success": True, "orders": orders, "next_cursor": None})
+
+
+def orders_models(rows: list) -> bytes:
+    return encode_json(OrderPageWithItems(orders=rows, next_cursor=None))
+
+
+def fetch(fake: FakePostgrest, table: str, params: dict) -> list:
+    """Rows as the API receives them from PostgREST"""
+    request = httpx.Request("GET", f"{FAKE_SUPABASE_URL}/rest/v1/{table}", params=params)
+    return json.loads(fake.respond(request).content)
+
+
+def timed_ms(fn, rows: list, repeat: int) -> float:
+    samples = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn(rows)
+        samples.append((time.perf_counter() - started) * 1000)
+    return statistics.median(samples)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--products", type=int, default=500)
+    parser.add_argument("--orders", type=int, default=10000)
+    parser.add_argument("--repeat", type=int, default=10, help="encodes per measurement (median is shown)")
+    args = parser.parse_args()
+
+    fake = FakePostgrest(seed_tables(products=args.products, orders=args.orders))
+    cases = [
+        (f"catalog ({args.products} products)",
+         fetch(fake, "product", {"select": PRODUCT_SELECT, "order": "p_sort_order"}),
+         products_dicts, products_models),
+        (f"history ({args.orders} orders)",
+         fetch(fake, "order", {"select": f"{ORDER_SELECT},order_item({ORDER_ITEM_SELECT})", "order": "o_created_at.desc,id.desc"}),
+         orders_dicts, orders_models),
+    ]
+
+    print(f"{'response':<26}{'bytes':>10}{'dicts ms':>10}{'models ms':>11}{'speedup':>9}")
+    for name, rows, dicts, models in cases:
+        body = models(rows)
+        assert json.loads(body) == json.loads(dicts(rows)), f"{name}: the two encoders disagree"
+        old = timed_ms(dicts, rows, args.repeat)
+        new = timed_ms(models, rows, args.repeat)
+        print(f"{name:<26}{len(body):>10}{old:>10.2f}{new:>11.2f}{old / new:>8.1f}x")
+
+
+if __name__ == "__main__":
+    main()
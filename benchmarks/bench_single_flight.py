@@ -0,0 +1,69 @@
+"""Cold-cache stampede on the public catalog: single-flight off vs on.
+
+Each burst sends `--concurrency` simultaneous anonymous requests to one
+endpoint right after the catalog cache was invalidated, which is what a
+worker sees when the menu link is shared and the cache is cold. The report
+shows the PostgREST queries each burst issued and the request latency.
+
+    python -m benchmarks.bench_single_flight [--latency 0.02] [--concurrency 200]
+"""
+import argparse
+import asyncio
+import time
+
+import httpx
+
+from api._utils.catalog_cache import catalog_cache
+from api._utils.single_flight import single_flight
+from api._utils.supabase_client import registry
+from .bench_checkout import percentile
+from .fake_postgrest import FakePostgrest, seed_tables
+
+ENDPOINTS = ("/api/products", "/api/categories", "/api/about")
+
+
+async def burst(client: httpx.AsyncClient, path: str, concurrency: int) -> list:
+    catalog_cache.invalidate()
+
+    async def one():
+        started = time.perf_counter()
+        response = await client.get(path)
+        assert response.status_code == 200, response.text
+        return (time.perf_counter() - started) * 1000
+
+    return await asyncio.gather(*(one() for _ in range(concurrency)))
+
+
+async def run(app, fake: FakePostgrest, args) -> None:
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://bench") as client:
+        for path in ENDPOINTS:
+            for enabled in (False, True):
+                single_flight.enabled = enabled
+                before = fake.requests
+                samples = []
+                for _ in range(args.bursts):
+                    samples.extend(await burst(client, path, args.concurrency))
+                queries = (fake.requests - before) / args.bursts
+                mode = "on" if enabled else "off"
+                print(f"{path:<18}{mode:<5}{queries:>14.1f}{percentile(samples, 0.5):>9.1f}{percentile(samples, 0.95):>9.1f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--latency", type=float, default=0.02, help="simulated DB round-trip (s)")
+    parser.add_argument("--concurrency", type=int, default=200, help="simultaneous requests per burst")
+    parser.add_argument("--bursts", type=int, default=5)
+    args = parser.parse_args()
+
+    from api.index import app
+
+    fake = FakePostgrest(seed_tables(products=200), latency=args.latency)
+    fake.install(registry)
+    print(f"latency={args.latency * 1000:.0f}ms concurrency={args.concurrency}")
+    print(f"{'endpoint':<18}{'sf':<5}{'queries/burst':>14}{'p50 ms':>9}{'p95 ms':>9}")
+    asyncio.run(run(app, fake, args))
+    print(single_flight.stats()["queries"])
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,657 @@
+"""In-process PostgREST stand-in for offline benchmarks.
+
+Implements the subset of the PostgREST HTTP API the backend uses (select
+with embedded relations, eq/neq/gt/gte/lt/lte/in/is/like/ilike filters, order, limit,
+insert, update, delete, Python stand-ins for the SQL functions in
+supabase/schema.sql called over RPC, and for the tables its triggers
+maintain) over in-memory tables, with an optional simulated
+network latency per request. It plugs into the Supabase client registry
+through httpx mock transports, so no network or database is needed.
+
+Filters are compiled once per distinct expression, sorted tables and
+relation indexes are kept until the next write, and limited selects stop
+scanning once the page is full, so seeding tens of thousands of orders
+does not turn the stand-in into the bottleneck of a load test.
+"""
+import asyncio
+import json
+import operator
+import random
+import re
+import time
+import uuid
+from datetime import date, datetime, timedelta, timezone
+from functools import lru_cache
+from itertools import islice
+from typing import Optional
+from urllib.parse import parse_qsl
+from zoneinfo import ZoneInfo
+
+import httpx
+
+FAKE_SUPABASE_URL = "http://fake-supabase.local"
+
+# (table, embedded) -> (fk column, kind)
+RELATIONS = {
+    ("product", "category"): ("p_category_id", "parent"),
+    ("order", "order_item"): ("oi_order_id", "children"),
+    ("order_item", "order"): ("oi_order_id", "parent"),
+}
+
+# table -> columns declared NOT NULL without a default in supabase/schema.sql.
+# Postgres checks them on the proposed row of an insert before it looks for
+# a conflict, so an upsert must carry them even when it ends up updating.
+NOT_NULL = {
+    "admin": ("a_email",),
+    "category": ("c_name",),
+    "product": ("p_name", "p_price"),
+    "order": ("o_customer_name", "o_total"),
+    "order_item": ("oi_order_id", "oi_product_name", "oi_product_price", "oi_subtotal"),
+    "about": ("ab_name",),
+    "idempotency_key": ("ik_expires_at",),
+}
+
+
+class NotNullViolation(ValueError):
+    """A write left out (or nulled) a NOT NULL column"""
+
+
+@lru_cache(maxsize=256)
+def _split_top_level(value: str) -> tuple:
+    """Split on commas that are not inside parentheses (cached: filters repeat per row)"""
+    parts, depth, current = [], 0, ""
+    for ch in value:
+        if ch == "(":
+            depth += 1
+        elif ch == ")":
+            depth -= 1
+        if ch == "," and depth == 0:
+            parts.append(current.strip())
+            current = ""
+        else:
+            current += ch
+    if current.strip():
+        parts.append(current.strip())
+    return tuple(parts)
+
+
+def _coerce(raw: str, sample):
+    """Convert a filter literal to the type of the column value"""
+    if raw == "null":
+        return None
+    if isinstance(sample, bool):
+        return raw == "true"
+    if isinstance(sample, (int, float)) and not isinstance(sample, bool):
+        try:
+            return type(sample)(raw)
+        except ValueError:
+            return float(raw)
+    return raw
+
+
+@lru_cache(maxsize=256)
+def _predicate(column: str, expr: str):
+    """Compile one `column=op.value` filter into a row predicate"""
+    negate = expr.startswith("not.")
+    if negate:
+        expr = expr[4:]
+    op, _, raw = expr.partition(".")
+    if op != "in" and len(raw) > 1 and raw[0] == raw[-1] == '"':
+        raw = raw[1:-1]
+
+    if op == "is":
+        test = (lambda value: value is None) if raw == "null" else (lambda value: value is (raw == "true"))
+    elif op == "in":
+        options = {o.strip().strip('"') for o in raw.strip("()").split(",") if o}
+        test = lambda value: str(value) in options
+    elif op in ("like", "ilike"):
+        # * and % match any run of characters, _ any single one
+        pattern = "".join(
+            ".*" if ch in "*%" else "." if ch == "_" else re.escape(ch) for ch in raw
+        )
+        matcher = re.compile(pattern, (re.IGNORECASE | re.DOTALL) if op == "ilike" else re.DOTALL)
+        test = lambda value: value is not None and matcher.fullmatch(str(value)) is not None
+    elif op in _COMPARISONS:
+        compare = _COMPARISONS[op]
+        targets = {}
+
+        def test(value):
+            # The literal is coerced to the column's type, once per type
+            kind = type(value)
+            if kind not in targets:
+                targets[kind] = _coerce(raw, value)
+            target = targets[kind]
+            if value is None or target is None:
+                return op == "neq" and value != target
+            return compare(value, target)
+    else:
+        raise ValueError(f"Unsupported operator: {op}")
+
+    if negate:
+        return lambda row: not test(row.get(column))
+    return lambda row: test(row.get(column))
+
+
+_COMPARISONS = {
+    "eq": operator.eq,
+    "neq": operator.ne,
+    "gt": operator.gt,
+    "gte": operator.ge,
+    "lt": operator.lt,
+    "lte": operator.le,
+}
+
+
+@lru_cache(maxsize=256)
+def _group_predicate(kind: str, expr: str):
+    """Compile a PostgREST logic tree such as `or=(a.eq.1,and(b.gt.2,c.lt.3))`"""
+    predicates = []
+    for cond in _split_top_level(expr.strip()[1:-1]):
+        if cond.startswith(("and(", "or(")):
+            name = cond[:cond.index("(")]
+            predicates.append(_group_predicate(name, cond[len(name):]))
+        else:
+            column, _, rest = cond.partition(".")
+            predicates.append(_predicate(column, rest))
+    combine = all if kind == "and" else any
+    return lambda row: combine(p(row) for p in predicates)
+
+
+# ============== RPC FUNCTIONS ==============
+# Python equivalents of the functions in supabase/schema.sql
+
+def _rpc_reorder(table: str, prefix: str):
+    def run(fake: "FakePostgrest", params: dict) -> int:
+        by_id = {r["id"]: r for r in fake.tables.get(table, [])}
+        now = datetime.now(timezone.utc).isoformat()
+        updated = 0
+        for item in params["items"]:
+            row = by_id.get(item["id"])
+            if row is None:
+                continue
+            if params.get("only_changed", True) and row.get(f"{prefix}_sort_order") == item["sort_order"]:
+                continue
+            row[f"{prefix}_sort_order"] = item["sort_order"]
+            row[f"{prefix}_last_update"] = now
+            updated += 1
+        return updated
+    return run
+
+
+def _rpc_adjust_product_prices(fake: "FakePostgrest", params: dict) -> list:
+    ids = set(params["ids"])
+    now = datetime.now(timezone.utc).isoformat()
+    updated = []
+    for row in fake.tables.get("product", []):
+        if row["id"] in ids:
+            row["p_price"] = round(row["p_price"] * (1 + params["percent"] / 100), 2)
+            row["p_last_update"] = now
+            updated.append(row["id"])
+    return updated
+
+
+def _rpc_update_products_partial(fake: "FakePostgrest", params: dict) -> list:
+    by_id = {r["id"]: r for r in fake.tables.get("product", [])}
+    now = datetime.now(timezone.utc).isoformat()
+    updated = []
+    for item in params["items"]:
+        row = by_id.get(item["id"])
+        if row is None:
+            continue
+        row.update({k: v for k, v in item.items() if k != "id" and v is not None})
+        row["p_last_update"] = now
+        updated.append(row["id"])
+    return updated
+
+
+def _rpc_create_order(fake: "FakePostgrest", params: dict) -> Optional[dict]:
+    request_key = params.get("request_key")
+    if request_key is None:
+        return _create_order(fake, params)
+    keys = fake.tables.setdefault("idempotency_key", [])
+    now = datetime.now(timezone.utc)
+    keys[:] = [k for k in keys if k["ik_expires_at"] > now.isoformat()]
+    stored = next((k for k in keys if k["ik_key"] == request_key), None)
+    if stored is not None:
+        if stored["ik_request_hash"] != params.get("request_hash"):
+            return {"conflict": True}
+        return {**stored["ik_response"], "replayed": True}
+    result = _create_order(fake, params)
+    if result is not None:
+        keys.append({
+            "ik_key": request_key,
+            "ik_request_hash": params.get("request_hash"),
+            "ik_response": result,
+            "ik_created_at": now.isoformat(),
+            "ik_expires_at": (now + timedelta(seconds=params.get("ttl_seconds", 86400))).isoformat(),
+        })
+    return result
+
+
+def _create_order(fake: "FakePostgrest", params: dict) -> Optional[dict]:
+    products = {p["id"]: p for p in fake.tables.get("product", [])}
+    items = []
+    for line in params["items"]:
+        product = products.get(line["product_id"])
+        if product is None:
+            continue
+        items.append({
+            "product_id": product["id"],
+            "product_name": product["p_name"],
+            "product_price": product["p_price"],
+            "quantity": line["quantity"],
+            "subtotal": round(product["p_price"] * line["quantity"], 2),
+        })
+    if not items:
+        return None
+
+    now = datetime.now(timezone.utc).isoformat()
+    order_id = str(uuid.uuid4())
+    total = round(sum(item["subtotal"] for item in items), 2)
+    fake.tables.setdefault("order", []).append({
+        "id": order_id,
+        "o_customer_name": params["customer_name"],
+        "o_customer_order": None,
+        "o_total": total,
+        "o_created_at": now,
+        "o_last_update": None,
+    })
+    fake.tables.setdefault("order_item", []).extend({
+        "id": str(uuid.uuid4()),
+        "oi_order_id": order_id,
+        "oi_product_id": item["product_id"],
+        "oi_product_name": item["product_name"],
+        "oi_product_price": item["product_price"],
+        "oi_quantity": item["quantity"],
+        "oi_subtotal": item["subtotal"],
+        "oi_created_at": now,
+    } for item in items)
+    return {"order_id": order_id, "total": total, "items": items}
+
+
+def _truncate(day: date, bucket: str) -> date:
+    if bucket == "week":
+        return day - timedelta(days=day.weekday())
+    if bucket == "month":
+        return day.replace(day=1)
+    return day
+
+
+def _next_period(period: date, bucket: str) -> date:
+    if bucket == "week":
+        return period + timedelta(days=7)
+    if bucket == "month":
+        return (period.replace(day=28) + timedelta(days=4)).replace(day=1)
+    return period + timedelta(days=1)
+
+
+def _rpc_order_analytics(fake: "FakePostgrest", params: dict) -> dict:
+    tz = ZoneInfo(params.get("time_zone", "UTC"))
+    bucket = params.get("bucket", "day")
+    start = datetime.fromisoformat(params["date_from"])
+    end = datetime.fromisoformat(params["date_to"])
+
+    periods = {}
+    period = _truncate(start.astimezone(tz).date(), bucket)
+    last = _truncate((end - timedelta(microseconds=1)).astimezone(tz).date(), bucket)
+    while period <= last:
+        periods[period] = {"period": period.isoformat(), "orders": 0, "revenue": 0}
+        period = _next_period(period, bucket)
+
+    orders = {}
+    for o in fake.tables.get("order", []):
+        created_at = datetime.fromisoformat(o["o_created_at"])
+        if start <= created_at < end:
+            orders[o["id"]] = o
+            entry = periods[_truncate(created_at.astimezone(tz).date(), bucket)]
+            entry["orders"] += 1
+            entry["revenue"] = round(entry["revenue"] + o["o_total"], 2)
+
+    products = {}
+    items_sold = 0
+    for item in fake.tables.get("order_item", []):
+        if item["oi_order_id"] in orders:
+            key = (item["oi_product_id"], item["oi_product_name"])
+            entry = products.setdefault(key, {"product_id": key[0], "product_name": key[1], "quantity": 0, "revenue": 0})
+            entry["quantity"] += item["oi_quantity"]
+            entry["revenue"] = round(entry["revenue"] + item["oi_subtotal"], 2)
+            items_sold += item["oi_quantity"]
+
+    revenue = round(sum(o["o_total"] for o in orders.values()), 2)
+    top_limit = params.get("top_limit", 10)
+    return {
+        "summary": {
+            "orders": len(orders),
+            "revenue": revenue,
+            "average_ticket": round(revenue / len(orders), 2) if orders else 0,
+            "items_sold": items_sold,
+        },
+        "revenue": list(periods.values()),
+        "top_by_quantity": sorted(products.values(), key=lambda p: (-p["quantity"], -p["revenue"]))[:top_limit],
+        "top_by_revenue": sorted(products.values(), key=lambda p: (-p["revenue"], -p["quantity"]))[:top_limit],
+    }
+
+
+def _catalog_snapshot(fake: "FakePostgrest") -> list:
+    """refresh_catalog_snapshot(): active categories with their available products"""
+    products: dict = {}
+    for p in fake._sorted(fake.tables.get("product", []), "p_sort_order,id"):
+        if p.get("p_is_available") is True:
+            products.setdefault(p.get("p_category_id"), []).append({
+                key: p.get(key) for key in (
+                    "id", "p_name", "p_description", "p_price", "p_image_url",
+                    "p_is_available", "p_is_featured", "p_category_id", "p_sort_order",
+                )
+            })
+    document = [
+        {
+            **{key: c.get(key) for key in ("id", "c_name", "c_description", "c_image_url", "c_is_active", "c_sort_order")},
+            "products": products.get(c["id"], []),
+        }
+        for c in fake._sorted(fake.tables.get("category", []), "c_sort_order,id")
+        if c.get("c_is_active") is True
+    ]
+    return [{"cs_id": 1, "cs_document": document, "cs_refreshed_at": datetime.now(timezone.utc).isoformat()}]
+
+
+# Tables the database keeps up to date itself (triggers); rebuilt after any write
+VIEWS = {
+    "catalog_snapshot": _catalog_snapshot,
+}
+
+
+FUNCTIONS = {
+    "reorder_categories": _rpc_reorder("category", "c"),
+    "reorder_products": _rpc_reorder("product", "p"),
+    "adjust_product_prices": _rpc_adjust_product_prices,
+    "update_products_partial": _rpc_update_products_partial,
+    "create_order": _rpc_create_order,
+    "order_analytics": _rpc_order_analytics,
+}
+
+
+class FakePostgrest:
+    """In-memory PostgREST served through httpx mock transports"""
+
+    def __init__(self, tables: Optional[dict] = None, latency: float = 0.0):
+        self.tables = tables if tables is not None else {}
+        self.latency = latency
+        self.requests = 0
+        self.functions = dict(FUNCTIONS)
+        self.views = dict(VIEWS)
+        # Sorted tables and relation indexes, rebuilt after any write
+        self._version = 0
+        self._derived: dict = {}
+
+    # ---------- transports ----------
+
+    def handle(self, request: httpx.Request) -> httpx.Response:
+        if self.latency:
+            time.sleep(self.latency)
+        return self.respond(request)
+
+    async def handle_async(self, request: httpx.Request) -> httpx.Response:
+        if self.latency:
+            await asyncio.sleep(self.latency)
+        return self.respond(request)
+
+    def transport(self) -> httpx.MockTransport:
+        return httpx.MockTransport(self.handle)
+
+    def async_transport(self) -> httpx.MockTransport:
+        return httpx.MockTransport(self.handle_async)
+
+    def install(self, registry) -> None:
+        """Point a ClientRegistry at this stand-in"""
+        registry.close()
+        registry.url = FAKE_SUPABASE_URL
+        registry.anon_key = registry.anon_key or "fake-anon-key"
+        registry.service_role_key = registry.service_role_key or "fake-service-role-key"
+        registry.transport = self.transport()
+        registry.async_transport = self.async_transport()
+
+    # ---------- request handling ----------
+
+    def respond(self, request: httpx.Request) -> httpx.Response:
+        self.requests += 1
+        if request.method != "GET":
+            self._version += 1
+        path = request.url.path
+        if not path.startswith("/rest/v1/"):
+            return httpx.Response(404, json={"message": f"Not found: {path}"})
+        table = path[len("/rest/v1/"):]
+        params = parse_qsl(request.url.query.decode(), keep_blank_values=True)
+        try:
+            if table.startswith("rpc/"):
+                function = self.functions.get(table[len("rpc/"):])
+                if function is None:
+                    return httpx.Response(404, json={"message": f"Unknown function {table}", "code": "PGRST202"})
+                return httpx.Response(200, json=function(self, json.loads(request.content or b"{}")))
+            if request.method == "GET":
+                rows = self._select(table, params)
+            elif request.method == "POST":
+                rows = self._insert(table, json.loads(request.content or b"[]"), request, params)
+            elif request.method == "PATCH":
+                rows = self._update(table, json.loads(request.content or b"{}"), params)
+            elif request.method == "DELETE":
+                rows = self._delete(table, params)
+            else:
+                return httpx.Response(405, json={"message": "Method not allowed"})
+        except NotNullViolation as e:
+            return httpx.Response(400, json={"message": str(e), "code": "23502"})
+        except (KeyError, ValueError) as e:
+            return httpx.Response(400, json={"message": str(e), "code": "PGRST100"})
+
+        if "vnd.pgrst.object" in request.headers.get("Accept", ""):
+            if len(rows) != 1:
+                return httpx.Response(406, json={
+                    "message": "JSON object requested, multiple (or no) rows returned",
+                    "code": "PGRST116",
+                    "details": f"The result contains {len(rows)} rows",
+                    "hint": None,
+                })
+            return httpx.Response(200, json=rows[0])
+        return httpx.Response(200, json=rows)
+
+    def _derive(self, key: tuple, build):
+        """Memoize `build()` until the next write"""
+        hit = self._derived.get(key)
+        if hit is not None and hit[0] == self._version:
+            return hit[1]
+        value = build()
+        self._derived[key] = (self._version, value)
+        return value
+
+    @staticmethod
+    def _matching(rows, params: list):
+        """Lazily yield the rows that pass every filter in `params`"""
+        for key, expr in params:
+            if key in ("select", "order", "limit", "offset", "on_conflict", "columns"):
+                continue
+            predicate = _group_predicate(key, expr) if key in ("or", "and") else _predicate(key, expr)
+            rows = filter(predicate, rows)
+        return iter(rows)
+
+    def _filtered(self, table: str, params: list) -> list:
+        return list(self._matching(self.tables.setdefault(table, []), params))
+
+    @staticmethod
+    def _sorted(rows: list, order: str) -> list:
+        for term in reversed(order.split(",")):
+            column, _, rest = term.partition(".")
+            desc = rest.startswith("desc")
+            present = [r for r in rows if r.get(column) is not None]
+            missing = [r for r in rows if r.get(column) is None]
+            rows = sorted(present, key=lambda r: r[column], reverse=desc) + missing
+        return rows
+
+    def _select(self, table: str, params: list) -> list:
+        query = dict(params)
+        if table in self.views:
+            rows = self._derive(("view", table), lambda: self.views[table](self))
+        else:
+            rows = self.tables.setdefault(table, [])
+        if "order" in query:
+            # Sort the whole table once; filtering keeps the order
+            rows = self._derive(("sorted", table, query["order"]), lambda: self._sorted(rows, query["order"]))
+        # Stops filtering once the page is full (keyset pages stay cheap)
+        offset = int(query.get("offset", 0))
+        stop = offset + int(query["limit"]) if "limit" in query else None
+        rows = list(islice(self._matching(rows, params), offset, stop))
+        return [self._project(table, r, query.get("select", "*")) for r in rows]
+
+    def _project(self, table: str, row: dict, select: str) -> dict:
+        out = {}
+        for part in _split_top_level(select):
+            if "(" in part:
+                name = part[:part.index("(")].strip()
+                inner = part[part.index("(") + 1:-1]
+                fk, kind = RELATIONS[(table, name)]
+                if kind == "parent":
+                    parent = self._index(name, "id").get(row.get(fk), [None])[0]
+                    out[name] = self._project(name, parent, inner) if parent else None
+                else:
+                    out[name] = [self._project(name, r, inner) for r in self._index(name, fk).get(row["id"], [])]
+            elif part == "*":
+                out.update(row)
+            elif "::" in part:
+                column, _, cast = part.partition("::")
+                value = row.get(column)
+                # json/jsonb::text, the only cast the backend uses
+                out[column] = json.dumps(value) if cast == "text" and isinstance(value, (dict, list)) else value
+            else:
+                out[part] = row.get(part)
+        return out
+
+    def _index(self, table: str, column: str) -> dict:
+        """Rows of `table` grouped by `column`"""
+        def build():
+            index = {}
+            for r in self.tables.get(table, []):
+                index.setdefault(r.get(column), []).append(r)
+            return index
+        return self._derive(("index", table, column), build)
+
+    def _insert(self, table: str, body, request: httpx.Request, params: list) -> list:
+        rows = body if isinstance(body, list) else [body]
+        store = self.tables.setdefault(table, [])
+        upsert = "merge-duplicates" in request.headers.get("Prefer", "")
+        on_conflict = dict(params).get("on_conflict", "id")
+        inserted = []
+        for row in rows:
+            row = dict(row)
+            missing = [c for c in NOT_NULL.get(table, ()) if row.get(c) is None]
+            if missing:
+                raise NotNullViolation(f'null value in column "{missing[0]}" of relation "{table}" violates not-null constraint')
+            if upsert:
+                existing = next((r for r in store if r.get(on_conflict) == row.get(on_conflict)), None)
+                if existing is not None:
+                    existing.update(row)
+                    inserted.append(dict(existing))
+                    continue
+            row.setdefault("id", str(uuid.uuid4()))
+            store.append(row)
+            inserted.append(dict(row))
+        return inserted
+
+    def _update(self, table: str, changes: dict, params: list) -> list:
+        updated = []
+        for row in self._filtered(table, params):
+            row.update(changes)
+            updated.append(dict(row))
+        return updated
+
+    def _delete(self, table: str, params: list) -> list:
+        doomed = self._filtered(table, params)
+        ids = {id(r) for r in doomed}
+        self.tables[table] = [r for r in self.tables.get(table, []) if id(r) not in ids]
+        return [dict(r) for r in doomed]
+
+
+# ============== SEED DATA ==============
+
+CAKE_WORDS = ["Bolo", "Torta", "Brigadeiro", "Pudim", "Cheesecake", "Brownie", "Mousse", "Cupcake"]
+FLAVOURS = ["Chocolate", "Morango", "Limão", "Maracujá", "Ninho", "Doce de Leite", "Coco", "Nozes"]
+
+
+def seed_tables(categories: int = 8, products: int = 300, orders: int = 0, seed: int = 42) -> dict:
+    """Realistic-looking catalog and order history"""
+    rnd = random.Random(seed)
+    now = datetime.now(timezone.utc)
+    tables = {"category": [], "product": [], "order": [], "order_item": [], "admin": [], "about": [], "idempotency_key": []}
+
+    for i in range(categories):
+        tables["category"].append({
+            "id": str(uuid.UUID(int=rnd.getrandbits(128))),
+            "c_name": f"{CAKE_WORDS[i % len(CAKE_WORDS)]}s {i + 1}",
+            "c_description": "Feitos artesanalmente todos os dias.",
+            "c_image_url": f"https://cdn.example.com/categories/{i}.jpg",
+            "c_is_active": i % 7 != 6,
+            "c_sort_order": i,
+            "c_created_at": (now - timedelta(days=400)).isoformat(),
+            "c_last_update": None,
+        })
+
+    for i in range(products):
+        category = tables["category"][i % categories] if categories else None
+        tables["product"].append({
+            "id": str(uuid.UUID(int=rnd.getrandbits(128))),
+            "p_category_id": category["id"] if category else None,
+            "p_name": f"{rnd.choice(CAKE_WORDS)} de {rnd.choice(FLAVOURS)} {i + 1}",
+            "p_description": " ".join(["Massa fofinha com recheio cremoso e cobertura especial."] * rnd.randint(1, 6)),
+            "p_price": round(rnd.uniform(8, 180), 2),
+            "p_image_url": f"https://cdn.example.com/products/{i}.jpg",
+            "p_is_available": rnd.random() > 0.1,
+            "p_is_featured": rnd.random() > 0.85,
+            "p_sort_order": i,
+            "p_created_at": (now - timedelta(days=rnd.randint(1, 400))).isoformat(),
+            "p_last_update": None,
+        })
+
+    for i in range(orders):
+        created = now - timedelta(minutes=i * 37 + rnd.randint(0, 30))
+        order_id = str(uuid.UUID(int=rnd.getrandbits(128)))
+        total = 0.0
+        for _ in range(rnd.randint(1, 4)):
+            p = rnd.choice(tables["product"])
+            qty = rnd.randint(1, 3)
+            subtotal = round(p["p_price"] * qty, 2)
+            total += subtotal
+            tables["order_item"].append({
+                "id": str(uuid.UUID(int=rnd.getrandbits(128))),
+                "oi_order_id": order_id,
+                "oi_product_id": p["id"],
+                "oi_product_name": p["p_name"],
+                "oi_product_price": p["p_price"],
+                "oi_quantity": qty,
+                "oi_subtotal": subtotal,
+                "oi_created_at": created.isoformat(),
+            })
+        tables["order"].append({
+            "id": order_id,
+            "o_customer_name": f"Cliente {rnd.randint(1, 5000)}",
+            "o_customer_order": None,
+            "o_total": round(total, 2),
+            "o_created_at": created.isoformat(),
+            "o_last_update": None,
+        })
+
+    tables["about"].append({
+        "id": str(uuid.UUID(int=rnd.getrandbits(128))),
+        "ab_name": "Dolce Vitta",
+        "ab_photo_url": "https://cdn.example.com/about.jpg",
+        "ab_title": "Confeitaria artesanal",
+        "ab_story": "Tudo começou na cozinha da vovó. " * 20,
+        "ab_specialty": "Bolos de festa",
+        "ab_experience_years": 12,
+        "ab_quote": "Doce é a vida!",
+        "ab_instagram": "@dolcevitta",
+        "ab_whatsapp": "+55 (11) 98888-7777",
+        "ab_email": "contato@dolcevitta.com",
+        "ab_city": "São Paulo",
+        "ab_accepts_orders": True,
+        "ab_delivery_areas": "Zona Sul, Zona Oeste",
+        "ab_created_at": now.isoformat(),
+        "ab_updated_at": now.isoformat(),
+    })
+    return tables
@@ -0,0 +1,274 @@
+"""Offline load test: scripted scenarios against the full app, with a saved baseline.
+
+The consolidated app (api.index) runs in-process behind httpx.ASGITransport,
+talking to the PostgREST stand-in seeded with a realistic dataset (hundreds of
+products, tens of thousands of orders). Each scenario is a user session
+repeated by `--concurrency` workers until `--sessions` have run:
+
+- catalog: anonymous browsing (categories, products, about, a product page)
+- checkout: a burst of anonymous checkouts with 1-4 random products
+- orders: admin order history, following next_cursor for up to 3 pages,
+  sometimes narrowed to a date range or without line items
+- reorder: admin bulk reorder of 50 products
+
+Every HTTP request is timed; the report shows throughput and p50/p95/p99
+per scenario. `--save-baseline` writes the results to benchmarks/baseline.json;
+later runs compare against it and exit with status 1 when a scenario got
+slower than `--tolerance` allows.
+
+    python -m benchmarks.load_test [--scenario orders] [--save-baseline]
+"""
+import argparse
+import asyncio
+import json
+import random
+import sys
+import time
+import uuid
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+import httpx
+from jose import jwt
+
+from api._utils.auth_middleware import signing_keys, token_cache
+from api._utils.catalog_cache import catalog_cache
+from api._utils.supabase_client import registry
+from .fake_postgrest import FakePostgrest, seed_tables
+
+BASELINE_PATH = Path(__file__).resolve().parent / "baseline.json"
+SECRET = "load-test-jwt-secret"
+REORDER_BATCH = 50
+
+
+@dataclass
+class Context:
+    """What the scenarios need to build their requests"""
+    fake: FakePostgrest
+    admin_headers: dict
+    product_ids: list
+    available_ids: list
+    newest_order: datetime
+
+
+@dataclass
+class ScenarioResult:
+    sessions: int = 0
+    requests: int = 0
+    errors: int = 0
+    db_requests: int = 0
+    seconds: float = 0.0
+    samples: list = field(default_factory=list)
+
+    def summary(self) -> dict:
+        ordered = sorted(self.samples)
+        return {
+            "requests": self.requests,
+            "errors": self.errors,
+            "rps": round(self.requests / self.seconds, 1) if self.seconds else 0.0,
+            "p50_ms": round(percentile(ordered, 0.50), 2),
+            "p95_ms": round(percentile(ordered, 0.95), 2),
+            "p99_ms": round(percentile(ordered, 0.99), 2),
+            "db_per_request": round(self.db_requests / self.requests, 2) if self.requests else 0.0,
+        }
+
+
+def percentile(ordered: list, pct: float) -> float:
+    if not ordered:
+        return 0.0
+    return ordered[min(len(ordered) - 1, int(len(ordered) * pct))]
+
+
+# ============== SCENARIOS ==============
+
+async def catalog_session(client: httpx.AsyncClient, ctx: Context, rnd: random.Random):
+    yield await client.get("/api/categories")
+    yield await client.get("/api/products")
+    yield await client.get("/api/about")
+    yield await client.get(f"/api/products/{rnd.choice(ctx.product_ids)}")
+
+
+async def checkout_session(client: httpx.AsyncClient, ctx: Context, rnd: random.Random):
+    items = [
+        {"product_id": product_id, "quantity": rnd.randint(1, 3)}
+        for product_id in rnd.sample(ctx.available_ids, rnd.randint(1, 4))
+    ]
+    yield await client.post("/api/checkout", json={"customer_name": f"Cliente {rnd.randint(1, 5000)}", "items": items})
+
+
+async def orders_session(client: httpx.AsyncClient, ctx: Context, rnd: random.Random):
+    params = {"limit": "20"}
+    if rnd.random() < 0.3:
+        end = ctx.newest_order - timedelta(days=rnd.randint(0, 300))
+        params["from"] = (end - timedelta(days=7)).date().isoformat()
+        params["to"] = end.date().isoformat()
+    if rnd.random() < 0.3:
+        params["items"] = "false"
+    for _ in range(3):
+        response = await client.get("/api/orders", params=params, headers=ctx.admin_headers)
+        yield response
+        cursor = response.json().get("next_cursor") if response.status_code == 200 else None
+        if not cursor:
+            break
+        params["cursor"] = cursor
+
+
+async def reorder_session(client: httpx.AsyncClient, ctx: Context, rnd: random.Random):
+    chosen = rnd.sample(ctx.product_ids, min(REORDER_BATCH, len(ctx.product_ids)))
+    positions = rnd.sample(range(len(ctx.product_ids)), len(chosen))
+    items = [{"id": product_id, "sort_order": position} for product_id, position in zip(chosen, positions)]
+    yield await client.put("/api/reorder/products", json={"items": items}, headers=ctx.admin_headers)
+
+
+SCENARIOS = {
+    "catalog": catalog_session,
+    "checkout": checkout_session,
+    "orders": orders_session,
+    "reorder": reorder_session,
+}
+
+
+# ============== RUNNER ==============
+
+def build_context(products: int, orders: int, latency: float) -> Context:
+    fake = FakePostgrest(seed_tables(products=products, orders=orders), latency=latency)
+    fake.install(registry)
+    signing_keys.secret = SECRET
+    user_id = str(uuid.uuid4())
+    fake.tables["admin"].append({
+        "id": user_id, "a_email": "admin@example.com", "a_name": "Admin", "a_phone": None,
+        "a_avatar_url": None, "a_is_active": True, "a_created_at": datetime.now(timezone.utc).isoformat(),
+    })
+    token = jwt.encode({
+        "sub": user_id,
+        "email": "admin@example.com",
+        "role": "authenticated",
+        "aud": "authenticated",
+        "exp": int(time.time()) + 3600,
+    }, SECRET, algorithm="HS256")
+    return Context(
+        fake=fake,
+        admin_headers={"Authorization": f"Bearer {token}"},
+        product_ids=[p["id"] for p in fake.tables["product"]],
+        available_ids=[p["id"] for p in fake.tables["product"] if p["p_is_available"]],
+        newest_order=max(datetime.fromisoformat(o["o_created_at"]) for o in fake.tables["order"]),
+    )
+
+
+async def run_scenario(app, ctx: Context, session, sessions: int, concurrency: int, seed: int) -> ScenarioResult:
+    # Every scenario starts cold: no cached catalog, no verified tokens
+    catalog_cache.invalidate()
+    token_cache.clear()
+    result = ScenarioResult()
+    remaining = iter(range(sessions))
+    db_before = ctx.fake.requests
+
+    async def worker(rnd: random.Random):
+        async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://load-test") as client:
+            for _ in remaining:
+                result.sessions += 1
+                requests = session(client, ctx, rnd)
+                while True:
+                    sent = time.perf_counter()
+                    try:
+                        response = await requests.__anext__()
+                    except StopAsyncIteration:
+                        break
+                    result.samples.append((time.perf_counter() - sent) * 1000)
+                    result.requests += 1
+                    if response.status_code >= 400:
+                        result.errors += 1
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker(random.Random(seed + i)) for i in range(concurrency)))
+    result.seconds = time.perf_counter() - started
+    result.db_requests = ctx.fake.requests - db_before
+    return result
+
+
+def delta(current: float, previous: float) -> str:
+    if not previous:
+        return "    n/a"
+    return f"{(current - previous) / previous * 100:+6.1f}%"
+
+
+def compare(results: dict, baseline: dict, tolerance: float) -> list:
+    """Print the deltas against the baseline; returns the regressed scenarios"""
+    regressions = []
+    print(f"\nvs baseline ({baseline.get('created_at', '?')}), tolerance {tolerance:.0%}:")
+    print(f"{'scenario':<10}{'req/s':>9}{'p50':>9}{'p95':>9}{'p99':>9}")
+    for name, current in results.items():
+        previous = baseline.get("scenarios", {}).get(name)
+        if previous is None:
+            print(f"{name:<10}  (not in baseline)")
+            continue
+        print(f"{name:<10}{delta(current['rps'], previous['rps']):>9}"
+              + "".join(f"{delta(current[k], previous[k]):>9}" for k in ("p50_ms", "p95_ms", "p99_ms")))
+        slower = current["p95_ms"] > previous["p95_ms"] * (1 + tolerance)
+        fewer = current["rps"] < previous["rps"] * (1 - tolerance)
+        if slower or fewer or current["errors"] > previous["errors"]:
+            regressions.append(name)
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--scenario", action="append", choices=sorted(SCENARIOS), help="repeatable; default: all")
+    parser.add_argument("--sessions", type=int, default=300, help="sessions per scenario")
+    parser.add_argument("--concurrency", type=int, default=20)
+    parser.add_argument("--latency", type=float, default=0.005, help="simulated DB round-trip (s)")
+    parser.add_argument("--products", type=int, default=300)
+    parser.add_argument("--orders", type=int, default=20000)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--baseline", type=Path, default=BASELINE_PATH)
+    parser.add_argument("--save-baseline", action="store_true", help="overwrite the baseline with this run")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="allowed p95 / req/s regression")
+    args = parser.parse_args()
+
+    from api.index import app
+
+    settings = {k: getattr(args, k) for k in ("sessions", "concurrency", "latency", "products", "orders", "seed")}
+    ctx = build_context(args.products, args.orders, args.latency)
+    print(f"seeded {len(ctx.product_ids)} products, {len(ctx.fake.tables['order'])} orders, "
+          f"{len(ctx.fake.tables['order_item'])} order items; latency={args.latency * 1000:.0f}ms, "
+          f"concurrency={args.concurrency}")
+    print(f"{'scenario':<10}{'requests':>9}{'errors':>7}{'req/s':>9}{'p50 ms':>9}{'p95 ms':>9}{'p99 ms':>9}{'db/req':>8}")
+
+    async def run_all() -> dict:
+        # One event loop for every scenario: the async Supabase pool is bound to it
+        results = {}
+        for name in args.scenario or SCENARIOS:
+            result = await run_scenario(app, ctx, SCENARIOS[name], args.sessions, args.concurrency, args.seed)
+            summary = results[name] = result.summary()
+            print(f"{name:<10}{summary['requests']:>9}{summary['errors']:>7}{summary['rps']:>9.1f}"
+                  f"{summary['p50_ms']:>9.1f}{summary['p95_ms']:>9.1f}{summary['p99_ms']:>9.1f}"
+                  f"{summary['db_per_request']:>8.2f}")
+        return results
+
+    results = asyncio.run(run_all())
+
+    if args.save_baseline:
+        args.baseline.write_text(json.dumps({
+            "created_at": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            "python": sys.version.split()[0],
+            "settings": settings,
+            "scenarios": results,
+        }, indent=2) + "\n")
+        print(f"\nbaseline saved to {args.baseline}")
+        return
+
+    if not args.baseline.exists():
+        print("\nno baseline yet; run with --save-baseline to create one")
+        return
+    baseline = json.loads(args.baseline.read_text())
+    if baseline.get("settings") != settings:
+        print(f"\nwarning: baseline was recorded with {baseline.get('settings')}")
+    regressions = compare(results, baseline, args.tolerance)
+    if regressions:
+        print(f"\nregressed: {', '.join(regressions)}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
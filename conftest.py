@@ -0,0 +1,57 @@
+"""Shared test fixtures: the consolidated app in-process, against the PostgREST stand-in"""
+import httpx
+import pytest
+
+from api._utils import query_trace
+from api._utils.about_settings import about_settings
+from api._utils.auth_middleware import signing_keys, token_cache
+from api._utils.catalog_cache import catalog_cache
+from api._utils.idempotency import idempotency_store
+from api._utils.supabase_client import registry
+from api.index import app
+from benchmarks.load_test import build_context
+
+
+@pytest.fixture
+def anyio_backend():
+    return "asyncio"
+
+
+def _clear_caches() -> None:
+    """Drop everything the app keeps in process between requests"""
+    catalog_cache.invalidate()
+    about_settings.invalidate()
+    token_cache.clear()
+    idempotency_store.clear()
+
+
+@pytest.fixture
+def ctx(monkeypatch):
+    """A small seeded catalog and order history, plus an admin token"""
+    # build_context points these process-wide singletons at the stand-in;
+    # monkeypatch puts the originals back after the test
+    for name in ("url", "anon_key", "service_role_key", "transport", "async_transport"):
+        monkeypatch.setattr(registry, name, getattr(registry, name))
+    monkeypatch.setattr(signing_keys, "secret", signing_keys.secret)
+    _clear_caches()
+    yield build_context(products=20, orders=5, latency=0)
+    # Pooled clients still talk to this test's stand-in
+    registry.close()
+    _clear_caches()
+
+
+@pytest.fixture
+async def client(ctx):
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test") as client:
+        yield client
+
+
+@pytest.fixture
+def query_budget(monkeypatch):
+    """Strict query budgets for the test; call it to cap the queries of a block"""
+    monkeypatch.setattr(query_trace, "QUERY_BUDGET_STRICT", True)
+
+    def cap(budget: int, name: str = "test block"):
+        return query_trace.trace_queries(name, budget=budget, strict=True)
+
+    return cap
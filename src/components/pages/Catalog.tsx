@@ -1,7 +1,7 @@
 import { useState, useEffect } from "react"
 import { DragDropContext, Droppable, Draggable, DropResult } from "react-beautiful-dnd"
-import { Plus } from "lucide-react"
-import { categoriesApi, productsApi } from "@/services/api"
+import { Plus, Search } from "lucide-react"
+import { catalogApi, categoriesApi, productsApi } from "@/services/api"
 import { useAuth } from "@/hooks/useAuth"
 import CategorySection from "@/components/CategorySection"
 import FloatingEditButton from "@/components/FloatingEditButton"
@@ -116,13 +116,23 @@ export default function Catalog() {
   const [creatingProductForCategory, setCreatingProductForCategory] = useState<string | null>(null)
   const [deletingCategoryId, setDeletingCategoryId] = useState<string | null>(null)
 
+  // Product search, sent to the API once typing pauses
+  const [searchInput, setSearchInput] = useState("")
+  const [search, setSearch] = useState("")
+
+  useEffect(() => {
+    const timer = setTimeout(() => setSearch(searchInput.trim()), 300)
+    return () => clearTimeout(timer)
+  }, [searchInput])
+
   useEffect(() => {
     fetchData()
-  }, [])
+  }, [search])
 
   const fetchData = async () => {
     try {
-      setLoading(true)
+      // Keep the page (and the search box) mounted while a search runs
+      if (!search) setLoading(true)
 
       // Mock data for demo
       const mockCategories: Category[] = [
@@ -225,56 +235,13 @@ export default function Catalog() {
       ]
 
       try {
-        const [categoriesResponse, productsResponse] = await Promise.all([categoriesApi.list(), productsApi.list()])
-
-        console.log("API Response - Categories:", categoriesResponse)
-        console.log("API Response - Products:", productsResponse)
-
-        // Backend returns { success: true, categories: [...] } and { success: true, products: [...] }
-        const categoriesRaw = categoriesResponse?.categories || categoriesResponse || []
-        const productsRaw = productsResponse?.products || productsResponse || []
-
-        console.log("Raw Categories:", categoriesRaw)
-        console.log("Raw Products:", productsRaw)
-
-        // Backend already returns prefixed fields (c_name, p_name, etc.)
-        // Just use them directly
-        const categoriesData: Category[] = categoriesRaw.map((c: any) => ({
-          id: c.id,
-          c_name: c.c_name,
-          c_description: c.c_description,
-          c_image_url: c.c_image_url,
-          c_sort_order: c.c_sort_order || 0,
-          c_is_active: c.c_is_active ?? true,
-        }))
-
-        const productsData: Product[] = productsRaw.map((p: any) => ({
-          id: p.id,
-          p_name: p.p_name,
-          p_description: p.p_description,
-          p_price: p.p_price,
-          p_image_url: p.p_image_url,
-          p_is_available: p.p_is_available ?? true,
-          p_sort_order: p.p_sort_order || 0,
-          p_category_id: p.p_category_id,
-        }))
-
-        console.log("Transformed Categories:", categoriesData)
-        console.log("Transformed Products:", productsData)
-
-        const categoriesWithProducts = categoriesData
-          .sort((a: Category, b: Category) => (a.c_sort_order || 0) - (b.c_sort_order || 0))
-          .map((category: Category) => ({
-            ...category,
-            products: productsData
-              .filter((p: Product) => p.p_category_id === category.id)
-              .sort((a: Product, b: Product) => (a.p_sort_order || 0) - (b.p_sort_order || 0)),
-          }))
-
-        console.log("Final Categories with Products:", categoriesWithProducts)
-
-        // Only use mock if NO categories returned at all
-        if (categoriesData.length > 0) {
+        // Backend returns { success: true, categories: [{ ...category, products: [...] }] },
+        // categories and products already in sort order
+        const catalogResponse = await catalogApi.get(search ? { q: search } : {})
+        const categoriesWithProducts: Category[] = catalogResponse?.categories || []
+
+        // Only use mock if NO categories returned at all (a search may legitimately find nothing)
+        if (categoriesWithProducts.length > 0 || search) {
           setCategories(categoriesWithProducts)
         } else {
           setCategories(mockCategories)
@@ -421,6 +388,20 @@ export default function Catalog() {
         </p>
       </header>
 
+      {/* Search (hidden while editing: reordering needs the whole menu) */}
+      {!isEditing && (
+        <div className="relative max-w-md mx-auto mb-10">
+          <Search className="absolute left-4 top-1/2 -translate-y-1/2 w-4 h-4 text-muted-foreground" />
+          <input
+            type="search"
+            value={searchInput}
+            onChange={(e) => setSearchInput(e.target.value)}
+            placeholder="Buscar no cardápio..."
+            className="w-full pl-11 pr-4 py-3 rounded-xl border border-border bg-white/70 focus:outline-none focus:ring-2 focus:ring-brown-300"
+          />
+        </div>
+      )}
+
       {/* Add Category Button (only in edit mode) */}
       {isEditing && (
         <div className="mb-8">
@@ -464,7 +445,9 @@ export default function Catalog() {
                 ))
               ) : (
                 <div className="text-center py-20">
-                  <p className="text-muted-foreground text-lg">Nenhum produto disponível no momento</p>
+                  <p className="text-muted-foreground text-lg">
+                    {search ? "Nenhum produto encontrado" : "Nenhum produto disponível no momento"}
+                  </p>
                 </div>
               )}
               {provided.placeholder}
@@ -477,7 +460,12 @@ export default function Catalog() {
       {user && (
         <FloatingEditButton
           isEditing={isEditing}
-          onToggleEdit={() => setIsEditing(!isEditing)}
+          onToggleEdit={() => {
+            // Editing works on the whole menu, not on search results
+            setSearchInput("")
+            setSearch("")
+            setIsEditing(!isEditing)
+          }}
         />
       )}
 
@@ -1,6 +1,6 @@
 import type React from "react"
 
-import { useState } from "react"
+import { useRef, useState } from "react"
 import { Link } from "react-router-dom"
 import { ArrowLeft, MessageCircle, Loader2 } from "lucide-react"
 import { useCart } from "@/contexts/CartContext"
@@ -12,6 +12,8 @@ export default function Checkout() {
   const [customerName, setCustomerName] = useState("")
   const [loading, setLoading] = useState(false)
   const [error, setError] = useState<string | null>(null)
+  // One Idempotency-Key per order: retries and double taps reuse it
+  const checkoutAttempt = useRef<{ signature: string; key: string } | null>(null)
 
   const formatPrice = (price: number) => {
     return new Intl.NumberFormat("pt-BR", {
@@ -44,13 +46,18 @@ export default function Checkout() {
       const message = `Olá! Gostaria de fazer um pedido:\n\n${itemsList}\n\n*Total: ${formatPrice(total)}*\n\nNome: ${customerName.trim()}`
 
       try {
-        const response = await checkoutApi.create({
+        const order = {
           customer_name: customerName.trim(),
           items: items.map((item) => ({
             product_id: item.id,
             quantity: item.quantity,
           })),
-        })
+        }
+        const signature = JSON.stringify(order)
+        if (checkoutAttempt.current?.signature !== signature) {
+          checkoutAttempt.current = { signature, key: crypto.randomUUID() }
+        }
+        const response = await checkoutApi.create(order, checkoutAttempt.current.key)
 
         clearCart()
 
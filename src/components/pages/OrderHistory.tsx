@@ -1,6 +1,6 @@
 import { useState, useEffect } from "react"
 import { Link } from "react-router-dom"
-import { ArrowLeft, Calendar, User, Package, Trash2 } from "lucide-react"
+import { ArrowLeft, Calendar, User, Package, Trash2, TrendingUp } from "lucide-react"
 import { ordersApi } from "@/services/api"
 
 interface OrderItem {
@@ -19,24 +19,59 @@ interface Order {
   items?: OrderItem[]
 }
 
+interface SalesAnalytics {
+  summary: {
+    orders: number
+    revenue: number
+    average_ticket: number
+    items_sold: number
+  }
+  top_by_quantity: {
+    product_id: string | null
+    product_name: string
+    quantity: number
+    revenue: number
+  }[]
+}
+
+const PAGE_SIZE = 20
+
 export default function OrderHistory() {
   const [orders, setOrders] = useState<Order[]>([])
+  const [nextCursor, setNextCursor] = useState<string | null>(null)
   const [loading, setLoading] = useState(true)
+  const [loadingMore, setLoadingMore] = useState(false)
   const [error, setError] = useState<string | null>(null)
   const [expandedOrder, setExpandedOrder] = useState<string | null>(null)
   const [showDeleteConfirm, setShowDeleteConfirm] = useState(false)
   const [deleting, setDeleting] = useState(false)
+  const [analytics, setAnalytics] = useState<SalesAnalytics | null>(null)
 
   useEffect(() => {
     fetchOrders()
+    fetchAnalytics()
   }, [])
 
-  const fetchOrders = async () => {
+  // Last 30 days, summed by the API (no need to page through the history)
+  const fetchAnalytics = async () => {
     try {
-      setLoading(true)
+      const response = await ordersApi.analytics({ limit: 3 })
+      setAnalytics(response)
+    } catch (err) {
+      console.error("Error fetching analytics:", err)
+    }
+  }
 
-      const response = await ordersApi.list()
-      // Backend returns { success: true, orders: [...] }
+  const fetchOrders = async (cursor: string | null = null) => {
+    try {
+      if (cursor) {
+        setLoadingMore(true)
+      } else {
+        setLoading(true)
+      }
+
+      const response = await ordersApi.list({ cursor, limit: PAGE_SIZE })
+      // Backend returns { success: true, orders: [...], next_cursor }
       const ordersData = response?.orders || []
       
       // Map order_item to items for frontend
@@ -45,12 +80,14 @@ export default function OrderHistory() {
         items: order.order_item || []
       }))
       
-      setOrders(mappedOrders)
+      setOrders((prev) => (cursor ? [...prev, ...mappedOrders] : mappedOrders))
+      setNextCursor(response?.next_cursor || null)
     } catch (err) {
       console.error("Error fetching orders:", err)
       setError("Erro ao carregar pedidos")
     } finally {
       setLoading(false)
+      setLoadingMore(false)
     }
   }
 
@@ -86,7 +123,9 @@ export default function OrderHistory() {
       setDeleting(true)
       await ordersApi.deleteAll()
       setOrders([])
+      setNextCursor(null)
       setShowDeleteConfirm(false)
+      fetchAnalytics()
     } catch (err) {
       console.error("Error deleting orders:", err)
       setError("Erro ao apagar histórico")
@@ -113,7 +152,7 @@ export default function OrderHistory() {
           </Link>
           <div>
             <h1 className="font-serif text-2xl font-bold text-foreground">Histórico de Pedidos</h1>
-            <p className="text-muted-foreground text-sm">{orders.length} pedidos encontrados</p>
+            <p className="text-muted-foreground text-sm">{orders.length}{nextCursor ? "+" : ""} pedidos encontrados</p>
           </div>
         </div>
         {orders.length > 0 && (
@@ -133,7 +172,7 @@ export default function OrderHistory() {
           <div className="bg-white rounded-2xl p-6 mx-4 max-w-sm w-full shadow-xl animate-scale-in">
             <h3 className="font-serif text-xl font-bold text-foreground mb-2">Limpar Histórico?</h3>
             <p className="text-muted-foreground text-sm mb-6">
-              Todos os {orders.length} pedidos serão apagados permanentemente. Esta ação não pode ser desfeita.
+              Todos os pedidos serão apagados permanentemente. Esta ação não pode ser desfeita.
             </p>
             <div className="flex gap-3">
               <button
@@ -157,6 +196,42 @@ export default function OrderHistory() {
 
       {error && <div className="mb-6 p-4 rounded-xl bg-red-500/10 text-red-600">{error}</div>}
 
+      {/* Last 30 days */}
+      {analytics && analytics.summary.orders > 0 && (
+        <div className="glass-card rounded-2xl p-4 mb-6 animate-fade-in">
+          <div className="flex items-center gap-2 mb-4 text-sm text-muted-foreground">
+            <TrendingUp className="w-4 h-4 text-brown-600" />
+            Últimos 30 dias
+          </div>
+          <div className="grid grid-cols-3 gap-4 text-center">
+            <div>
+              <p className="font-bold text-brown-600">{formatPrice(analytics.summary.revenue)}</p>
+              <p className="text-xs text-muted-foreground">Faturamento</p>
+            </div>
+            <div>
+              <p className="font-bold text-brown-600">{analytics.summary.orders}</p>
+              <p className="text-xs text-muted-foreground">Pedidos</p>
+            </div>
+            <div>
+              <p className="font-bold text-brown-600">{formatPrice(analytics.summary.average_ticket)}</p>
+              <p className="text-xs text-muted-foreground">Ticket médio</p>
+            </div>
+          </div>
+          {analytics.top_by_quantity.length > 0 && (
+            <div className="mt-4 pt-4 border-t border-border space-y-1">
+              {analytics.top_by_quantity.map((product) => (
+                <div key={`${product.product_id}-${product.product_name}`} className="flex items-center justify-between text-sm">
+                  <span className="text-muted-foreground">
+                    {product.quantity}x {product.product_name}
+                  </span>
+                  <span className="font-medium text-foreground">{formatPrice(product.revenue)}</span>
+                </div>
+              ))}
+            </div>
+          )}
+        </div>
+      )}
+
       {orders.length === 0 ? (
         <div className="text-center py-20 animate-fade-in">
           <div className="w-20 h-20 mx-auto mb-6 rounded-full bg-cream-200 flex items-center justify-center">
@@ -170,7 +245,7 @@ export default function OrderHistory() {
             <div
               key={order.id}
               className="glass-card rounded-2xl overflow-hidden animate-slide-up"
-              style={{ animationDelay: `${index * 0.05}s` }}
+              style={{ animationDelay: `${(index % PAGE_SIZE) * 0.05}s` }}
             >
               {/* Order Header */}
               <button
@@ -214,6 +289,16 @@ export default function OrderHistory() {
               )}
             </div>
           ))}
+
+          {nextCursor && (
+            <button
+              onClick={() => fetchOrders(nextCursor)}
+              disabled={loadingMore}
+              className="w-full py-3 rounded-xl border border-border text-brown-600 font-medium hover:bg-brown-500/5 transition-all duration-300 disabled:opacity-50"
+            >
+              {loadingMore ? "Carregando..." : "Carregar mais pedidos"}
+            </button>
+          )}
         </div>
       )}
     </main>
@@ -5,6 +5,7 @@ async function fetchPublic(url: string, options: RequestInit = {}) {
   try {
     const headers: Record<string, string> = {
       "Content-Type": "application/json",
+      ...(options.headers as Record<string, string> | undefined),
     }
 
     const response = await fetch(url, { ...options, headers })
@@ -123,6 +124,28 @@ export const productsApi = {
     }),
 }
 
+// Catalog API: active categories with their products, grouped and sorted by the API
+export interface CatalogQuery {
+  category?: string
+  available?: boolean
+  featured?: boolean
+  q?: string
+}
+
+export const catalogApi = {
+  get: (query: CatalogQuery = {}) => {
+    const params = new URLSearchParams()
+    if (query.category) params.set("category", query.category)
+    if (query.available !== undefined) params.set("available", String(query.available))
+    if (query.featured !== undefined) params.set("featured", String(query.featured))
+    if (query.q) params.set("q", query.q)
+    const qs = params.toString()
+    const url = `${API_URL}/catalog${qs ? `?${qs}` : ""}`
+    // Admins also get unavailable products
+    return localStorage.getItem("dolce-vitta-auth") ? fetchWithAuth(url) : fetchPublic(url)
+  },
+}
+
 // Categories API
 export const categoriesApi = {
   list: () => fetchPublic(`${API_URL}/categories`),
@@ -157,22 +180,62 @@ export const categoriesApi = {
 }
 
 // Orders API
+export interface OrdersQuery {
+  cursor?: string | null
+  limit?: number
+  from?: string
+  to?: string
+  customer?: string
+  items?: boolean
+}
+
+export interface AnalyticsQuery {
+  from?: string
+  to?: string
+  bucket?: "day" | "week" | "month"
+  limit?: number
+}
+
 export const ordersApi = {
-  list: () => fetchWithAuth(`${API_URL}/orders`),
+  // Keyset-paginated: pass the previous page's next_cursor to get the next one
+  list: (query: OrdersQuery = {}) => {
+    const params = new URLSearchParams()
+    if (query.cursor) params.set("cursor", query.cursor)
+    if (query.limit) params.set("limit", String(query.limit))
+    if (query.from) params.set("from", query.from)
+    if (query.to) params.set("to", query.to)
+    if (query.customer) params.set("customer", query.customer)
+    if (query.items === false) params.set("items", "false")
+    const qs = params.toString()
+    return fetchWithAuth(`${API_URL}/orders${qs ? `?${qs}` : ""}`)
+  },
+  // Totals computed by the database: revenue per period, average ticket and best sellers
+  analytics: (query: AnalyticsQuery = {}) => {
+    const params = new URLSearchParams()
+    if (query.from) params.set("from", query.from)
+    if (query.to) params.set("to", query.to)
+    if (query.bucket) params.set("bucket", query.bucket)
+    if (query.limit) params.set("limit", String(query.limit))
+    const qs = params.toString()
+    return fetchWithAuth(`${API_URL}/orders/analytics${qs ? `?${qs}` : ""}`)
+  },
   deleteAll: () => fetchWithAuth(`${API_URL}/orders`, { method: "DELETE" }),
 }
 
 export const checkoutApi = {
+  // Send the same idempotencyKey on every retry of one order: the API returns
+  // the order already created instead of creating another one
   create: (data: {
     customer_name: string
     items: Array<{
       product_id: string
       quantity: number
     }>
-  }) =>
+  }, idempotencyKey?: string) =>
     fetchPublic(`${API_URL}/checkout`, {
       method: "POST",
       body: JSON.stringify(data),
+      headers: idempotencyKey ? { "Idempotency-Key": idempotencyKey } : undefined,
     }),
 }
 
@@ -0,0 +1,174 @@
+-- =============================================
+-- RLS BENCHMARK (local Postgres)
+-- =============================================
+-- EXPLAIN ANALYZE of the hot reads under the RLS policies, run the way
+-- PostgREST runs them (SET ROLE anon / authenticated, auth.uid() from the
+-- JWT), with the admin check of the SELECT policies written both ways:
+--
+--   before: auth.uid() IN (SELECT id FROM admin WHERE a_is_active = TRUE)
+--   after:  (SELECT is_active_admin())
+--
+-- Each query runs :runs times per variant and the median execution time
+-- is reported, followed by both plans of the admin product listing.
+-- Everything runs in one transaction that is rolled back, so the script
+-- can be re-run on the same database.
+--
+--   createdb dolce_vitta_bench
+--   psql -d dolce_vitta_bench -f supabase/bench_rls.sql
+--   psql -d dolce_vitta_bench -v products=50000 -v orders=200000 -f supabase/bench_rls.sql
+--   dropdb dolce_vitta_bench
+-- =============================================
+
+\set ON_ERROR_STOP on
+
+\if :{?products}
+\else
+    \set products 20000
+\endif
+\if :{?orders}
+\else
+    \set orders 50000
+\endif
+\if :{?runs}
+\else
+    \set runs 7
+\endif
+
+\ir local_auth.sql
+\ir schema.sql
+
+BEGIN;
+
+-- ---------------------------------------------
+-- Data
+-- ---------------------------------------------
+-- 50 active and 10 inactive admins, so the lookup is not a one-row table
+INSERT INTO auth.users (id)
+SELECT uuid_generate_v4() FROM generate_series(1, 60);
+
+INSERT INTO admin (id, a_email, a_is_active)
+SELECT id, id || '@example.com', row_number() OVER (ORDER BY id) <= 50
+FROM auth.users;
+
+SELECT id AS admin_id FROM admin WHERE a_is_active ORDER BY id LIMIT 1 \gset
+
+INSERT INTO category (c_name, c_sort_order)
+SELECT 'Categoria ' || n, n FROM generate_series(1, 20) AS n;
+
+-- One product in ten unavailable
+INSERT INTO product (p_category_id, p_name, p_price, p_sort_order, p_is_available)
+SELECT categories.ids[1 + n % 20], 'Produto ' || n, 10 + n % 90, n, n % 10 <> 0
+FROM generate_series(1, :products) AS n,
+     (SELECT array_agg(id) AS ids FROM category) AS categories;
+
+INSERT INTO "order" (o_customer_name, o_total, o_created_at)
+SELECT 'Cliente ' || n, 100, NOW() - n * INTERVAL '1 minute'
+FROM generate_series(1, :orders) AS n;
+
+-- Three items per order
+INSERT INTO order_item (oi_order_id, oi_product_id, oi_product_name, oi_product_price, oi_quantity, oi_subtotal)
+SELECT o.id, p.id, p.p_name, p.p_price, 1, p.p_price
+FROM "order" AS o
+CROSS JOIN generate_series(0, 2) AS k
+JOIN product AS p ON p.p_sort_order = 1 + ((hashtext(o.id::TEXT) & 2147483647) + k) % :products;
+
+ANALYZE;
+
+-- ---------------------------------------------
+-- Timing
+-- ---------------------------------------------
+-- Median execution time (ms) of `query` as `caller` sees it: the anon
+-- role when NULL, else the authenticated role with that user id
+CREATE FUNCTION pg_temp.explain_ms(query TEXT, caller UUID, runs INTEGER)
+RETURNS NUMERIC
+LANGUAGE plpgsql
+AS $$
+DECLARE
+    plan JSON;
+    samples NUMERIC[] := '{}';
+BEGIN
+    PERFORM set_config('request.jwt.claim.sub', COALESCE(caller::TEXT, ''), TRUE);
+    IF caller IS NULL THEN
+        SET LOCAL ROLE anon;
+    ELSE
+        SET LOCAL ROLE authenticated;
+    END IF;
+    FOR i IN 1..runs LOOP
+        EXECUTE 'EXPLAIN (ANALYZE, FORMAT JSON) ' || query INTO plan;
+        samples := samples || (plan->0->>'Execution Time')::NUMERIC;
+    END LOOP;
+    RESET ROLE;
+    RETURN (SELECT percentile_cont(0.5) WITHIN GROUP (ORDER BY s) FROM unnest(samples) AS s)::NUMERIC(10, 2);
+END;
+$$;
+
+CREATE TEMP TABLE bench_query (query_no SERIAL, name TEXT, caller UUID, query TEXT);
+CREATE TEMP TABLE bench_result (variant TEXT, query_no INTEGER, ms NUMERIC);
+
+INSERT INTO bench_query (name, caller, query) VALUES
+    ('menu, anonymous', NULL,
+     'SELECT id, p_name, p_price FROM product ORDER BY p_sort_order'),
+    ('products, admin', :'admin_id',
+     'SELECT id, p_name, p_price FROM product ORDER BY p_sort_order'),
+    ('categories, admin', :'admin_id',
+     'SELECT id, c_name FROM category ORDER BY c_sort_order'),
+    ('orders page, admin', :'admin_id',
+     'SELECT id, o_customer_name, o_total, o_created_at FROM "order" ORDER BY o_created_at DESC, id DESC LIMIT 20'),
+    ('orders count, admin', :'admin_id',
+     'SELECT COUNT(*) FROM "order"'),
+    ('sales by product, admin', :'admin_id',
+     'SELECT oi_product_id, SUM(oi_subtotal) FROM order_item GROUP BY oi_product_id');
+
+-- Warm the buffer cache so neither variant pays for the first reads
+SELECT COUNT(pg_temp.explain_ms(query, caller, 1)) AS warmed FROM bench_query;
+
+-- ---------------------------------------------
+-- after: (SELECT is_active_admin()), as in schema.sql
+-- ---------------------------------------------
+INSERT INTO bench_result
+SELECT 'init_plan', query_no, pg_temp.explain_ms(query, caller, :runs) FROM bench_query;
+
+\echo
+\echo 'products, admin: (SELECT is_active_admin())'
+SET LOCAL "request.jwt.claim.sub" = :'admin_id';
+SET LOCAL ROLE authenticated;
+EXPLAIN (ANALYZE, COSTS OFF) SELECT id, p_name, p_price FROM product ORDER BY p_sort_order;
+RESET ROLE;
+
+-- ---------------------------------------------
+-- before: the per-row subquery
+-- ---------------------------------------------
+ALTER POLICY "category_admin_select_all" ON category
+    USING (auth.uid() IN (SELECT id FROM admin WHERE a_is_active = TRUE));
+ALTER POLICY "product_admin_select_all" ON product
+    USING (auth.uid() IN (SELECT id FROM admin WHERE a_is_active = TRUE));
+ALTER POLICY "order_select_admin" ON "order"
+    USING (auth.uid() IN (SELECT id FROM admin WHERE a_is_active = TRUE));
+ALTER POLICY "order_item_select_admin" ON order_item
+    USING (auth.uid() IN (SELECT id FROM admin WHERE a_is_active = TRUE));
+
+INSERT INTO bench_result
+SELECT 'per_row', query_no, pg_temp.explain_ms(query, caller, :runs) FROM bench_query;
+
+\echo
+\echo 'products, admin: auth.uid() IN (SELECT id FROM admin ...)'
+SET LOCAL "request.jwt.claim.sub" = :'admin_id';
+SET LOCAL ROLE authenticated;
+EXPLAIN (ANALYZE, COSTS OFF) SELECT id, p_name, p_price FROM product ORDER BY p_sort_order;
+RESET ROLE;
+
+-- ---------------------------------------------
+-- Report
+-- ---------------------------------------------
+\echo
+\echo 'median execution time (ms) per query'
+SELECT q.name AS query,
+       per_row.ms AS "auth.uid() IN (...)",
+       init_plan.ms AS "(SELECT is_active_admin())",
+       round(per_row.ms / NULLIF(init_plan.ms, 0), 1) AS speedup
+FROM bench_query AS q
+JOIN bench_result AS per_row ON per_row.query_no = q.query_no AND per_row.variant = 'per_row'
+JOIN bench_result AS init_plan ON init_plan.query_no = q.query_no AND init_plan.variant = 'init_plan'
+ORDER BY q.query_no;
+
+ROLLBACK;
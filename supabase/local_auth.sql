@@ -0,0 +1,47 @@
+-- =============================================
+-- LOCAL SUPABASE STAND-INS
+-- =============================================
+-- What schema.sql expects from Supabase, for a plain local Postgres: the
+-- auth schema with auth.users and auth.uid(), and the anon and
+-- authenticated roles PostgREST switches to, with Supabase's default
+-- grants. auth.uid() reads request.jwt.claim.sub, so a script acts as a
+-- user with:
+--
+--   SELECT set_config('request.jwt.claim.sub', '<uuid>', TRUE);
+--   SET LOCAL ROLE authenticated;
+--
+-- Included by local_harness.sql and bench_rls.sql before schema.sql.
+-- =============================================
+
+CREATE SCHEMA IF NOT EXISTS auth;
+
+CREATE TABLE IF NOT EXISTS auth.users (
+    id UUID PRIMARY KEY
+);
+
+CREATE OR REPLACE FUNCTION auth.uid()
+RETURNS UUID
+LANGUAGE sql
+STABLE
+AS $$
+    SELECT NULLIF(current_setting('request.jwt.claim.sub', TRUE), '')::UUID;
+$$;
+
+-- Roles belong to the cluster, so they may exist from an earlier run
+DO $$
+BEGIN
+    CREATE ROLE anon NOLOGIN;
+EXCEPTION WHEN duplicate_object THEN NULL;
+END;
+$$;
+
+DO $$
+BEGIN
+    CREATE ROLE authenticated NOLOGIN;
+EXCEPTION WHEN duplicate_object THEN NULL;
+END;
+$$;
+
+-- Supabase grants table access to both roles and leaves the rest to RLS
+GRANT USAGE ON SCHEMA public, auth TO anon, authenticated;
+ALTER DEFAULT PRIVILEGES IN SCHEMA public GRANT ALL ON TABLES TO anon, authenticated;
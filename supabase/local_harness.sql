@@ -0,0 +1,343 @@
+-- =============================================
+-- LOCAL POSTGRES HARNESS
+-- =============================================
+-- Loads schema.sql into a throwaway local Postgres and checks the
+-- functions in its FUNCTIONS section and the admin check behind its RLS
+-- policies. Every check runs inside a transaction that is rolled back,
+-- and any failed ASSERT aborts the run.
+--
+--   createdb dolce_vitta_test
+--   psql -v ON_ERROR_STOP=1 -d dolce_vitta_test -f supabase/local_harness.sql
+--   dropdb dolce_vitta_test
+--
+-- Use a fresh database each time. Needs the uuid-ossp and pg_trgm
+-- extensions (postgresql-contrib).
+-- =============================================
+
+\set ON_ERROR_STOP on
+
+\ir local_auth.sql
+\ir schema.sql
+
+-- ---------------------------------------------
+-- Fixtures
+-- ---------------------------------------------
+BEGIN;
+
+INSERT INTO category (id, c_name, c_sort_order) VALUES
+    ('c0000000-0000-0000-0000-000000000001', 'Bolos', 0),
+    ('c0000000-0000-0000-0000-000000000002', 'Tortas', 1);
+
+INSERT INTO product (id, p_category_id, p_name, p_price, p_sort_order) VALUES
+    ('a0000000-0000-0000-0000-000000000001', 'c0000000-0000-0000-0000-000000000001', 'Bolo de Chocolate', 45.90, 0),
+    ('a0000000-0000-0000-0000-000000000002', 'c0000000-0000-0000-0000-000000000001', 'Bolo de Cenoura', 39.50, 1),
+    ('a0000000-0000-0000-0000-000000000003', 'c0000000-0000-0000-0000-000000000002', 'Torta de Limão', 52.00, 2);
+
+-- ---------------------------------------------
+-- catalog_snapshot: follows every write to category and product
+-- ---------------------------------------------
+DO $$
+DECLARE
+    document JSONB;
+BEGIN
+    document := (SELECT cs_document FROM catalog_snapshot);
+    ASSERT jsonb_array_length(document) = 2, 'one entry per active category: ' || document;
+    ASSERT document->0->>'c_name' = 'Bolos', 'categories in sort order';
+    ASSERT jsonb_array_length(document->0->'products') = 2, 'products under their category';
+    ASSERT document->0->'products'->0->>'p_name' = 'Bolo de Chocolate', 'products in sort order';
+
+    UPDATE product SET p_is_available = FALSE WHERE id = 'a0000000-0000-0000-0000-000000000001';
+    document := (SELECT cs_document FROM catalog_snapshot);
+    ASSERT jsonb_array_length(document->0->'products') = 1, 'unavailable products leave the menu';
+
+    UPDATE category SET c_is_active = FALSE WHERE id = 'c0000000-0000-0000-0000-000000000002';
+    ASSERT jsonb_array_length((SELECT cs_document FROM catalog_snapshot)) = 1, 'inactive categories leave the menu';
+
+    UPDATE product SET p_is_available = TRUE WHERE id = 'a0000000-0000-0000-0000-000000000001';
+    UPDATE category SET c_is_active = TRUE WHERE id = 'c0000000-0000-0000-0000-000000000002';
+    ASSERT (SELECT COUNT(*) FROM catalog_snapshot) = 1, 'always a single row';
+END;
+$$;
+
+-- ---------------------------------------------
+-- create_order: prices from the database, skips unknown products
+-- ---------------------------------------------
+DO $$
+DECLARE
+    result JSONB;
+BEGIN
+    result := create_order('Bia', '[
+        {"product_id": "a0000000-0000-0000-0000-000000000001", "quantity": 2, "price": 0.01},
+        {"product_id": "a0000000-0000-0000-0000-0000000000ff", "quantity": 1},
+        {"product_id": "a0000000-0000-0000-0000-000000000003", "quantity": 1}
+    ]');
+
+    ASSERT (result->>'total')::DECIMAL = 143.80, 'total must be priced from product: ' || result;
+    ASSERT jsonb_array_length(result->'items') = 2, 'unknown products must be skipped';
+    ASSERT result->'items'->0->>'product_name' = 'Bolo de Chocolate', 'items must keep cart order';
+    ASSERT (result->'items'->0->>'subtotal')::DECIMAL = 91.80, 'subtotal = price * quantity';
+
+    ASSERT (SELECT o_total FROM "order" WHERE id = (result->>'order_id')::UUID) = 143.80,
+        'order row must be written with the total';
+    ASSERT (SELECT COUNT(*) FROM order_item WHERE oi_order_id = (result->>'order_id')::UUID) = 2,
+        'one order_item per priced line';
+END;
+$$;
+
+-- ---------------------------------------------
+-- create_order: nothing to price writes nothing
+-- ---------------------------------------------
+DO $$
+DECLARE
+    orders_before BIGINT := (SELECT COUNT(*) FROM "order");
+BEGIN
+    ASSERT create_order('Caio', '[{"product_id": "a0000000-0000-0000-0000-0000000000ff", "quantity": 1}]') IS NULL,
+        'a cart without valid products returns NULL';
+    ASSERT create_order('Caio', '[]') IS NULL, 'an empty cart returns NULL';
+    ASSERT (SELECT COUNT(*) FROM "order") = orders_before, 'no order row for an empty cart';
+END;
+$$;
+
+-- ---------------------------------------------
+-- create_order: a failing item insert leaves no orphaned order
+-- ---------------------------------------------
+DO $$
+DECLARE
+    orders_before BIGINT := (SELECT COUNT(*) FROM "order");
+BEGIN
+    BEGIN
+        -- A missing quantity violates order_item.oi_quantity NOT NULL
+        PERFORM create_order('Duda', '[
+            {"product_id": "a0000000-0000-0000-0000-000000000001", "quantity": 1},
+            {"product_id": "a0000000-0000-0000-0000-000000000002"}
+        ]');
+        RAISE EXCEPTION 'create_order should have failed';
+    EXCEPTION WHEN not_null_violation THEN
+        NULL;
+    END;
+    ASSERT (SELECT COUNT(*) FROM "order") = orders_before, 'order insert must roll back with its items';
+END;
+$$;
+
+-- ---------------------------------------------
+-- create_order: an Idempotency-Key replays the first order
+-- ---------------------------------------------
+DO $$
+DECLARE
+    first_result JSONB;
+    retry_result JSONB;
+    orders_before BIGINT := (SELECT COUNT(*) FROM "order");
+BEGIN
+    first_result := create_order('Bia', '[{"product_id": "a0000000-0000-0000-0000-000000000002", "quantity": 1}]',
+                                 'key-1', 'hash-1');
+    retry_result := create_order('Bia', '[{"product_id": "a0000000-0000-0000-0000-000000000002", "quantity": 1}]',
+                                 'key-1', 'hash-1');
+    ASSERT retry_result->>'order_id' = first_result->>'order_id', 'a retry returns the first order';
+    ASSERT (retry_result->>'replayed')::BOOLEAN, 'a retry is marked as replayed';
+    ASSERT (SELECT COUNT(*) FROM "order") = orders_before + 1, 'a retry writes no second order';
+
+    ASSERT create_order('Bia', '[]', 'key-1', 'hash-2') = '{"conflict": true}'::JSONB,
+        'the same key with another request is a conflict';
+
+    ASSERT create_order('Caio', '[{"product_id": "a0000000-0000-0000-0000-0000000000ff", "quantity": 1}]',
+                        'key-2', 'hash-3') IS NULL, 'nothing to price';
+    ASSERT NOT EXISTS (SELECT 1 FROM idempotency_key WHERE ik_key = 'key-2'),
+        'a checkout that wrote nothing releases its key';
+END;
+$$;
+
+-- ---------------------------------------------
+-- create_order: each keyed checkout purges a bounded batch of expired keys
+-- ---------------------------------------------
+DO $$
+BEGIN
+    INSERT INTO idempotency_key (ik_key, ik_expires_at)
+    SELECT 'expired-' || n, NOW() - n * INTERVAL '1 minute' FROM generate_series(1, 150) AS n;
+
+    PERFORM create_order('Bia', '[{"product_id": "a0000000-0000-0000-0000-000000000002", "quantity": 1}]',
+                         'key-3', 'hash-4');
+    ASSERT (SELECT COUNT(*) FROM idempotency_key WHERE ik_key LIKE 'expired-%') = 50,
+        'at most 100 expired keys per checkout';
+    ASSERT NOT EXISTS (SELECT 1 FROM idempotency_key WHERE ik_key = 'expired-150'),
+        'the oldest keys go first';
+    ASSERT EXISTS (SELECT 1 FROM idempotency_key WHERE ik_key = 'key-1'), 'live keys stay';
+
+    PERFORM create_order('Bia', '[{"product_id": "a0000000-0000-0000-0000-000000000002", "quantity": 1}]',
+                         'key-4', 'hash-5');
+    ASSERT NOT EXISTS (SELECT 1 FROM idempotency_key WHERE ik_key LIKE 'expired-%'), 'the rest on the next one';
+END;
+$$;
+
+-- ---------------------------------------------
+-- order_analytics: periods in the shop's time zone, top products
+-- ---------------------------------------------
+DO $$
+DECLARE
+    result JSONB;
+BEGIN
+    INSERT INTO "order" (id, o_customer_name, o_total, o_created_at) VALUES
+        ('b0000000-0000-0000-0000-000000000001', 'Ana', 91.80, '2024-01-01 12:00+00'),
+        ('b0000000-0000-0000-0000-000000000002', 'Beto', 52.00, '2024-01-03 12:00+00'),
+        -- 2024-01-02 23:00 in São Paulo
+        ('b0000000-0000-0000-0000-000000000003', 'Caio', 39.50, '2024-01-03 02:00+00');
+    INSERT INTO order_item (oi_order_id, oi_product_id, oi_product_name, oi_product_price, oi_quantity, oi_subtotal) VALUES
+        ('b0000000-0000-0000-0000-000000000001', 'a0000000-0000-0000-0000-000000000001', 'Bolo de Chocolate', 45.90, 2, 91.80),
+        ('b0000000-0000-0000-0000-000000000002', 'a0000000-0000-0000-0000-000000000003', 'Torta de Limão', 52.00, 1, 52.00),
+        ('b0000000-0000-0000-0000-000000000003', 'a0000000-0000-0000-0000-000000000002', 'Bolo de Cenoura', 39.50, 1, 39.50);
+
+    result := order_analytics('2024-01-01 00:00-03', '2024-01-04 00:00-03', 'day', 2, 'America/Sao_Paulo');
+    ASSERT (result->'summary'->>'orders')::INTEGER = 3, 'orders in range: ' || result;
+    ASSERT (result->'summary'->>'revenue')::DECIMAL = 183.30, 'revenue in range';
+    ASSERT (result->'summary'->>'average_ticket')::DECIMAL = 61.10, 'average ticket';
+    ASSERT (result->'summary'->>'items_sold')::INTEGER = 4, 'items sold';
+    ASSERT jsonb_array_length(result->'revenue') = 3, 'one entry per day of the range';
+    ASSERT result->'revenue'->1 = '{"period": "2024-01-02", "orders": 1, "revenue": 39.50}'::JSONB,
+        'days follow the shop time zone: ' || (result->'revenue');
+    ASSERT jsonb_array_length(result->'top_by_quantity') = 2, 'top_limit caps the lists';
+    ASSERT result->'top_by_quantity'->0->>'product_name' = 'Bolo de Chocolate', 'most sold first';
+    ASSERT result->'top_by_revenue'->1->>'product_name' = 'Torta de Limão', 'ranked by revenue';
+
+    result := order_analytics('2024-01-01 00:00+00', '2024-01-04 00:00+00', 'day', 10, 'UTC');
+    ASSERT (result->'revenue'->2->>'orders')::INTEGER = 2, 'in UTC the late order falls on the 3rd';
+
+    result := order_analytics('2024-01-01 00:00-03', '2024-01-04 00:00-03', 'week', 10, 'America/Sao_Paulo');
+    ASSERT jsonb_array_length(result->'revenue') = 1, 'weeks start on Monday (2024-01-01)';
+
+    result := order_analytics('2023-06-01 00:00+00', '2023-06-08 00:00+00', 'day', 10, 'UTC');
+    ASSERT (result->'summary'->>'orders')::INTEGER = 0 AND (result->'summary'->>'average_ticket')::DECIMAL = 0,
+        'an empty range has zero totals';
+    ASSERT jsonb_array_length(result->'revenue') = 7 AND result->'top_by_revenue' = '[]'::JSONB,
+        'empty periods are still listed';
+END;
+$$;
+
+-- ---------------------------------------------
+-- reorder_products / reorder_categories
+-- ---------------------------------------------
+DO $$
+BEGIN
+    ASSERT reorder_products('[
+        {"id": "a0000000-0000-0000-0000-000000000003", "sort_order": 0},
+        {"id": "a0000000-0000-0000-0000-000000000001", "sort_order": 1},
+        {"id": "a0000000-0000-0000-0000-000000000002", "sort_order": 2}
+    ]') = 2, 'only the rows whose position changed are written';
+    ASSERT (SELECT p_sort_order FROM product WHERE id = 'a0000000-0000-0000-0000-000000000003') = 0,
+        'new sort order applied';
+    ASSERT reorder_products('[{"id": "a0000000-0000-0000-0000-000000000003", "sort_order": 0}]', FALSE) = 1,
+        'only_changed = FALSE writes every row';
+
+    ASSERT reorder_categories('[
+        {"id": "c0000000-0000-0000-0000-000000000002", "sort_order": 0},
+        {"id": "c0000000-0000-0000-0000-000000000001", "sort_order": 1}
+    ]') = 2, 'categories swapped';
+END;
+$$;
+
+-- ---------------------------------------------
+-- adjust_product_prices: one UPDATE, rounded to cents
+-- ---------------------------------------------
+DO $$
+DECLARE
+    updated UUID[];
+BEGIN
+    updated := adjust_product_prices(ARRAY[
+        'a0000000-0000-0000-0000-000000000001',
+        'a0000000-0000-0000-0000-000000000002',
+        'a0000000-0000-0000-0000-0000000000ff'
+    ]::UUID[], 10);
+
+    ASSERT cardinality(updated) = 2, 'unknown ids are skipped: ' || updated::TEXT;
+    ASSERT (SELECT p_price FROM product WHERE id = 'a0000000-0000-0000-0000-000000000001') = 50.49,
+        '45.90 + 10% rounds to 50.49';
+    ASSERT (SELECT p_price FROM product WHERE id = 'a0000000-0000-0000-0000-000000000003') = 52.00,
+        'products outside ids keep their price';
+
+    PERFORM adjust_product_prices(ARRAY['a0000000-0000-0000-0000-000000000001']::UUID[], -50);
+    ASSERT (SELECT p_price FROM product WHERE id = 'a0000000-0000-0000-0000-000000000001') = 25.25,
+        'a negative percent lowers the price';
+    ASSERT cardinality(adjust_product_prices('{}', 10)) = 0, 'no ids, no update';
+END;
+$$;
+
+-- ---------------------------------------------
+-- update_products_partial: only the columns each item gives
+-- ---------------------------------------------
+DO $$
+DECLARE
+    before product;
+    updated UUID[];
+BEGIN
+    SELECT * INTO before FROM product WHERE id = 'a0000000-0000-0000-0000-000000000003';
+
+    updated := update_products_partial('[
+        {"id": "a0000000-0000-0000-0000-000000000003", "p_name": "Torta de Limão Siciliano"},
+        {"id": "a0000000-0000-0000-0000-000000000002", "p_sort_order": 9, "p_description": null},
+        {"id": "a0000000-0000-0000-0000-0000000000ff", "p_name": "Nada"}
+    ]');
+    ASSERT cardinality(updated) = 2, 'unknown ids are skipped: ' || updated::TEXT;
+
+    ASSERT (SELECT p_name FROM product WHERE id = before.id) = 'Torta de Limão Siciliano', 'a given column changes';
+    ASSERT (SELECT p_price FROM product WHERE id = before.id) = before.p_price, 'price is kept without p_price';
+    ASSERT (SELECT p_category_id FROM product WHERE id = before.id) = before.p_category_id, 'category is kept';
+    ASSERT (SELECT p_sort_order FROM product WHERE id = before.id) = before.p_sort_order, 'sort order is kept';
+    ASSERT (SELECT p_last_update FROM product WHERE id = before.id) IS NOT NULL, 'the row is stamped';
+    ASSERT (SELECT p_sort_order FROM product WHERE id = 'a0000000-0000-0000-0000-000000000002') = 9,
+        'items may give different columns';
+END;
+$$;
+
+-- ---------------------------------------------
+-- RLS: is_active_admin() behind the admin policies
+-- ---------------------------------------------
+INSERT INTO auth.users (id) VALUES
+    ('e0000000-0000-0000-0000-000000000001'),
+    ('e0000000-0000-0000-0000-000000000002');
+
+INSERT INTO admin (id, a_email, a_is_active) VALUES
+    ('e0000000-0000-0000-0000-000000000001', 'ana@example.com', TRUE),
+    ('e0000000-0000-0000-0000-000000000002', 'bruno@example.com', FALSE);
+
+DO $$
+DECLARE
+    products BIGINT;
+    available BIGINT;
+BEGIN
+    UPDATE product SET p_is_available = FALSE WHERE id = 'a0000000-0000-0000-0000-000000000002';
+    products := (SELECT COUNT(*) FROM product);
+    available := (SELECT COUNT(*) FROM product WHERE p_is_available);
+
+    SET LOCAL ROLE anon;
+    ASSERT NOT is_active_admin(), 'anonymous callers are not admins';
+    ASSERT (SELECT COUNT(*) FROM product) = available, 'the public sees available products only';
+    ASSERT (SELECT COUNT(*) FROM "order") = 0, 'the public sees no orders';
+
+    SET LOCAL ROLE authenticated;
+    PERFORM set_config('request.jwt.claim.sub', 'e0000000-0000-0000-0000-000000000002', TRUE);
+    ASSERT NOT is_active_admin(), 'inactive admins are not admins';
+    ASSERT (SELECT COUNT(*) FROM product) = available, 'an inactive admin sees the public menu';
+
+    PERFORM set_config('request.jwt.claim.sub', 'e0000000-0000-0000-0000-000000000001', TRUE);
+    ASSERT is_active_admin(), 'active admins are admins';
+    ASSERT (SELECT COUNT(*) FROM product) = products, 'admins also see unavailable products';
+    ASSERT (SELECT COUNT(*) FROM "order") > 0, 'admins see orders';
+    ASSERT (SELECT COUNT(*) FROM admin) = 1, 'admins see only their own profile';
+
+    UPDATE product SET p_name = 'Bolo de Cenoura Caseiro', p_is_available = TRUE
+    WHERE id = 'a0000000-0000-0000-0000-000000000002';
+    ASSERT (SELECT cs_document::TEXT LIKE '%Bolo de Cenoura Caseiro%' FROM catalog_snapshot),
+        'an admin write still refreshes the snapshot';
+    BEGIN
+        PERFORM refresh_catalog_snapshot();
+        RAISE EXCEPTION 'refresh_catalog_snapshot should not be callable by clients';
+    EXCEPTION WHEN insufficient_privilege THEN
+        NULL;
+    END;
+
+    RESET ROLE;
+    PERFORM set_config('request.jwt.claim.sub', '', TRUE);
+END;
+$$;
+
+ROLLBACK;
+
+\echo 'local harness: all checks passed'
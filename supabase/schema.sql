@@ -8,12 +8,16 @@
 --   - Fields: prefix with table initial (a_name, p_price)
 --   - Foreign keys: prefix + referenced_table + _id (oi_product_id)
 --
--- NOTE: All business logic is handled by Python backend.
--- Supabase only handles: tables, indexes, and RLS security.
+-- NOTE: Business logic is handled by Python backend.
+-- Supabase handles: tables, indexes, RLS security and a few
+-- functions for multi-row writes that must run atomically
+-- in a single round-trip (see FUNCTIONS at the end).
 -- =============================================
 
 -- Enable UUID extension
 CREATE EXTENSION IF NOT EXISTS "uuid-ossp";
+-- Trigram indexes for the catalog search (ILIKE '%...%')
+CREATE EXTENSION IF NOT EXISTS pg_trgm;
 
 -- =============================================
 -- TABLE: admin
@@ -31,6 +35,9 @@ CREATE TABLE IF NOT EXISTS admin (
     a_last_update TIMESTAMPTZ
 );
 
+-- Index: the admin check in every admin policy (is_active_admin)
+CREATE INDEX IF NOT EXISTS idx_admin_active ON admin(id) WHERE a_is_active;
+
 -- =============================================
 -- TABLE: category
 -- =============================================
@@ -68,6 +75,10 @@ CREATE TABLE IF NOT EXISTS product (
 CREATE INDEX IF NOT EXISTS idx_product_category ON product(p_category_id);
 -- Index: faster queries for available products
 CREATE INDEX IF NOT EXISTS idx_product_available ON product(p_is_available);
+-- Index: catalog search, p_name ILIKE '%bolo%' OR p_description ILIKE '%bolo%'
+-- (a BitmapOr of both indexes instead of a full scan)
+CREATE INDEX IF NOT EXISTS idx_product_name_trgm ON product USING GIN (p_name gin_trgm_ops);
+CREATE INDEX IF NOT EXISTS idx_product_description_trgm ON product USING GIN (p_description gin_trgm_ops);
 
 -- =============================================
 -- TABLE: order
@@ -109,6 +120,20 @@ CREATE INDEX IF NOT EXISTS idx_order_item_order ON order_item(oi_order_id);
 -- =============================================
 -- CRITICAL: Protects data even if anon_key is exposed
 
+-- Whether the caller is an active admin. Policies call it as
+-- (SELECT is_active_admin()) so Postgres runs it once per statement, as
+-- an InitPlan, instead of once per row. SECURITY DEFINER so the lookup
+-- does not go through admin's own policies; idx_admin_active serves it.
+CREATE OR REPLACE FUNCTION is_active_admin()
+RETURNS BOOLEAN
+LANGUAGE sql
+STABLE
+SECURITY DEFINER
+SET search_path = public
+AS $$
+    SELECT EXISTS (SELECT 1 FROM admin WHERE id = auth.uid() AND a_is_active);
+$$;
+
 ALTER TABLE admin ENABLE ROW LEVEL SECURITY;
 ALTER TABLE category ENABLE ROW LEVEL SECURITY;
 ALTER TABLE product ENABLE ROW LEVEL SECURITY;
@@ -119,110 +144,129 @@ ALTER TABLE order_item ENABLE ROW LEVEL SECURITY;
 -- ADMIN policies
 -- ---------------------------------------------
 -- Admins can only see/edit their own profile
+DROP POLICY IF EXISTS "admin_select_own" ON admin;
 CREATE POLICY "admin_select_own" ON admin 
-    FOR SELECT USING (auth.uid() = id);
+    FOR SELECT USING ((SELECT auth.uid()) = id);
 
+DROP POLICY IF EXISTS "admin_update_own" ON admin;
 CREATE POLICY "admin_update_own" ON admin 
-    FOR UPDATE USING (auth.uid() = id);
+    FOR UPDATE USING ((SELECT auth.uid()) = id);
 
 -- Allow insert when user registers (service_role or matching id)
+DROP POLICY IF EXISTS "admin_insert" ON admin;
 CREATE POLICY "admin_insert" ON admin 
-    FOR INSERT WITH CHECK (auth.uid() = id);
+    FOR INSERT WITH CHECK ((SELECT auth.uid()) = id);
 
 -- ---------------------------------------------
 -- CATEGORY policies
 -- ---------------------------------------------
 -- Anyone can view active categories (public menu)
+DROP POLICY IF EXISTS "category_select_public" ON category;
 CREATE POLICY "category_select_public" ON category 
     FOR SELECT USING (c_is_active = TRUE);
 
 -- Only admins can manage categories (insert, update, delete)
+DROP POLICY IF EXISTS "category_admin_insert" ON category;
 CREATE POLICY "category_admin_insert" ON category 
     FOR INSERT WITH CHECK (
-        auth.uid() IN (SELECT id FROM admin WHERE a_is_active = TRUE)
+        (SELECT is_active_admin())
     );
 
+DROP POLICY IF EXISTS "category_admin_update" ON category;
 CREATE POLICY "category_admin_update" ON category 
     FOR UPDATE USING (
-        auth.uid() IN (SELECT id FROM admin WHERE a_is_active = TRUE)
+        (SELECT is_active_admin())
     );
 
+DROP POLICY IF EXISTS "category_admin_delete" ON category;
 CREATE POLICY "category_admin_delete" ON category 
     FOR DELETE USING (
-        auth.uid() IN (SELECT id FROM admin WHERE a_is_active = TRUE)
+        (SELECT is_active_admin())
     );
 
 -- Admins can also see inactive categories
+DROP POLICY IF EXISTS "category_admin_select_all" ON category;
 CREATE POLICY "category_admin_select_all" ON category 
     FOR SELECT USING (
-        auth.uid() IN (SELECT id FROM admin WHERE a_is_active = TRUE)
+        (SELECT is_active_admin())
     );
 
 -- ---------------------------------------------
 -- PRODUCT policies
 -- ---------------------------------------------
 -- Anyone can view available products (public menu)
+DROP POLICY IF EXISTS "product_select_public" ON product;
 CREATE POLICY "product_select_public" ON product 
     FOR SELECT USING (p_is_available = TRUE);
 
 -- Only admins can manage products
+DROP POLICY IF EXISTS "product_admin_insert" ON product;
 CREATE POLICY "product_admin_insert" ON product 
     FOR INSERT WITH CHECK (
-        auth.uid() IN (SELECT id FROM admin WHERE a_is_active = TRUE)
+        (SELECT is_active_admin())
     );
 
+DROP POLICY IF EXISTS "product_admin_update" ON product;
 CREATE POLICY "product_admin_update" ON product 
     FOR UPDATE USING (
-        auth.uid() IN (SELECT id FROM admin WHERE a_is_active = TRUE)
+        (SELECT is_active_admin())
     );
 
+DROP POLICY IF EXISTS "product_admin_delete" ON product;
 CREATE POLICY "product_admin_delete" ON product 
     FOR DELETE USING (
-        auth.uid() IN (SELECT id FROM admin WHERE a_is_active = TRUE)
+        (SELECT is_active_admin())
     );
 
 -- Admins can also see unavailable products
+DROP POLICY IF EXISTS "product_admin_select_all" ON product;
 CREATE POLICY "product_admin_select_all" ON product 
     FOR SELECT USING (
-        auth.uid() IN (SELECT id FROM admin WHERE a_is_active = TRUE)
+        (SELECT is_active_admin())
     );
 
 -- ---------------------------------------------
 -- ORDER policies
 -- ---------------------------------------------
 -- Anyone can CREATE orders (customers don't log in)
+DROP POLICY IF EXISTS "order_insert_public" ON "order";
 CREATE POLICY "order_insert_public" ON "order" 
     FOR INSERT WITH CHECK (TRUE);
 
 -- Only admins can view orders
+DROP POLICY IF EXISTS "order_select_admin" ON "order";
 CREATE POLICY "order_select_admin" ON "order" 
     FOR SELECT USING (
-        auth.uid() IN (SELECT id FROM admin WHERE a_is_active = TRUE)
+        (SELECT is_active_admin())
     );
 
 -- Only admins can update orders (change status, etc.)
+DROP POLICY IF EXISTS "order_update_admin" ON "order";
 CREATE POLICY "order_update_admin" ON "order" 
     FOR UPDATE USING (
-        auth.uid() IN (SELECT id FROM admin WHERE a_is_active = TRUE)
+        (SELECT is_active_admin())
     );
 
 -- Only admins can delete orders
+DROP POLICY IF EXISTS "order_delete_admin" ON "order";
 CREATE POLICY "order_delete_admin" ON "order" 
     FOR DELETE USING (
-        auth.uid() IN (SELECT id FROM admin WHERE a_is_active = TRUE)
+        (SELECT is_active_admin())
     );
 
 -- ---------------------------------------------
 -- ORDER_ITEM policies
 -- ---------------------------------------------
 -- Anyone can CREATE order items (with order)
+DROP POLICY IF EXISTS "order_item_insert_public" ON order_item;
 CREATE POLICY "order_item_insert_public" ON order_item 
     FOR INSERT WITH CHECK (TRUE);
 
 -- Only admins can view order items
+DROP POLICY IF EXISTS "order_item_select_admin" ON order_item;
 CREATE POLICY "order_item_select_admin" ON order_item 
     FOR SELECT USING (
-        auth.uid() IN (SELECT id FROM admin WHERE a_is_active = TRUE)
+        (SELECT is_active_admin())
     );
 
 -- =============================================
@@ -256,21 +300,467 @@ CREATE TABLE IF NOT EXISTS about (
 ALTER TABLE about ENABLE ROW LEVEL SECURITY;
 
 -- Anyone can read about page (public)
+DROP POLICY IF EXISTS "about_select_public" ON about;
 CREATE POLICY "about_select_public" ON about 
     FOR SELECT USING (TRUE);
 
 -- Only admins can insert/update/delete about
+DROP POLICY IF EXISTS "about_insert_admin" ON about;
 CREATE POLICY "about_insert_admin" ON about 
     FOR INSERT WITH CHECK (
-        auth.uid() IN (SELECT id FROM admin WHERE a_is_active = TRUE)
+        (SELECT is_active_admin())
     );
 
+DROP POLICY IF EXISTS "about_update_admin" ON about;
 CREATE POLICY "about_update_admin" ON about 
     FOR UPDATE USING (
-        auth.uid() IN (SELECT id FROM admin WHERE a_is_active = TRUE)
+        (SELECT is_active_admin())
     );
 
+DROP POLICY IF EXISTS "about_delete_admin" ON about;
 CREATE POLICY "about_delete_admin" ON about 
     FOR DELETE USING (
-        auth.uid() IN (SELECT id FROM admin WHERE a_is_active = TRUE)
+        (SELECT is_active_admin())
+    );
+
+-- =============================================
+-- TABLE: idempotency_key
+-- =============================================
+-- Results of checkouts sent with an Idempotency-Key header, so a retry
+-- on any serverless instance replays the first order instead of creating
+-- another one (IDEMPOTENCY_STORE=table). Written only by create_order.
+CREATE TABLE IF NOT EXISTS idempotency_key (
+    ik_key TEXT PRIMARY KEY,
+    ik_request_hash TEXT,
+    ik_response JSONB,
+    ik_created_at TIMESTAMPTZ DEFAULT NOW() NOT NULL,
+    ik_expires_at TIMESTAMPTZ NOT NULL
+);
+
+-- Index: purge expired keys (create_order removes up to 100 per keyed
+-- checkout; a pg_cron job can sweep the rest:
+-- DELETE FROM idempotency_key WHERE ik_expires_at < NOW())
+CREATE INDEX IF NOT EXISTS idx_idempotency_key_expires ON idempotency_key(ik_expires_at);
+
+-- No policies: only the service role (backend) can read or write it
+ALTER TABLE idempotency_key ENABLE ROW LEVEL SECURITY;
+
+-- =============================================
+-- TABLE: catalog_snapshot
+-- =============================================
+-- The public menu, precomputed: a single row holding every active
+-- category with its available products, both in sort order, in the shape
+-- of GET /api/catalog. Anonymous catalog reads fetch this one row instead
+-- of joining product to category and evaluating the RLS policies row by
+-- row. Rebuilt by refresh_catalog_snapshot(), which the triggers on
+-- category and product run after every write (see FUNCTIONS).
+CREATE TABLE IF NOT EXISTS catalog_snapshot (
+    cs_id SMALLINT PRIMARY KEY DEFAULT 1 CHECK (cs_id = 1),
+    cs_document JSONB NOT NULL,
+    cs_refreshed_at TIMESTAMPTZ DEFAULT NOW() NOT NULL
+);
+
+ALTER TABLE catalog_snapshot ENABLE ROW LEVEL SECURITY;
+
+-- Anyone can read it: it only holds what the public menu shows.
+-- Written only by refresh_catalog_snapshot().
+DROP POLICY IF EXISTS "catalog_snapshot_select_public" ON catalog_snapshot;
+CREATE POLICY "catalog_snapshot_select_public" ON catalog_snapshot
+    FOR SELECT USING (TRUE);
+
+-- =============================================
+-- FUNCTIONS
+-- =============================================
+-- Called by the backend through PostgREST RPC (/rest/v1/rpc/<name>).
+-- Each call is one statement, so it either applies fully or not at all.
+
+-- ---------------------------------------------
+-- Bulk reorder
+-- ---------------------------------------------
+-- items: [{"id": "<uuid>", "sort_order": 0}, ...]
+-- only_changed: skip rows whose sort order is already correct
+-- Returns the number of rows written.
+CREATE OR REPLACE FUNCTION reorder_categories(items JSONB, only_changed BOOLEAN DEFAULT TRUE)
+RETURNS INTEGER
+LANGUAGE plpgsql
+AS $$
+DECLARE
+    updated INTEGER;
+BEGIN
+    UPDATE category AS c
+    SET c_sort_order = i.sort_order,
+        c_last_update = NOW()
+    FROM jsonb_to_recordset(items) AS i(id UUID, sort_order INTEGER)
+    WHERE c.id = i.id
+      AND (NOT only_changed OR c.c_sort_order IS DISTINCT FROM i.sort_order);
+    GET DIAGNOSTICS updated = ROW_COUNT;
+    RETURN updated;
+END;
+$$;
+
+CREATE OR REPLACE FUNCTION reorder_products(items JSONB, only_changed BOOLEAN DEFAULT TRUE)
+RETURNS INTEGER
+LANGUAGE plpgsql
+AS $$
+DECLARE
+    updated INTEGER;
+BEGIN
+    UPDATE product AS p
+    SET p_sort_order = i.sort_order,
+        p_last_update = NOW()
+    FROM jsonb_to_recordset(items) AS i(id UUID, sort_order INTEGER)
+    WHERE p.id = i.id
+      AND (NOT only_changed OR p.p_sort_order IS DISTINCT FROM i.sort_order);
+    GET DIAGNOSTICS updated = ROW_COUNT;
+    RETURN updated;
+END;
+$$;
+
+-- ---------------------------------------------
+-- Batch price change
+-- ---------------------------------------------
+-- Scales the price of every product in `ids` by (1 + percent / 100),
+-- rounded to cents, in one UPDATE (percent = 10 raises prices by 10%,
+-- -5 lowers them by 5%). Returns the ids that were updated.
+CREATE OR REPLACE FUNCTION adjust_product_prices(ids UUID[], percent NUMERIC)
+RETURNS UUID[]
+LANGUAGE sql
+AS $$
+    WITH updated AS (
+        UPDATE product
+        SET p_price = ROUND(p_price * (1 + percent / 100), 2),
+            p_last_update = NOW()
+        WHERE id = ANY(ids)
+        RETURNING id
+    )
+    SELECT COALESCE(array_agg(id), '{}') FROM updated;
+$$;
+
+-- ---------------------------------------------
+-- Product import updates
+-- ---------------------------------------------
+-- items: [{"id": "<uuid>", "p_name": "...", "p_price": 45.9, ...}, ...]
+-- from POST /api/products/import. Each item changes only the columns it
+-- gives; a column left out (or null) keeps its value. An upsert cannot do
+-- this: Postgres checks p_name and p_price NOT NULL on the proposed insert
+-- row before it finds the conflict. One UPDATE for all items; returns the
+-- ids that were updated (unknown ids are skipped).
+CREATE OR REPLACE FUNCTION update_products_partial(items JSONB)
+RETURNS UUID[]
+LANGUAGE sql
+AS $$
+    WITH updated AS (
+        UPDATE product AS p
+        SET p_name = COALESCE(i.p_name, p.p_name),
+            p_description = COALESCE(i.p_description, p.p_description),
+            p_price = COALESCE(i.p_price, p.p_price),
+            p_category_id = COALESCE(i.p_category_id, p.p_category_id),
+            p_image_url = COALESCE(i.p_image_url, p.p_image_url),
+            p_is_available = COALESCE(i.p_is_available, p.p_is_available),
+            p_is_featured = COALESCE(i.p_is_featured, p.p_is_featured),
+            p_sort_order = COALESCE(i.p_sort_order, p.p_sort_order),
+            p_last_update = NOW()
+        FROM jsonb_to_recordset(items) AS i(
+            id UUID,
+            p_name TEXT,
+            p_description TEXT,
+            p_price DECIMAL(10, 2),
+            p_category_id UUID,
+            p_image_url TEXT,
+            p_is_available BOOLEAN,
+            p_is_featured BOOLEAN,
+            p_sort_order INTEGER
+        )
+        WHERE p.id = i.id
+        RETURNING p.id
+    )
+    SELECT COALESCE(array_agg(id), '{}') FROM updated;
+$$;
+
+-- ---------------------------------------------
+-- Checkout
+-- ---------------------------------------------
+-- items: [{"product_id": "<uuid>", "quantity": 2}, ...]
+-- Prices the cart from product (client prices are never trusted), writes
+-- the order and all of its items in the same transaction and returns
+--   {"order_id", "total",
+--    "items": [{"product_id", "product_name", "product_price", "quantity", "subtotal"}]}
+-- (the WhatsApp number comes from the backend's cached about settings)
+-- Unknown products are skipped; returns NULL (and writes nothing) when
+-- no valid product is left.
+--
+-- request_key / request_hash (optional): the client's Idempotency-Key and
+-- a hash of the request body. The first call claims the key in
+-- idempotency_key and stores its result; a concurrent duplicate waits on
+-- that row and then gets the stored result with "replayed": true instead
+-- of a second order. The same key with another hash returns
+-- {"conflict": true}.
+DROP FUNCTION IF EXISTS create_order(TEXT, JSONB);
+
+CREATE OR REPLACE FUNCTION create_order(
+    customer_name TEXT,
+    items JSONB,
+    request_key TEXT DEFAULT NULL,
+    request_hash TEXT DEFAULT NULL,
+    ttl_seconds INTEGER DEFAULT 86400
+)
+RETURNS JSONB
+LANGUAGE plpgsql
+AS $$
+DECLARE
+    new_order_id UUID;
+    order_total DECIMAL(10, 2);
+    priced_items JSONB;
+    result JSONB;
+    stored_hash TEXT;
+BEGIN
+    IF request_key IS NOT NULL THEN
+        DELETE FROM idempotency_key WHERE ik_key = request_key AND ik_expires_at <= NOW();
+
+        -- Keys expire after ttl_seconds (IDEMPOTENCY_TTL). Each keyed checkout
+        -- purges a bounded batch of expired ones, oldest first, more than it
+        -- adds, so the table stays near the live keys without a cron job.
+        -- SKIP LOCKED keeps concurrent checkouts from waiting on each other.
+        DELETE FROM idempotency_key
+        WHERE ik_key IN (
+            SELECT ik_key FROM idempotency_key
+            WHERE ik_expires_at <= NOW()
+            ORDER BY ik_expires_at
+            LIMIT 100
+            FOR UPDATE SKIP LOCKED
+        );
+
+        -- Blocks while another transaction holds the same key
+        INSERT INTO idempotency_key (ik_key, ik_request_hash, ik_expires_at)
+        VALUES (request_key, request_hash, NOW() + make_interval(secs => ttl_seconds))
+        ON CONFLICT (ik_key) DO NOTHING;
+
+        IF NOT FOUND THEN
+            SELECT ik_request_hash, ik_response INTO stored_hash, result
+            FROM idempotency_key WHERE ik_key = request_key;
+            IF stored_hash IS DISTINCT FROM request_hash THEN
+                RETURN jsonb_build_object('conflict', TRUE);
+            END IF;
+            RETURN result || jsonb_build_object('replayed', TRUE);
+        END IF;
+    END IF;
+
+    SELECT COALESCE(jsonb_agg(jsonb_build_object(
+               'product_id', p.id,
+               'product_name', p.p_name,
+               'product_price', p.p_price,
+               'quantity', (e.item->>'quantity')::INTEGER,
+               'subtotal', p.p_price * (e.item->>'quantity')::INTEGER
+           ) ORDER BY e.ord), '[]'::JSONB),
+           COALESCE(SUM(p.p_price * (e.item->>'quantity')::INTEGER), 0)
+    INTO priced_items, order_total
+    FROM jsonb_array_elements(items) WITH ORDINALITY AS e(item, ord)
+    JOIN product AS p ON p.id = (e.item->>'product_id')::UUID;
+
+    IF jsonb_array_length(priced_items) = 0 THEN
+        -- Nothing was created, so the key stays free for a corrected retry
+        DELETE FROM idempotency_key WHERE ik_key = request_key;
+        RETURN NULL;
+    END IF;
+
+    INSERT INTO "order" (o_customer_name, o_total)
+    VALUES (customer_name, order_total)
+    RETURNING id INTO new_order_id;
+
+    INSERT INTO order_item (oi_order_id, oi_product_id, oi_product_name, oi_product_price, oi_quantity, oi_subtotal)
+    SELECT new_order_id,
+           (i.item->>'product_id')::UUID,
+           i.item->>'product_name',
+           (i.item->>'product_price')::DECIMAL(10, 2),
+           (i.item->>'quantity')::INTEGER,
+           (i.item->>'subtotal')::DECIMAL(10, 2)
+    FROM jsonb_array_elements(priced_items) AS i(item);
+
+    result := jsonb_build_object(
+        'order_id', new_order_id,
+        'total', order_total,
+        'items', priced_items
     );
+
+    IF request_key IS NOT NULL THEN
+        UPDATE idempotency_key SET ik_response = result WHERE ik_key = request_key;
+    END IF;
+
+    RETURN result;
+END;
+$$;
+
+-- ---------------------------------------------
+-- Sales analytics
+-- ---------------------------------------------
+-- Totals for the orders created in [date_from, date_to), computed here so
+-- the admin gets a few hundred bytes instead of the raw history. Only that
+-- range is read: orders come from a range scan on idx_order_created and
+-- their items through idx_order_item_order, so the cost follows the size
+-- of the range, not of order_item.
+--
+-- bucket: 'day' | 'week' | 'month', with periods starting at midnight in
+-- time_zone (weeks start on Monday). Returns
+--   {"summary": {"orders", "revenue", "average_ticket", "items_sold"},
+--    "revenue": [{"period": "YYYY-MM-DD", "orders", "revenue"}, ...],
+--    "top_by_quantity": [{"product_id", "product_name", "quantity", "revenue"}, ...],
+--    "top_by_revenue": [...]}
+-- "revenue" has every period of the range, empty ones included. Products
+-- are grouped by id and name as sold, so a renamed product appears once
+-- per name.
+-- Runs with the caller's rights: under RLS only admins see any order.
+CREATE OR REPLACE FUNCTION order_analytics(
+    date_from TIMESTAMPTZ,
+    date_to TIMESTAMPTZ,
+    bucket TEXT DEFAULT 'day',
+    top_limit INTEGER DEFAULT 10,
+    time_zone TEXT DEFAULT 'UTC'
+)
+RETURNS JSONB
+LANGUAGE sql
+STABLE
+AS $$
+    WITH orders AS (
+        SELECT o.id, o.o_total, date_trunc(bucket, o.o_created_at AT TIME ZONE time_zone) AS period
+        FROM "order" AS o
+        WHERE o.o_created_at >= date_from
+          AND o.o_created_at < date_to
+    ),
+    items AS (
+        SELECT oi.oi_product_id, oi.oi_product_name, oi.oi_quantity, oi.oi_subtotal
+        FROM orders AS o
+        JOIN order_item AS oi ON oi.oi_order_id = o.id
+    ),
+    products AS (
+        SELECT oi_product_id AS product_id,
+               oi_product_name AS product_name,
+               SUM(oi_quantity) AS quantity,
+               SUM(oi_subtotal) AS revenue
+        FROM items
+        GROUP BY oi_product_id, oi_product_name
+    ),
+    periods AS (
+        SELECT s.period, COUNT(o.id) AS orders, COALESCE(SUM(o.o_total), 0) AS revenue
+        FROM generate_series(
+                 date_trunc(bucket, date_from AT TIME ZONE time_zone),
+                 date_trunc(bucket, (date_to - INTERVAL '1 microsecond') AT TIME ZONE time_zone),
+                 ('1 ' || bucket)::INTERVAL
+             ) AS s(period)
+        LEFT JOIN orders AS o ON o.period = s.period
+        GROUP BY s.period
+    )
+    SELECT jsonb_build_object(
+        'summary', (
+            SELECT jsonb_build_object(
+                'orders', COUNT(*),
+                'revenue', COALESCE(SUM(o_total), 0),
+                'average_ticket', COALESCE(ROUND(AVG(o_total), 2), 0),
+                'items_sold', (SELECT COALESCE(SUM(oi_quantity), 0) FROM items)
+            )
+            FROM orders
+        ),
+        'revenue', (
+            SELECT COALESCE(jsonb_agg(jsonb_build_object(
+                       'period', period::DATE,
+                       'orders', orders,
+                       'revenue', revenue
+                   ) ORDER BY period), '[]'::JSONB)
+            FROM periods
+        ),
+        'top_by_quantity', (
+            SELECT COALESCE(jsonb_agg(to_jsonb(t) ORDER BY t.quantity DESC, t.revenue DESC), '[]'::JSONB)
+            FROM (SELECT * FROM products ORDER BY quantity DESC, revenue DESC LIMIT top_limit) AS t
+        ),
+        'top_by_revenue', (
+            SELECT COALESCE(jsonb_agg(to_jsonb(t) ORDER BY t.revenue DESC, t.quantity DESC), '[]'::JSONB)
+            FROM (SELECT * FROM products ORDER BY revenue DESC, quantity DESC LIMIT top_limit) AS t
+        )
+    );
+$$;
+
+-- ---------------------------------------------
+-- Catalog snapshot
+-- ---------------------------------------------
+-- Rebuilds catalog_snapshot from category and product. It runs as its
+-- owner (SECURITY DEFINER), so the document does not depend on who made
+-- the write. It takes a transaction-level lock before reading, so
+-- concurrent writers refresh one after the other and the second one reads
+-- the first one's committed changes. Only the triggers (and the database
+-- owner) may call it: run it by hand after loading data with triggers
+-- disabled:
+--   SELECT refresh_catalog_snapshot();
+CREATE OR REPLACE FUNCTION refresh_catalog_snapshot()
+RETURNS VOID
+LANGUAGE plpgsql
+SECURITY DEFINER
+SET search_path = public
+AS $$
+BEGIN
+    PERFORM pg_advisory_xact_lock(hashtext('catalog_snapshot'));
+
+    INSERT INTO catalog_snapshot (cs_id, cs_document, cs_refreshed_at)
+    SELECT 1,
+           COALESCE(jsonb_agg(jsonb_build_object(
+               'id', c.id,
+               'c_name', c.c_name,
+               'c_description', c.c_description,
+               'c_image_url', c.c_image_url,
+               'c_is_active', c.c_is_active,
+               'c_sort_order', c.c_sort_order,
+               'products', COALESCE((
+                   SELECT jsonb_agg(jsonb_build_object(
+                              'id', p.id,
+                              'p_name', p.p_name,
+                              'p_description', p.p_description,
+                              'p_price', p.p_price,
+                              'p_image_url', p.p_image_url,
+                              'p_is_available', p.p_is_available,
+                              'p_is_featured', p.p_is_featured,
+                              'p_category_id', p.p_category_id,
+                              'p_sort_order', p.p_sort_order
+                          ) ORDER BY p.p_sort_order, p.id)
+                   FROM product AS p
+                   WHERE p.p_category_id = c.id
+                     AND p.p_is_available = TRUE
+               ), '[]'::JSONB)
+           ) ORDER BY c.c_sort_order, c.id), '[]'::JSONB),
+           NOW()
+    FROM category AS c
+    WHERE c.c_is_active = TRUE
+    ON CONFLICT (cs_id) DO UPDATE
+    SET cs_document = EXCLUDED.cs_document,
+        cs_refreshed_at = EXCLUDED.cs_refreshed_at;
+END;
+$$;
+
+-- Supabase grants EXECUTE on new functions to anon and authenticated, so
+-- without this any client could run the refresh through /rest/v1/rpc
+REVOKE EXECUTE ON FUNCTION refresh_catalog_snapshot() FROM PUBLIC, anon, authenticated;
+
+-- Once per statement, so a bulk reorder or a cascade refreshes once. Runs
+-- as its owner too, since the writer (an admin) may not call the refresh.
+CREATE OR REPLACE FUNCTION catalog_snapshot_changed()
+RETURNS TRIGGER
+LANGUAGE plpgsql
+SECURITY DEFINER
+SET search_path = public
+AS $$
+BEGIN
+    PERFORM refresh_catalog_snapshot();
+    RETURN NULL;
+END;
+$$;
+
+REVOKE EXECUTE ON FUNCTION catalog_snapshot_changed() FROM PUBLIC, anon, authenticated;
+
+DROP TRIGGER IF EXISTS category_catalog_snapshot ON category;
+CREATE TRIGGER category_catalog_snapshot
+    AFTER INSERT OR UPDATE OR DELETE OR TRUNCATE ON category
+    FOR EACH STATEMENT EXECUTE FUNCTION catalog_snapshot_changed();
+
+DROP TRIGGER IF EXISTS product_catalog_snapshot ON product;
+CREATE TRIGGER product_catalog_snapshot
+    AFTER INSERT OR UPDATE OR DELETE OR TRUNCATE ON product
+    FOR EACH STATEMENT EXECUTE FUNCTION catalog_snapshot_changed();
+
+SELECT refresh_catalog_snapshot();
@@ -0,0 +1,79 @@
+"""Asymmetric token verification: JWKS fetched on the event loop, unknown kids negative-cached"""
+import asyncio
+import time
+
+import httpx
+import pytest
+from cryptography.hazmat.primitives import serialization
+from cryptography.hazmat.primitives.asymmetric import ec
+from fastapi import HTTPException
+from jose import jwk, jwt
+from starlette.requests import Request
+
+from api._utils import auth_middleware
+from api._utils.auth_middleware import SigningKeys, get_current_user
+from api._utils.supabase_client import registry
+
+pytestmark = pytest.mark.anyio
+
+KID = "key-1"
+
+
+def es256_key() -> str:
+    return ec.generate_private_key(ec.SECP256R1()).private_bytes(
+        serialization.Encoding.PEM, serialization.PrivateFormat.PKCS8, serialization.NoEncryption()
+    ).decode()
+
+
+def token(private_key: str, kid: str) -> str:
+    claims = {"sub": "user-1", "role": "authenticated", "aud": "authenticated", "exp": int(time.time()) + 3600}
+    return jwt.encode(claims, private_key, algorithm="ES256", headers={"kid": kid})
+
+
+def request(bearer: str) -> Request:
+    return Request({"type": "http", "headers": [(b"authorization", f"Bearer {bearer}".encode())]})
+
+
+@pytest.fixture
+def private_key(ctx, monkeypatch):
+    """An ES256 key published as KID by a stand-in Supabase Auth JWKS endpoint"""
+    private_key = es256_key()
+    public = jwk.construct(private_key, "ES256").public_key().to_dict()
+    keys = [{**public, "kid": KID, "alg": "ES256"}]
+
+    async def serve(request: httpx.Request) -> httpx.Response:
+        # Slow enough that concurrent verifications overlap on the fetch
+        await asyncio.sleep(0.01)
+        return httpx.Response(200, json={"keys": keys})
+
+    def blocking(request: httpx.Request) -> httpx.Response:
+        raise AssertionError("JWKS fetched with the sync client")
+
+    monkeypatch.setattr(registry, "async_transport", httpx.MockTransport(serve))
+    monkeypatch.setattr(registry, "transport", httpx.MockTransport(blocking))
+    registry.close()
+    monkeypatch.setattr(auth_middleware, "signing_keys", SigningKeys())
+    yield private_key
+    registry.close()
+
+
+async def test_concurrent_verifications_share_one_fetch(private_key):
+    users = await asyncio.gather(*(
+        get_current_user(request(token(private_key, KID))) for _ in range(10)
+    ))
+
+    assert {user["id"] for user in users} == {"user-1"}
+    assert auth_middleware.signing_keys.fetches == 1
+
+
+async def test_unknown_kid_is_negative_cached(private_key, monkeypatch):
+    await get_current_user(request(token(private_key, KID)))
+    # Without the global throttle, only the negative cache holds back refetches
+    monkeypatch.setattr(auth_middleware, "JWKS_MIN_REFRESH", 0.0)
+
+    for _ in range(3):
+        with pytest.raises(HTTPException) as raised:
+            await get_current_user(request(token(private_key, "unknown")))
+        assert raised.value.status_code == 401
+
+    assert auth_middleware.signing_keys.fetches == 2
@@ -0,0 +1,26 @@
+"""POST /api/checkout once the order is committed"""
+import pytest
+
+from api._utils.about_settings import DEFAULT_WHATSAPP_NUMBER, about_settings
+
+pytestmark = pytest.mark.anyio
+
+
+async def test_order_is_returned_when_about_settings_fail(ctx, client, monkeypatch):
+    async def unavailable():
+        raise RuntimeError("about row unavailable")
+
+    monkeypatch.setattr(about_settings, "get", unavailable)
+    orders = len(ctx.fake.tables["order"])
+
+    response = await client.post("/api/checkout", json={
+        "customer_name": "Bia",
+        "items": [{"product_id": ctx.available_ids[0], "quantity": 2}],
+    })
+
+    assert response.status_code == 200, response.text
+    body = response.json()
+    assert body["whatsapp_number"] == DEFAULT_WHATSAPP_NUMBER
+    assert "*Cliente:* Bia" in body["whatsapp_message"]
+    assert len(ctx.fake.tables["order"]) == orders + 1
+    assert any(order["id"] == body["order_id"] for order in ctx.fake.tables["order"])
@@ -0,0 +1,36 @@
+"""/api/_metrics: the in-process caches report their lookups"""
+import re
+
+import pytest
+
+pytestmark = pytest.mark.anyio
+
+
+async def cache_lookups(client) -> dict:
+    response = await client.get("/api/_metrics")
+    assert response.status_code == 200, response.text
+    return {
+        (cache, result): int(count)
+        for cache, result, count in re.findall(r'^cache_lookups_total\{cache="(\w+)",result="(\w+)"\} (\d+)$', response.text, re.M)
+    }
+
+
+async def test_cache_hits_and_misses_are_exported(ctx, client):
+    before = await cache_lookups(client)
+
+    for _ in range(3):
+        response = await client.get("/api/products")
+        assert response.status_code == 200, response.text
+    key = {"Idempotency-Key": "metrics-test"}
+    cart = {"customer_name": "Bia", "items": [{"product_id": ctx.available_ids[0], "quantity": 1}]}
+    for _ in range(2):
+        response = await client.post("/api/checkout", json=cart, headers=key)
+        assert response.status_code == 200, response.text
+
+    after = await cache_lookups(client)
+    delta = {series: after[series] - before.get(series, 0) for series in after}
+    assert delta[("catalog", "miss")] == 1
+    assert delta[("catalog", "hit")] == 2
+    assert delta[("idempotency", "miss")] == 1
+    assert delta[("idempotency", "hit")] == 1
+    assert delta[("about_settings", "miss")] == 1
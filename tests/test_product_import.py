@@ -0,0 +1,89 @@
+"""POST /api/products/import: partial updates and CSV price conventions"""
+import pytest
+
+from api._utils.supabase_client import get_async_supabase_admin_client
+from api.data import _parse_price
+
+pytestmark = pytest.mark.anyio
+
+
+def product(ctx, product_id: str) -> dict:
+    return next(p for p in ctx.fake.tables["product"] if p["id"] == product_id)
+
+
+async def test_partial_row_keeps_the_other_columns(ctx, client):
+    before = dict(product(ctx, ctx.product_ids[0]))
+    rows = [{"id": before["id"], "name": "Bolo renomeado", "price": 99.5}]
+
+    response = await client.post("/api/products/import", json=rows, headers=ctx.admin_headers)
+
+    assert response.status_code == 200, response.text
+    assert response.json()["results"][0]["status"] == "updated"
+    after = product(ctx, before["id"])
+    assert after["p_name"] == "Bolo renomeado"
+    assert after["p_price"] == 99.5
+    for column in ("p_description", "p_image_url", "p_category_id", "p_sort_order", "p_is_available", "p_is_featured"):
+        assert after[column] == before[column], column
+
+
+async def test_partial_rows_with_different_columns(ctx, client):
+    first, second = (dict(product(ctx, product_id)) for product_id in ctx.product_ids[:2])
+    body = f"id,name,sort_order\n{first['id']},Torta nova,\n{second['id']},,7\n"
+
+    response = await client.post(
+        "/api/products/import", content=body, headers={**ctx.admin_headers, "Content-Type": "text/csv"}
+    )
+
+    assert response.status_code == 200, response.text
+    assert response.json()["failed"] == 0, response.text
+    assert product(ctx, first["id"])["p_name"] == "Torta nova"
+    assert product(ctx, first["id"])["p_sort_order"] == first["p_sort_order"]
+    assert product(ctx, second["id"])["p_name"] == second["p_name"]
+    assert product(ctx, second["id"])["p_sort_order"] == 7
+
+
+@pytest.mark.parametrize("body, query, price", [
+    ('name,price\nTorta,"1,234.50"\n', "", 1234.5),
+    ("name,price\nTorta,45.90\n", "", 45.9),
+    ("name;price\nTorta;1.234,50\n", "", 1234.5),
+    ("name;price\nTorta;45,90\n", "", 45.9),
+    ("name;price\nTorta;45.90\n", "?decimal=point", 45.9),
+])
+async def test_csv_price_convention(ctx, client, body, query, price):
+    response = await client.post(
+        f"/api/products/import{query}", content=body, headers={**ctx.admin_headers, "Content-Type": "text/csv"}
+    )
+
+    assert response.status_code == 200, response.text
+    result = response.json()["results"][0]
+    assert result["status"] == "created", result
+    assert product(ctx, result["id"])["p_price"] == price
+
+
+@pytest.mark.parametrize("body", ["name;price\nTorta;1.234\n", 'name,price\nTorta,"1,234"\n'])
+async def test_ambiguous_csv_price_is_a_row_error(ctx, client, body):
+    count = len(ctx.fake.tables["product"])
+
+    response = await client.post(
+        "/api/products/import", content=body, headers={**ctx.admin_headers, "Content-Type": "text/csv"}
+    )
+
+    assert response.status_code == 200, response.text
+    assert response.json()["results"][0]["status"] == "error"
+    assert len(ctx.fake.tables["product"]) == count
+
+
+def test_parse_price():
+    assert _parse_price("1.234,50", ",") == "1234.50"
+    assert _parse_price("1234", ".") == "1234.0"
+    with pytest.raises(ValueError):
+        _parse_price("1.234", ",")
+    with pytest.raises(ValueError):
+        _parse_price("12,5.0", ".")
+
+
+async def test_upsert_without_required_columns_fails_like_postgres(ctx):
+    # The stand-in checks NOT NULL on the proposed insert row, as Postgres does before ON CONFLICT
+    table = get_async_supabase_admin_client().table("product")
+    with pytest.raises(Exception, match="p_name"):
+        await table.upsert([{"id": ctx.product_ids[0], "p_sort_order": 3}], on_conflict="id").execute()
@@ -0,0 +1,55 @@
+"""Query budgets of the write paths that must stay one round-trip however large the input"""
+import pytest
+
+from api._utils import query_trace
+from api._utils.query_trace import QueryBudgetExceeded
+
+pytestmark = pytest.mark.anyio
+
+
+def cart(product_ids: list) -> dict:
+    return {"customer_name": "Bia", "items": [{"product_id": product_id, "quantity": 2} for product_id in product_ids]}
+
+
+async def test_checkout_budget(ctx, client, query_budget):
+    # create_order, plus the WhatsApp number while the about cache is cold
+    with query_budget(2):
+        response = await client.post("/api/checkout", json=cart(ctx.available_ids[:10]))
+    assert response.status_code == 200, response.text
+
+    with query_budget(1):
+        response = await client.post("/api/checkout", json=cart(ctx.available_ids[:3]))
+    assert response.status_code == 200, response.text
+
+
+async def test_reorder_budget(ctx, client, query_budget):
+    items = [{"id": product_id, "sort_order": 1000 + i} for i, product_id in enumerate(ctx.product_ids)]
+
+    with query_budget(1):
+        response = await client.put("/api/reorder/products", json={"items": items}, headers=ctx.admin_headers)
+
+    assert response.status_code == 200, response.text
+    assert response.json()["updated"] == len(items)
+
+
+@pytest.mark.parametrize("body", [
+    {"action": "set_price", "price": 12.5},
+    {"action": "adjust_price", "percent": 10},
+    {"action": "set_availability", "is_available": False},
+    {"action": "delete"},
+])
+async def test_batch_budget(ctx, client, query_budget, body):
+    with query_budget(1):
+        response = await client.post(
+            "/api/products/batch", json={"ids": ctx.product_ids, **body}, headers=ctx.admin_headers
+        )
+
+    assert response.status_code == 200, response.text
+    assert len(response.json()["ids"]) == len(ctx.product_ids)
+
+
+async def test_strict_budget_fails_before_the_response(ctx, client, query_budget, monkeypatch):
+    monkeypatch.setattr(query_trace, "QUERY_BUDGET", 0)
+
+    with pytest.raises(QueryBudgetExceeded, match="POST /api/checkout"):
+        await client.post("/api/checkout", json=cart(ctx.available_ids[:1]))